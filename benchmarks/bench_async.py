@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Measure event loop stalls and shared parses of aparse().
+
+A ticker coroutine sleeps 10 ms in a loop while the snapshot is parsed,
+once with parse() called from the loop and once with aparse(); the longest
+gap between two ticks is how long the loop was blocked. Then 10 concurrent
+aparse() calls for the same config are timed against one.
+
+Usage:
+    python benchmarks/bench_async.py [hosts] [servicesperhost]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, aparse, NagConfig
+
+from synthetic import writedataset
+
+
+async def ticker(gaps, stop):
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.01)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+
+async def stall(config, useasync):
+    gaps = []
+    stop = asyncio.Event()
+    task = asyncio.ensure_future(ticker(gaps, stop))
+    await asyncio.sleep(0.05)
+    if useasync:
+        await aparse(config)
+    else:
+        parse(config)
+    stop.set()
+    await task
+    return max(gaps)
+
+
+async def concurrent(config, count):
+    start = time.perf_counter()
+    await asyncio.gather(*[aparse(config) for _ in range(count)])
+    return time.perf_counter() - start
+
+
+def main(hosts=2000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    print("services: %d" % (hosts * servicesperhost))
+
+    config = NagConfig(files)
+    config.IGNORE_STALE_DATA = True
+    print("longest loop stall, parse()   %.3fs" % asyncio.run(stall(config, False)))
+    print("longest loop stall, aparse()  %.3fs" % asyncio.run(stall(config, True)))
+    print("1 aparse()                    %.3fs" % asyncio.run(concurrent(config, 1)))
+    print("10 concurrent aparse()        %.3fs" % asyncio.run(concurrent(config, 10)))
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
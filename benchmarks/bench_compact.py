@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""Memory of regular against compact hosts and services.
+
+Reports parse time and the memory held by the snapshot with the regular
+model classes and with NagConfig.COMPACT_OBJECTS, after a status pass over
+every service.
+
+Usage:
+    python benchmarks/bench_compact.py [hosts] [servicesperhost]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig
+
+from measure import besttime, memory
+from synthetic import writedataset
+
+
+def dashboard(config):
+    nag = parse(config)
+    [x.status for x in nag.services]
+    return nag
+
+
+def main(hosts=2000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    print("services: %d" % (hosts * servicesperhost))
+
+    for compact in (False, True):
+        config = NagConfig(files)
+        config.IGNORE_STALE_DATA = True
+        config.COMPACT_OBJECTS = compact
+        seconds, _ = besttime(dashboard, config)
+        peak, held, nag = memory(dashboard, config)
+        print(
+            "%-8s parse+status %.3fs, peak %.0f MB, snapshot %.0f MB, %.0f B/service"
+            % (
+                "compact" if compact else "regular",
+                seconds,
+                peak,
+                held,
+                held * 1048576.0 / len(nag.services),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""Time attribute decoding with and without the FIELDTYPES schema.
+
+Without a schema every value goes through convertvalue(), which tries int()
+and float() and catches the ValueError for strings. With the schema known
+attributes are converted directly.
+
+Usage:
+    python benchmarks/bench_decode.py [hosts] [servicesperhost]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser.Services.nagfactory import FIELDTYPES, decodeblock, tokenize
+
+from measure import besttime
+from synthetic import writedataset
+
+
+def decodeall(blocks, schema):
+    for section, body in blocks:
+        decodeblock(body, "=", FIELDTYPES.get(section) if schema else None)
+
+
+
+def main(hosts=2000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    with open(files[1]) as f:
+        blocks = list(tokenize(f.read()))
+
+    before, _ = besttime(decodeall, blocks, schema=False)
+    after, _ = besttime(decodeall, blocks, schema=True)
+
+    print("blocks:           %d" % len(blocks))
+    print("convertvalue():   %.3fs" % before)
+    print("FIELDTYPES:       %.3fs (%.1fx)" % (after, before / after))
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
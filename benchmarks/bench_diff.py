@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""Time diff() between two snapshots.
+
+Compares a snapshot with a reparse of the same files (nothing changed, the
+common case for a poll) and with a snapshot of a status.dat written with
+another random seed (most services changed).
+
+Usage:
+    python benchmarks/bench_diff.py [hosts] [servicesperhost]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, diff, NagConfig, NagParser
+
+from measure import besttime
+from synthetic import writedataset, writestatus
+
+
+def main(hosts=8000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    print("services: %d" % (hosts * servicesperhost))
+
+    config = NagConfig(files)
+    config.IGNORE_STALE_DATA = True
+    parser = NagParser(config)
+    old = parser.parse()
+    # Same files, so every object is carried over
+    new = parser.parse()
+    seconds, changes = besttime(diff, old, new)
+    print("unchanged      %.3fs, %d transitions" % (seconds, len(changes.transitions)))
+
+    other = tempfile.mkdtemp()
+    otherfiles = [files[0], os.path.join(other, "status.dat")]
+    writestatus(otherfiles[1], hosts, servicesperhost, seed=1)
+    otherconfig = NagConfig(otherfiles)
+    otherconfig.IGNORE_STALE_DATA = True
+    new = parse(otherconfig)
+    old = parse(config)
+    seconds, changes = besttime(diff, old, new)
+    print("other seed     %.3fs, %d transitions" % (seconds, len(changes.transitions)))
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
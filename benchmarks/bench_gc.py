@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""Measure garbage collector pauses and RSS over repeated parses.
+
+Parses the same files over and over, dropping the previous snapshot each
+time like a polling dashboard does, with strong or weak back-references
+(NagConfig.WEAK_REFERENCES) and with or without NagConfig.PAUSE_GC. Every
+mode runs in a fresh process so that their RSS can be compared.
+
+Reports the total and longest collector pause (measured with gc.callbacks)
+and the RSS after the first and the last parse.
+
+Usage:
+    python benchmarks/bench_gc.py [hosts] [servicesperhost] [parses]
+"""
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig
+
+from synthetic import writedataset
+
+MODES = (
+    ("strong", False, False),
+    ("strong+pause", False, True),
+    ("weak", True, False),
+    ("weak+pause", True, True),
+)
+
+
+def rss():
+    """Current resident set size in MB (Linux only)."""
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1048576.0
+
+
+def run(files, weak, pause, parses):
+    pauses = []
+    started = [0.0]
+
+    def callback(phase, info):
+        if phase == "start":
+            started[0] = time.perf_counter()
+        else:
+            pauses.append(time.perf_counter() - started[0])
+
+    config = NagConfig(files)
+    config.IGNORE_STALE_DATA = True
+    config.WEAK_REFERENCES = weak
+    config.PAUSE_GC = pause
+
+    gc.callbacks.append(callback)
+    nag = None
+    first = None
+    start = time.perf_counter()
+    for _ in range(parses):
+        nag = parse(config)
+        [x.status for x in nag.services]
+        if first is None:
+            first = rss()
+    elapsed = time.perf_counter() - start
+    gc.callbacks.remove(callback)
+
+    return elapsed, len(pauses), sum(pauses), max(pauses or [0]), first, rss()
+
+
+def main(hosts=2000, servicesperhost=15, parses=10):
+    directory = tempfile.mkdtemp()
+    writedataset(directory, hosts, servicesperhost)
+    print("services: %d, parses: %d" % (hosts * servicesperhost, parses))
+
+    for name, weak, pause in MODES:
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                directory,
+                str(int(weak)),
+                str(int(pause)),
+                str(parses),
+            ]
+        )
+        print("%-13s %s" % (name, output.decode().strip()))
+
+
+def child(directory, weak, pause, parses):
+    files = [
+        os.path.join(directory, "objects.cache"),
+        os.path.join(directory, "status.dat"),
+    ]
+    elapsed, count, total, longest, first, last = run(
+        files, bool(int(weak)), bool(int(pause)), int(parses)
+    )
+    print(
+        "%.2fs, %d collections, pauses %.3fs total %.3fs max, RSS %.0f -> %.0f MB"
+        % (elapsed, count, total, longest, first, last)
+    )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(*sys.argv[2:])
+    else:
+        main(*[int(x) for x in sys.argv[1:]])
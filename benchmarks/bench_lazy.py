@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""Compare eager parsing with NagConfig.LAZY_ATTRIBUTES.
+
+Times parse() plus a status pass over every service (what a dashboard
+does), and reports the memory held by the resulting snapshot.
+
+Usage:
+    python benchmarks/bench_lazy.py [hosts] [servicesperhost]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig
+
+from measure import besttime, memory
+from synthetic import writedataset
+
+
+def dashboard(config):
+    nag = parse(config)
+    [x.status for x in nag.services]
+    return nag
+
+
+def main(hosts=2000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    print("services: %d" % (hosts * servicesperhost))
+
+    for lazy in (False, True):
+        config = NagConfig(files)
+        config.IGNORE_STALE_DATA = True
+        config.LAZY_ATTRIBUTES = lazy
+        seconds, _ = besttime(dashboard, config)
+        peak, held, _ = memory(dashboard, config)
+        print(
+            "%-6s parse+status %.3fs, peak %.0f MB, snapshot %.0f MB"
+            % ("lazy" if lazy else "eager", seconds, peak, held)
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
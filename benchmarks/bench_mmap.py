@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""Compare reading files into a str with NagConfig.MMAP_FILES.
+
+Parses a status.dat of about 50 MB in full and with KEEP_ATTRIBUTES, and
+reports parse time, the tracemalloc peak while parsing and the memory held
+by the snapshot. Pages of a mapped file belong to the page cache and do not
+show up in the peak.
+
+Usage:
+    python benchmarks/bench_mmap.py [hosts] [servicesperhost]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig
+
+from measure import besttime, memory
+from synthetic import writedataset
+
+
+KEEP = {
+    "hoststatus": ["current_state", "plugin_output"],
+    "servicestatus": ["plugin_output", "last_check"],
+}
+
+
+def main(hosts=2400, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    size = os.path.getsize(files[1]) / 1048576.0
+    print("status.dat: %.1f MB, %d services" % (size, hosts * servicesperhost))
+
+    for keep in ({}, KEEP):
+        for mapped in (False, True):
+            config = NagConfig(files)
+            config.KEEP_ATTRIBUTES = keep
+            config.MMAP_FILES = mapped
+            seconds, _ = besttime(parse, config)
+            peak, held, _ = memory(parse, config)
+            print(
+                "%-5s %-9s parse %.3fs, peak %.0f MB, snapshot %.0f MB"
+                % (
+                    "mmap" if mapped else "str",
+                    "projected" if keep else "full",
+                    seconds,
+                    peak,
+                    held,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Scaling of NagConfig.PARALLEL_WORKERS across worker counts.
+
+Parses the same status.dat serially and with 2, 4, ... workers up to the
+number of CPUs (or the counts given with --workers), and prints the time
+and speedup of each.
+
+Usage:
+    python benchmarks/bench_parallel.py [hosts] [servicesperhost] [--workers 2,4,8]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig
+
+from measure import besttime
+from synthetic import writedataset
+
+
+def workercounts():
+    counts = []
+    count = 2
+    while count <= (os.cpu_count() or 1):
+        counts.append(count)
+        count *= 2
+    return counts or [2]
+
+
+def main(hosts=4000, servicesperhost=15, counts=None):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    size = os.path.getsize(files[1]) / 1048576.0
+    print(
+        "status.dat: %.1f MB, %d services, %d CPUs"
+        % (size, hosts * servicesperhost, os.cpu_count() or 1)
+    )
+
+    config = NagConfig(files)
+    config.PARALLEL_THRESHOLD = 1
+    serial = None
+    for workers in [1] + (counts or workercounts()):
+        config.PARALLEL_WORKERS = workers
+        seconds, _ = besttime(parse, config)
+        serial = serial or seconds
+        print("workers %2d  parse %.3fs  speedup %.2fx" % (workers, seconds, serial / seconds))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    counts = None
+    if "--workers" in args:
+        position = args.index("--workers")
+        counts = [int(x) for x in args[position + 1].split(",")]
+        del args[position : position + 2]
+    main(*[int(x) for x in args], counts=counts)
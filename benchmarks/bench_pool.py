@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""Memory and parse time with and without NagConfig.POOL_VALUES.
+
+Reports parse time and the memory held by the snapshot for the regular and
+the compact model, with equal str values pooled per snapshot and without.
+Attribute names are always shared.
+
+Usage:
+    python benchmarks/bench_pool.py [hosts] [servicesperhost]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig
+
+from measure import besttime, memory
+from synthetic import writedataset
+
+
+def main(hosts=4000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    size = os.path.getsize(files[1]) / 1048576.0
+    print("status.dat: %.1f MB, %d services" % (size, hosts * servicesperhost))
+
+    for compact in (False, True):
+        for pool in (False, True):
+            config = NagConfig(files)
+            config.COMPACT_OBJECTS = compact
+            config.POOL_VALUES = pool
+            seconds, _ = besttime(parse, config)
+            peak, held, _ = memory(parse, config)
+            print(
+                "%-8s %-9s parse %.3fs, peak %.0f MB, snapshot %.0f MB"
+                % (
+                    "compact" if compact else "regular",
+                    "pooled" if pool else "unpooled",
+                    seconds,
+                    peak,
+                    held,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
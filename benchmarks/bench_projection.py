@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Compare a full parse with one restricted by NagConfig.KEEP_ATTRIBUTES.
+
+Keeps the servicestatus attributes a typical status API needs and reports
+parse time, peak memory and memory held by the snapshot for both.
+
+Usage:
+    python benchmarks/bench_projection.py [hosts] [servicesperhost]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig
+
+from measure import besttime, memory
+from synthetic import writedataset
+
+
+KEEP = {
+    "servicestatus": [
+        "host_name",
+        "service_description",
+        "current_state",
+        "state_type",
+        "next_check",
+        "scheduled_downtime_depth",
+        "active_checks_enabled",
+        "last_state_change",
+        "plugin_output",
+    ]
+}
+
+
+def main(hosts=4000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    size = os.path.getsize(files[1]) / 1048576.0
+    print("status.dat: %.1f MB, %d services" % (size, hosts * servicesperhost))
+
+    for keep in ({}, KEEP):
+        config = NagConfig(files)
+        config.KEEP_ATTRIBUTES = keep
+        seconds, _ = besttime(parse, config)
+        peak, held, _ = memory(parse, config)
+        print(
+            "%-10s parse %.3fs, peak %.0f MB, snapshot %.0f MB"
+            % ("projected" if keep else "full", seconds, peak, held)
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Compare a burst of threads parsing on their own with SnapshotProvider.
+
+Starts a number of threads at once, as a WSGI server does for a burst of
+requests right after status.dat changed, each getting a snapshot either
+with parse() or from a shared SnapshotProvider. Reports the time until the
+last thread has its snapshot.
+
+Usage:
+    python benchmarks/bench_provider.py [hosts] [servicesperhost] [threads]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig, SnapshotProvider
+
+from synthetic import writedataset
+
+
+def burst(func, config, count):
+    barrier = threading.Barrier(count + 1)
+
+    def caller():
+        barrier.wait()
+        func(config)
+
+    threads = [threading.Thread(target=caller) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main(hosts=1000, servicesperhost=15, threads=8):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    print("services: %d, threads: %d" % (hosts * servicesperhost, threads))
+
+    config = NagConfig(files)
+    config.IGNORE_STALE_DATA = True
+    print("parse() per thread  %.2fs" % burst(parse, config, threads))
+    provider = SnapshotProvider()
+    print("SnapshotProvider    %.2fs" % burst(provider.get, config, threads))
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Compare parsing the text files with loading NagConfig.SNAPSHOT_CACHE.
+
+This is what a short-lived process pays on every run: a parse of the text
+files when the snapshot is missing or outdated, and a load of the snapshot
+when the files did not change since.
+
+Usage:
+    python benchmarks/bench_snapshot.py [hosts] [servicesperhost]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig
+from nagparser.Services.nagfactory import OBJECTCACHE
+
+from measure import besttime
+from synthetic import writedataset
+
+
+def coldparse(config):
+    OBJECTCACHE.clear()
+    return parse(config)
+
+
+def main(hosts=2000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    size = os.path.getsize(files[1]) / 1048576.0
+    print("status.dat: %.1f MB, %d services" % (size, hosts * servicesperhost))
+
+    for lazy in (False, True):
+        config = NagConfig(files)
+        config.LAZY_ATTRIBUTES = lazy
+        textseconds, _ = besttime(coldparse, config)
+
+        config.SNAPSHOT_CACHE = os.path.join(directory, "nag.snapshot")
+        coldparse(config)
+        loadseconds, _ = besttime(coldparse, config)
+        snapshotsize = os.path.getsize(config.SNAPSHOT_CACHE) / 1048576.0
+        os.remove(config.SNAPSHOT_CACHE)
+
+        print(
+            "%-5s text %.3fs, snapshot %.3fs (%.1fx), snapshot file %.1f MB"
+            % (
+                "lazy" if lazy else "eager",
+                textseconds,
+                loadseconds,
+                textseconds / loadseconds,
+                snapshotsize,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
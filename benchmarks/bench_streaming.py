@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Memory use of iterblocks() against parse() as status.dat grows.
+
+Counts the servicestatus records of status.dat files of growing size with
+iterblocks() and with parse(), and reports time and tracemalloc peak.
+
+Usage:
+    python benchmarks/bench_streaming.py [servicesperhost] [hosts,hosts,...]
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, iterblocks, NagConfig
+
+from measure import besttime, memory
+from synthetic import writedataset
+
+
+def stream(path):
+    return sum(1 for _ in iterblocks(path))
+
+
+def parsecount(config):
+    return len(parse(config).services)
+
+
+def main(servicesperhost=15, sizes=(250, 1000, 4000)):
+    for hosts in sizes:
+        directory = tempfile.mkdtemp()
+        files = writedataset(directory, hosts, servicesperhost)
+        size = os.path.getsize(files[1]) / 1048576.0
+        print("status.dat: %.1f MB, %d services" % (size, hosts * servicesperhost))
+
+        seconds, _ = besttime(stream, files[1])
+        peak, _, count = memory(stream, files[1])
+        print("  iterblocks %.3fs, peak %6.1f MB, %d records" % (seconds, peak, count))
+
+        config = NagConfig(files)
+        seconds, _ = besttime(parsecount, config)
+        peak, _, count = memory(parsecount, config)
+        print("  parse      %.3fs, peak %6.1f MB, %d services" % (seconds, peak, count))
+
+
+if __name__ == "__main__":
+    servicesperhost = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    if len(sys.argv) > 2:
+        main(servicesperhost, [int(x) for x in sys.argv[2].split(",")])
+    else:
+        main(servicesperhost)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""Compare the single-pass tokenizer in nagfactory.parse to the old regex path.
+
+The old parser compiled one regex per section name and ran findall over the
+whole file for each of them. This script keeps a copy of that code, runs
+both on a synthetic data set and checks that they build the same objects.
+
+Usage:
+    python benchmarks/bench_tokenizer.py [hosts] [servicesperhost]
+"""
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig
+from nagparser.Model import Nag, Host, Service, ServiceGroup
+from nagparser.Model.NagList import NagList
+
+from measure import besttime
+from synthetic import writedataset
+
+
+def regexparse(config):
+    """The regex based parse() as it was before the tokenizer."""
+    tempobjs = []
+    nag = None
+    for filename in config.files:
+        tempfile = open(filename)
+        content = tempfile.read()
+        tempfile.close()
+
+        if nag == None:
+            nag = Nag()
+        if ".cache" in filename:
+            sectionsnames = ["define servicegroup"]
+        else:
+            sectionsnames = ["hoststatus", "servicestatus", "programstatus", "info"]
+
+        for section in sectionsnames:
+            pat = re.compile(section + r" \{([\S\s]*?)\t}", re.DOTALL)
+
+            for sectioncontent in pat.findall(content):
+                if section == "hoststatus":
+                    temp = Host(nag)
+                elif section == "servicestatus":
+                    temp = Service(nag)
+                elif section in ["programstatus", "info"]:
+                    temp = nag
+                elif section == "define servicegroup":
+                    temp = ServiceGroup(nag)
+
+                for attr in sectioncontent.splitlines():
+                    attr = attr.strip()
+                    if len(attr) == 0 or attr.startswith("#"):
+                        pass
+                    else:
+                        if section == "define servicegroup":
+                            delim = "\t"
+                        else:
+                            delim = "="
+
+                        shortattr = attr.split(delim)[0].lower()
+                        value = attr.replace(shortattr + delim, "")
+                        try:
+                            value = int(str(value))
+                        except ValueError:
+                            try:
+                                value = float(str(value))
+                            except ValueError:
+                                pass
+
+                        temp.__dict__[shortattr] = value
+                tempobjs.append(temp)
+
+    nag.importantservicegroups = config.IMPORTANTSERVICEGROUPS
+    nag.config = config
+    nag.hosts = NagList([x for x in tempobjs if isinstance(x, Host)])
+    nag.services = NagList([x for x in tempobjs if isinstance(x, Service)])
+    nag._servicegroups = NagList([x for x in tempobjs if isinstance(x, ServiceGroup)])
+    return nag
+
+
+
+def samegraph(first, second):
+    if first.attributes != second.attributes:
+        return False
+    for name in ("hosts", "services", "_servicegroups"):
+        left = [x.attributes for x in getattr(first, name)]
+        right = [x.attributes for x in getattr(second, name)]
+        if left != right:
+            return False
+    return True
+
+
+def main(hosts=2000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    config = NagConfig(files)
+    size = os.path.getsize(files[1]) / 1024.0 / 1024.0
+
+    regextime, regexnag = besttime(regexparse, config)
+    tokentime, tokennag = besttime(parse, config)
+
+    print("status.dat: %.1f MB, %d services" % (size, hosts * servicesperhost))
+    print("regex path:     %.3fs" % regextime)
+    print("tokenizer path: %.3fs (%.1fx)" % (tokentime, regextime / tokentime))
+    print("same objects:   %s" % samegraph(regexnag, tokennag))
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Compare a parse() loop with StatusWatcher polls.
+
+Times what one iteration of a polling loop costs: parse() as consumers do
+it today, a StatusWatcher poll when the files did not change (only a stat
+of every file), and a poll after status.dat was rewritten.
+
+Usage:
+    python benchmarks/bench_watcher.py [hosts] [servicesperhost]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from nagparser import parse, NagConfig, StatusWatcher
+
+from measure import besttime
+from synthetic import writedataset, writestatus
+
+
+def main(hosts=2000, servicesperhost=15):
+    directory = tempfile.mkdtemp()
+    files = writedataset(directory, hosts, servicesperhost)
+    print("services: %d" % (hosts * servicesperhost))
+
+    config = NagConfig(files)
+    config.IGNORE_STALE_DATA = True
+    seconds, _ = besttime(parse, config)
+    print("parse()          %.4fs" % seconds)
+
+    watcher = StatusWatcher(config)
+    watcher.poll()
+    seconds, _ = besttime(watcher.poll)
+    print("poll, unchanged  %.4fs" % seconds)
+
+    def changedpoll(seed=[0]):
+        seed[0] += 1
+        writestatus(files[1], hosts, servicesperhost, seed=seed[0])
+        # Same second and size are possible, move the mtime along
+        stat = os.stat(files[1])
+        os.utime(files[1], (stat.st_atime, stat.st_mtime + seed[0]))
+        start = time.perf_counter()
+        watcher.poll()
+        return time.perf_counter() - start
+
+    print("poll, changed    %.4fs" % min(changedpoll() for _ in range(3)))
+    watcher.stop()
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,33 @@
+"""Timing and memory helpers shared by the benchmarks."""
+import gc
+import time
+import tracemalloc
+
+
+def besttime(func, *args, **kwargs):
+    """Run func three times and return (best seconds, last result)."""
+    best = None
+    result = None
+    for _ in range(3):
+        result = None
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def memory(func, *args, **kwargs):
+    """Run func under tracemalloc.
+
+    Returns:
+        tuple: (peak MB while running, MB still held by the result, result)
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args, **kwargs)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1048576.0, current / 1048576.0, result
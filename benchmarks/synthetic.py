@@ -0,0 +1,192 @@
+"""Generate synthetic Nagios data files for the benchmarks.
+
+The generated files follow the layout of the status.dat and objects.cache
+files written by Nagios 3, with every host carrying the same number of
+services and the services spread over a fixed set of service groups.
+"""
+import os
+import random
+
+
+HOSTSTATUS = """hoststatus {
+\thost_name=%(host)s
+\tmodified_attributes=0
+\tcheck_command=check-host-alive
+\tcheck_period=24x7
+\tnotification_period=24x7
+\tcheck_interval=5.000000
+\tretry_interval=1.000000
+\tevent_handler=
+\thas_been_checked=1
+\tshould_be_scheduled=1
+\tcheck_execution_time=0.008
+\tcheck_latency=0.000
+\tcheck_type=0
+\tcurrent_state=0
+\tlast_hard_state=0
+\tlast_event_id=1283
+\tcurrent_event_id=1284
+\tcurrent_problem_id=0
+\tlast_problem_id=572
+\tplugin_output=PING OK - Packet loss = 0%%, RTA = 0.31 ms
+\tlong_plugin_output=
+\tperformance_data=rta=0.310000ms;3000.000000;5000.000000;0.000000 pl=0%%;80;100;0
+\tlast_check=%(now)d
+\tnext_check=%(next)d
+\tlast_update=%(now)d
+\tscheduled_downtime_depth=0
+\t}
+
+"""
+
+SERVICESTATUS = """servicestatus {
+\thost_name=%(host)s
+\tservice_description=%(service)s
+\tmodified_attributes=0
+\tcheck_command=check_nrpe!check_%(check)s!"-w 24 -c 26"
+\tcheck_period=24x7
+\tnotification_period=workhours
+\tcheck_interval=10.000000
+\tretry_interval=2.000000
+\tevent_handler=
+\thas_been_checked=1
+\tshould_be_scheduled=1
+\tcheck_execution_time=0.014
+\tcheck_latency=0.146
+\tcheck_type=0
+\tcurrent_state=%(state)d
+\tlast_hard_state=%(state)d
+\tlast_event_id=3134
+\tcurrent_event_id=3135
+\tcurrent_problem_id=0
+\tlast_problem_id=1457
+\tcurrent_attempt=1
+\tmax_attempts=3
+\tstate_type=1
+\tlast_state_change=%(change)d
+\tlast_hard_state_change=%(change)d
+\tlast_time_ok=%(now)d
+\tlast_time_warning=1319814546
+\tlast_time_unknown=0
+\tlast_time_critical=1319731196
+\tplugin_output=%(output)s
+\tlong_plugin_output=
+\tperformance_data=load1=2.310;15.000;30.000;0; load5=1.740;10.000;25.000;0;
+\tlast_check=%(now)d
+\tnext_check=%(next)d
+\tcheck_options=0
+\tcurrent_notification_number=0
+\tcurrent_notification_id=881
+\tlast_notification=0
+\tnext_notification=0
+\tno_more_notifications=0
+\tnotifications_enabled=1
+\tactive_checks_enabled=1
+\tpassive_checks_enabled=1
+\tevent_handler_enabled=1
+\tproblem_has_been_acknowledged=0
+\tacknowledgement_type=0
+\tflap_detection_enabled=1
+\tfailure_prediction_enabled=1
+\tprocess_performance_data=1
+\tobsess_over_service=1
+\tlast_update=%(now)d
+\tis_flapping=0
+\tpercent_state_change=0.00
+\tscheduled_downtime_depth=%(downtime)d
+\t}
+
+"""
+
+HEADER = """########################################
+#          NAGIOS STATUS FILE
+########################################
+
+info {
+\tcreated=%(now)d
+\tversion=3.2.0
+\t}
+
+programstatus {
+\tnagios_pid=28561
+\tprogram_start=1319735273
+\tlast_command_check=%(now)d
+\t}
+
+"""
+
+OUTPUTS = [
+    "OK - load average: 2.31, 1.74, 1.44",
+    "TCP OK - 0.001 second response time on port 3010",
+    "DISK OK - free space: / 3326 MB (56% inode=97%)",
+    "WARNING - load average: 12.10, 11.74, 10.44",
+    "CRITICAL - Socket timeout after 10 seconds",
+]
+
+
+def hostname(index):
+    return "host%05d" % index
+
+
+def servicename(index):
+    return "Service %03d" % index
+
+
+def writestatus(path, hosts, servicesperhost, now=1320084503, seed=0):
+    """Write a synthetic status.dat with hosts * servicesperhost services."""
+    rand = random.Random(seed)
+    with open(path, "w") as output:
+        output.write(HEADER % {"now": now})
+        for h in range(hosts):
+            output.write(
+                HOSTSTATUS % {"host": hostname(h), "now": now, "next": now + 300}
+            )
+        for h in range(hosts):
+            for s in range(servicesperhost):
+                state = rand.choice((0, 0, 0, 0, 0, 0, 1, 2, 3))
+                output.write(
+                    SERVICESTATUS
+                    % {
+                        "host": hostname(h),
+                        "service": servicename(s),
+                        "check": servicename(s).split()[1],
+                        "state": state,
+                        "change": now - rand.randint(0, 86400),
+                        "now": now,
+                        "next": now + rand.randint(0, 600),
+                        "output": OUTPUTS[state if state < 3 else 4],
+                        "downtime": 1 if rand.random() < 0.01 else 0,
+                    }
+                )
+
+
+def writeobjects(path, hosts, servicesperhost, groups=20):
+    """Write a synthetic objects.cache with service groups over the services."""
+    members = [[] for _ in range(groups)]
+    for h in range(hosts):
+        for s in range(servicesperhost):
+            members[(h + s) % groups].append("%s,%s" % (hostname(h), servicename(s)))
+
+    with open(path, "w") as output:
+        output.write("# NAGIOS OBJECT CACHE FILE\n\n")
+        for g in range(groups):
+            output.write("define servicegroup {\n")
+            output.write("\tservicegroup_name\tgroup%02d\n" % g)
+            output.write("\talias\tGroup %02d\n" % g)
+            output.write("\tmembers\t%s\n" % ",".join(members[g]))
+            output.write("\t}\n\n")
+
+
+def writedataset(directory, hosts=1000, servicesperhost=15, groups=20):
+    """Write a synthetic objects.cache/status.dat pair into a directory.
+
+    Returns:
+        list: [objects.cache path, status.dat path], ready for NagConfig
+    """
+    files = [
+        os.path.join(directory, "objects.cache"),
+        os.path.join(directory, "status.dat"),
+    ]
+    writeobjects(files[0], hosts, servicesperhost, groups)
+    writestatus(files[1], hosts, servicesperhost)
+    return files
@@ -1,12 +1,22 @@
 import time
 import types
 import json
+import weakref
+
+from contextvars import ContextVar
 
 from datetime import datetime
 
 from .NagCommands import NagCommands
 from .NagList import NagList
 from .NagConfig import NagConfig
+from .NagIndex import NagIndex
+
+
+# Evaluation clocks pinned with Nag.evaluateat() in the current thread or
+# asyncio task: Nag -> tuple of clocks, the innermost last. Kept out of the Nag
+# itself, which is shared by every thread using the snapshot.
+_CLOCKS = ContextVar("nagparser_clocks", default=None)
 
 
 class Base(object):
@@ -27,21 +37,104 @@ class Base(object):
         attributes (list): List of (name, value) tuples for this object's attributes
     """
 
+    @property
+    def _clock(self):
+        # Evaluation clock of the Nag in the current context, see
+        # Nag.evaluateat(); None while it is not pinned
+        clocks = _CLOCKS.get()
+        if clocks is None:
+            return None
+        stack = clocks.get(self.nag)
+        if stack is None:
+            return None
+        return stack[-1]
+
+    # The Nag this object belongs to, or a weak reference to it; None on the
+    # Nag itself, so that it does not refer to itself
+    _nag = None
+
+    @property
+    def nag(self):
+        nag = self._nag
+        if nag is None:
+            return self
+        if type(nag) is weakref.ref:
+            nag = nag()
+            if nag is None:
+                raise ReferenceError(
+                    "The Nag this %s belongs to no longer exists" % self.classname()
+                )
+        return nag
+
+    @nag.setter
+    def nag(self, nag):
+        if nag is self:
+            self._nag = None
+            return
+        # See NagConfig.WEAK_REFERENCES; the parser sets the config of a Nag
+        # before creating its objects
+        config = nag.__dict__.get("config")
+        if config is not None and config.WEAK_REFERENCES:
+            self._nag = weakref.ref(nag)
+        else:
+            self._nag = nag
+
     def getnowtimestamp(self):
         """Get the current Unix timestamp.
 
+        While the clock of the Nag is pinned with Nag.evaluateat() this is the
+        pinned time rather than the wall clock.
+
         Returns:
             float: Current time as Unix timestamp
         """
+        clock = self.nag._clock
+        if clock is not None:
+            return clock[0]
         return time.time()
 
+    def getnowdatetime(self):
+        """Get the current time as a datetime, following the evaluation clock.
+
+        Returns:
+            datetime: Current (or pinned) local time
+        """
+        return datetime.fromtimestamp(self.getnowtimestamp())
+
     def __init__(self, nag=None):
         if nag == None:
-            self.nag = self
+            # The Nag itself, see the nag property
             self._nagcreated = datetime.now()
         else:
             self.nag = nag
 
+    def __getattr__(self, name):
+        # Objects parsed with NagConfig.LAZY_ATTRIBUTES decode the attributes
+        # of their raw block when they are first read
+        rawblock = self.__dict__.get("_rawblock")
+        if rawblock is not None and not name.startswith("__"):
+            found, value = rawblock.get(name)
+            if found:
+                self.__dict__[name] = value
+                return value
+            # Maybe a line the quick lookup missed (e.g. a mixed case name)
+            self.decodeattributes()
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(name)
+
+    def decodeattributes(self):
+        """Decode all attributes still pending in the raw block of this object.
+
+        Only does something for objects parsed with NagConfig.LAZY_ATTRIBUTES;
+        attributes already decoded or set are left alone.
+        """
+        rawblock = self.__dict__.pop("_rawblock", None)
+        if rawblock is not None:
+            for attr, value in rawblock.decode().items():
+                if attr not in self.__dict__:
+                    self.__dict__[attr] = value
+
     @property
     def commands(self):
         return NagCommands(self)
@@ -62,21 +155,29 @@ class Base(object):
             ...     print(f"{name}: {value}")
         """
 
+        self.decodeattributes()
+
         output = []
-        for attr in self.__dict__:
-            attrtype = type(self.__dict__[attr])
+        for attr, value in self._attributeitems():
+            attrtype = type(value)
             if (
                 attrtype is not list
                 and attrtype is not NagList
                 and attrtype is not NagConfig
+                and attrtype is not NagIndex
                 and attrtype is not tuple
+                and attrtype is not weakref.ref
                 and not issubclass(attrtype, Base)
                 and not attr == "_nagcreated"
             ):
-                output.append((attr, self.__dict__[attr]))
+                output.append((attr, value))
 
         return output
 
+    def _attributeitems(self):
+        # (name, value) pairs stored on this object, see CompactRecord
+        return list(self.__dict__.items())
+
     def getbad(self, objtype=None, items=None):
         """Get objects with non-OK status.
 
@@ -252,32 +353,65 @@ def servicesstatus(services):
         >>> status, in_downtime = servicesstatus(host.services)
         >>> print(f"Host status: {status}")
     """
-    if services:
-        hasdowntime = max([x.status[1] for x in services])
-    else:
-        hasdowntime = 0
+    status, hasdowntime, _ = servicesstatussummary(services)
+    return status, hasdowntime
+
+
+def servicesstatussummary(services):
+    """Calculate aggregated status and per-state counts across multiple services.
+
+    Evaluates the status of each service exactly once and applies the same
+    priority rules as servicesstatus() in a single pass.
 
-    if len([x for x in services if x.status[0] == "stale"]):
-        return "unknown", hasdowntime
+    Args:
+        services (list): List of Service objects (or other objects with a
+                         status tuple, such as ServiceGroups)
+
+    Returns:
+        tuple: (status_str, has_downtime_bool, counts) where the first two items
+               are what servicesstatus() returns and counts maps each status
+               string ('ok', 'warning', 'critical', 'unknown', 'stale' and any
+               other status seen) to the number of services in that state
+
+    Example:
+        >>> from nagparser.Model.Base import servicesstatussummary
+        >>> status, in_downtime, counts = servicesstatussummary(nag.services)
+        >>> print(f"{counts['critical']} critical services")
+    """
+    counts = {"ok": 0, "warning": 0, "critical": 0, "unknown": 0, "stale": 0}
+    hasdowntime = None
+    critical = warning = downtime = False
+
+    for service in services:
+        status, isdowntime = service.status
+        if status in counts:
+            counts[status] += 1
+        else:
+            counts[status] = 1
 
-    if len([x for x in services if x.status[0] == "critical" and x.status[1] is False]):
-        return "critical", hasdowntime
+        if hasdowntime is None or isdowntime > hasdowntime:
+            hasdowntime = isdowntime
 
-    elif len(
-        [x for x in services if x.status[0] == "warning" and x.status[1] is False]
-    ):
-        return "warning", hasdowntime
+        if isdowntime is False:
+            if status == "critical":
+                critical = True
+            elif status == "warning":
+                warning = True
+        elif isdowntime is True and status in ("ok", "unknown"):
+            downtime = True
 
-    elif len(
-        [
-            x
-            for x in services
-            if x.status[0] in ["ok", "unknown"] and x.status[1] is True
-        ]
-    ):
-        return "downtime", hasdowntime
+    if hasdowntime is None:
+        hasdowntime = 0
 
-    elif len([x for x in services if x.status[0] == "unknown"]):
-        return "unknown", hasdowntime
+    if counts["stale"]:
+        return "unknown", hasdowntime, counts
+    elif critical:
+        return "critical", hasdowntime, counts
+    elif warning:
+        return "warning", hasdowntime, counts
+    elif downtime:
+        return "downtime", hasdowntime, counts
+    elif counts["unknown"]:
+        return "unknown", hasdowntime, counts
     else:
-        return "ok", hasdowntime
+        return "ok", hasdowntime, counts
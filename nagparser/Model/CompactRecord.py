@@ -0,0 +1,119 @@
+from .Host import Host
+from .Service import Service
+
+
+class Schema(object):
+    """Attribute names of a row layout, shared by every object using it.
+
+    Attributes:
+        names (tuple): Attribute names, in the order of the values of a row
+        positions (dict): Attribute name -> index into a row
+    """
+
+    __slots__ = ("names", "positions")
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self.positions = dict((name, i) for i, name in enumerate(self.names))
+
+
+class CompactRecord(object):
+    """Mixin storing the parsed attributes of an object as one shared-schema row.
+
+    Used for hosts and services parsed with NagConfig.COMPACT_OBJECTS. Instead
+    of one instance dictionary per object, the attribute values are kept in a
+    tuple and their names in a Schema shared by all objects with the same
+    layout. Attributes read, list and serialize the same as on the regular
+    model classes; attributes assigned later are stored on the instance and
+    take precedence over the row.
+
+    Subclasses set the defaults their model class assigns in __init__, so
+    that attributes lists them first, like the regular classes do.
+    """
+
+    __slots__ = ()
+
+    # (name, value) pairs the model class sets in __init__
+    defaults = ()
+
+    # The model class this is a compact version of, see classname()
+    modelclass = None
+
+    def __init__(self, nag, schema, row):
+        # The defaults of the model class are part of the row, so its
+        # __init__ is not run
+        self.nag = nag
+        self._schema = schema
+        self._row = row
+        self._statuscache = None
+
+    @classmethod
+    def fromattributes(cls, nag, attrs, schemas):
+        """Build an object from decoded attributes.
+
+        Args:
+            nag (Nag): The Nag object the new object belongs to
+            attrs (dict or iterable): Attribute names and values, as decoded
+                from the block of the object
+            schemas (dict): Names tuple -> Schema, shared by the objects of a
+                parse so that objects with the same layout share one Schema
+
+        Returns:
+            CompactRecord: The new object
+        """
+        values = dict(cls.defaults)
+        values.update(attrs)
+        names = tuple(values)
+        schema = schemas.get(names)
+        if schema is None:
+            schema = schemas[names] = Schema(names)
+        return cls(nag, schema, tuple(values.values()))
+
+    def __getattr__(self, name):
+        # copy and pickle look up special methods on an instance whose slots
+        # are not set yet; reading _schema there would recurse
+        if name in ("_schema", "_row") or name.startswith("__"):
+            raise AttributeError(name)
+        position = self._schema.positions.get(name)
+        if position is None:
+            raise AttributeError(name)
+        return self._row[position]
+
+    def decodeattributes(self):
+        """Compact objects are always decoded in full, see Base.decodeattributes()."""
+
+    def _attributeitems(self):
+        items = dict(zip(self._schema.names, self._row))
+        items.update(self.__dict__)
+        return list(items.items())
+
+    def classname(self, classname=None):
+        """Get the lowercase class name of the model class, see Base.classname()."""
+        return super(CompactRecord, self).classname(classname or self.modelclass)
+
+
+class CompactHost(CompactRecord, Host):
+    """Host parsed with NagConfig.COMPACT_OBJECTS, see CompactRecord."""
+
+    __slots__ = ("_nag", "_schema", "_row", "_statuscache")
+
+    defaults = (("host_name", ""),)
+    modelclass = Host
+
+
+class CompactService(CompactRecord, Service):
+    """Service parsed with NagConfig.COMPACT_OBJECTS, see CompactRecord."""
+
+    __slots__ = ("_nag", "_schema", "_row", "_statuscache")
+
+    defaults = (
+        ("host_name", None),
+        ("last_state_change", None),
+        ("service_description", None),
+        ("active_checks_enabled", None),
+        ("current_state", None),
+        ("next_check", None),
+        ("scheduled_downtime_depth", None),
+        ("state_type", None),
+    )
+    modelclass = Service
@@ -1,5 +1,4 @@
 from .Base import Base, servicesstatus
-from .NagList import NagList
 
 from nagparser.Services.nicetime import getnicetimefromdatetime
 
@@ -39,7 +38,21 @@ class Host(Base):
             NagList: List of Service objects running on this host
         """
         # pylint: disable=E1103
-        return NagList([x for x in self.nag.services if x.host_name == self.host_name])
+        return self.nag.getindex().getservicesforhost(self.host_name)
+
+    def getservice(self, service_description):
+        """Get a service of this host by its description.
+
+        Args:
+            service_description (str): The service description to look for
+
+        Returns:
+            Service or None: The matching Service object, or None if not found
+        """
+        # pylint: disable=E1103
+        return self.nag.getindex().servicesbykey.get(
+            (self.host_name, service_description)
+        )
 
     @property
     def name(self):
@@ -71,6 +84,6 @@ class Host(Base):
         ).laststatuschange(returntimesincenow=False)
 
         if returntimesincenow:
-            return getnicetimefromdatetime(lastchange)
+            return getnicetimefromdatetime(lastchange, self.getnowdatetime())
         else:
             return lastchange
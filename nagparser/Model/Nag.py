@@ -1,7 +1,11 @@
+import time
+
+from contextlib import contextmanager
 from datetime import datetime
 
 from .NagList import NagList
-from .Base import Base, servicesstatus
+from .Base import Base, servicesstatus, _CLOCKS
+from .NagIndex import NagIndex
 from nagparser.Model import Host, ServiceGroup
 from nagparser.Services.nicetime import getnicetimefromdatetime
 
@@ -41,7 +45,7 @@ class Nag(Base):
     def __init__(self, nag=None):
         super(Nag, self).__init__(nag=nag)
 
-        self.__servicegroups = [None, None]
+        self.__servicegroups = [None, None, None]
         self.hosts = None
         self.services = None
         self._servicegroups = []
@@ -50,6 +54,8 @@ class Nag(Base):
 
     name = ""
 
+    _index = None
+
     @property
     def generated(self):
         """Get the datetime when this Nagios data was generated.
@@ -68,6 +74,81 @@ class Nag(Base):
         """
         return datetime.fromtimestamp(float(self.last_command_check))
 
+    def getindex(self):
+        """Get the relationship indexes of this snapshot.
+
+        The index is built by the parser and rebuilt on demand when the hosts,
+        services or service group list has been replaced since. Call reindex() after
+        changing those lists in place.
+
+        Returns:
+            NagIndex: Host and service lookup tables for this snapshot
+        """
+        if self._index is None or not self._index.isbuiltfrom(
+            self.hosts, self.services, self._servicegroups
+        ):
+            self.reindex()
+        return self._index
+
+    def reindex(self):
+        """Rebuild the relationship indexes from the current hosts and services."""
+        self._index = NagIndex(self.hosts, self.services, self._servicegroups)
+
+    def gethost(self, host_name):
+        """Get a host by its name.
+
+        Args:
+            host_name (str): The host name to look for
+
+        Returns:
+            Host or None: The matching Host object, or None if not found
+        """
+        return self.getindex().hostsbyname.get(host_name)
+
+    @contextmanager
+    def evaluateat(self, timestamp=None):
+        """Pin the evaluation clock of this snapshot.
+
+        Inside the with block every status, staleness and nicetime calculation
+        on this Nag and its objects uses the same point in time, and each
+        Service's status is evaluated once and then served from its cache.
+        Blocks can be nested; the previous clock is restored on exit.
+
+        The clock is pinned for the current thread or asyncio task only
+        (it is kept in a contextvars.ContextVar), so other threads sharing
+        this Nag keep their own clock. Leaving blocks in another order than
+        they were entered only removes the clock of the block left.
+
+        Args:
+            timestamp (float or datetime, optional): Time to evaluate at.
+                Defaults to the current time.
+
+        Yields:
+            Nag: This Nag object
+
+        Example:
+            >>> with nag.evaluateat():
+            ...     statuses = [sg.status for sg in nag.servicegroups]
+            ...     changed = nag.laststatuschange()
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        elif isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+
+        clock = (float(timestamp),)
+        clocks = dict(_CLOCKS.get() or {})
+        clocks[self] = clocks.get(self, ()) + (clock,)
+        _CLOCKS.set(clocks)
+        try:
+            yield self
+        finally:
+            clocks = dict(_CLOCKS.get() or {})
+            stack = tuple(x for x in clocks.pop(self, ()) if x is not clock)
+            if stack:
+                clocks[self] = stack
+            _CLOCKS.set(clocks or None)
+
     def getstatus(self, onlyimportant=False):
         return servicesstatus(self.getservicegroups(onlyimportant))
 
@@ -97,7 +178,7 @@ class Nag(Base):
         ).laststatuschange(returntimesincenow=False)
 
         if returntimesincenow:
-            return getnicetimefromdatetime(lastchange)
+            return getnicetimefromdatetime(lastchange, self.getnowdatetime())
         else:
             return lastchange
 
@@ -107,7 +188,8 @@ class Nag(Base):
         This method returns service groups from the Nagios data. When onlyimportant
         is False, it also creates two synthetic service groups: 'noservicegroup' for
         services not in any group, and 'allservices' containing all services.
-        Results are cached for performance.
+        The synthetic groups hold their services directly and are not added to
+        the parsed group list. Results are cached for performance.
 
         Args:
             onlyimportant (bool): If True, return only service groups marked as important
@@ -133,53 +215,25 @@ class Nag(Base):
                     ]
                 )
             else:
-                servicegroups = self._servicegroups
+                services = self.services or []
+                grouped = self.getindex().servicegroupsbyservice
 
                 # Build up a servicegroup instance that will have all services NOT in a servicegroup
-                noservicegroup = ServiceGroup(self.nag)
-                noservicegroup.alias = "No Service Group"
-                noservicegroup.nag = self.nag
-                noservicegroup.servicegroup_name = "noservicegroup"
-                noservicegroup.members = ""
-
-                servicesinservicegroup = []
-                for servicegroup in self._servicegroups:
-                    servicesinservicegroup.extend(servicegroup.services)
-
-                for services in list(set(self.services) - set(servicesinservicegroup)):
-                    noservicegroup.members = (
-                        noservicegroup.members
-                        + services.host.host_name
-                        + ","
-                        + services.name
-                        + ","
-                    )
-
-                noservicegroup.members = noservicegroup.members.strip(",")
-                servicegroups.append(noservicegroup)
+                noservicegroup = ServiceGroup.fromservices(
+                    self.nag,
+                    "noservicegroup",
+                    "No Service Group",
+                    [x for x in services if x not in grouped],
+                )
 
                 # Build "allservices" sudo servicegroup
-                allservicesservicegroup = ServiceGroup(self.nag)
-                allservicesservicegroup.alias = "All Services"
-                allservicesservicegroup.nag = self.nag
-                allservicesservicegroup.servicegroup_name = "allservices"
-                allservicesservicegroup.members = ""
-
-                for services in self.services:
-                    allservicesservicegroup.members = (
-                        allservicesservicegroup.members
-                        + services.host.host_name
-                        + ","
-                        + services.name
-                        + ","
-                    )
-
-                allservicesservicegroup.members = allservicesservicegroup.members.strip(
-                    ","
+                allservicesservicegroup = ServiceGroup.fromservices(
+                    self.nag, "allservices", "All Services", services
                 )
-                servicegroups.append(allservicesservicegroup)
 
-                servicegroups = NagList(servicegroups)
+                servicegroups = NagList(self._servicegroups)
+                servicegroups.append(noservicegroup)
+                servicegroups.append(allservicesservicegroup)
 
             return servicegroups
 
@@ -193,6 +247,35 @@ class Nag(Base):
         else:
             return self.__servicegroups[1]
 
+    def servicegroupsbyservice(self):
+        """Map every service to the service groups that contain it.
+
+        Covers the same groups as getservicegroups(onlyimportant=False),
+        including the synthetic 'noservicegroup' and 'allservices' groups. The
+        map is built once, in a single pass over all group members, and then
+        served from a cache.
+
+        Returns:
+            dict: Service -> NagList of ServiceGroup objects, in the order of
+                  getservicegroups()
+
+        Example:
+            >>> groups = nag.servicegroupsbyservice()
+            >>> for service in nag.services:
+            ...     print(service.name, groups[service].names)
+        """
+        if self.__servicegroups[2] is None:
+            byservice = dict((service, NagList()) for service in self.services or [])
+            for servicegroup in self.getservicegroups():
+                for service in servicegroup.gethostsandservices()[0]:
+                    if service in byservice:
+                        byservice[service].append(servicegroup)
+                    else:
+                        byservice[service] = NagList([servicegroup])
+            self.__servicegroups[2] = byservice
+
+        return self.__servicegroups[2]
+
     @property
     def servicegroups(self):
         """Get all service groups including synthetic groups.
@@ -17,6 +17,46 @@ class NagConfig(object):
         IMPORTANTSERVICEGROUPS (dict): Dictionary of important service groups
         DATETIME_FORMAT (str): Format string for datetime output (default: '%Y-%m-%d %H:%M:%S')
         REQUIRE_HARD_SERVICE_STATUS (bool): If True, only consider hard states for status (default: False)
+        LAZY_ATTRIBUTES (bool): If True, parsed objects keep the raw text of their block and
+            decode attributes other than the ones used for status on first access (default: False)
+        KEEP_ATTRIBUTES (dict): Block type (e.g. 'servicestatus') -> names of the attributes to
+            keep for it. Other attributes of listed block types are skipped while parsing; the
+            attributes needed for status calculations are always kept (default: {})
+        HOST_FILTER (str or regex): Only parse hosts and services whose host name matches.
+            A str is a glob matched against the whole name, a compiled regular expression
+            is searched in it (default: None)
+        SERVICEGROUP_FILTER (list): Only parse these service groups, and the hosts and
+            services that are members of them (default: None)
+        STATE_FILTER (list): Only parse services whose current_state is listed, e.g.
+            [1, 2, 3] for non-OK services only (default: None)
+        MMAP_FILES (bool): If True, files are memory-mapped and tokenized as bytes instead of
+            being read into a str; only the blocks and values that are kept get decoded, as
+            UTF-8 (default: False)
+        CACHE_OBJECTS (bool): If True, the service groups of an objects.cache file are read
+            and decoded once per version of the file (path, inode, mtime and size) and kept in a cache
+            shared by the whole process, see nagfactory.OBJECTCACHE (default: True)
+        SNAPSHOT_CACHE (str): Path of an on-disk snapshot of the last parse. A parse
+            loads it instead of reading the files when their inode, mtime and size and the
+            parse options still match, and writes it otherwise (default: None)
+        COMPACT_OBJECTS (bool): If True, hosts and services store their attributes in a
+            tuple with a schema shared by all objects of the same layout instead of in an
+            instance dictionary, see CompactRecord. Uses less memory; LAZY_ATTRIBUTES does
+            not apply to them (default: False)
+        POOL_VALUES (bool): If True, equal str values parsed into one snapshot share a single
+            str object, e.g. host names, check commands and recurring plugin output
+            (default: True)
+        WEAK_REFERENCES (bool): If True, parsed objects refer to their Nag through a weak
+            reference, so a snapshot is freed as soon as its Nag is no longer used, without
+            waiting for the cyclic garbage collector. Objects kept past their Nag raise
+            ReferenceError when they need it (default: False)
+        PAUSE_GC (bool): If True, the cyclic garbage collector is disabled while a parse
+            allocates its objects. None pauses it only with WEAK_REFERENCES set: with
+            strong references the snapshots that are dropped are cycles, which then pile
+            up until the next collection (default: None)
+        PARALLEL_WORKERS (int): Number of worker processes decoding a large status.dat in
+            parallel; 1 parses in the calling process (default: 1)
+        PARALLEL_THRESHOLD (int): Size in bytes from which a status.dat is decoded in
+            parallel when PARALLEL_WORKERS is more than 1 (default: 64 MB)
 
     Args:
         files (list): List of file paths to Nagios data files
@@ -37,6 +77,20 @@ class NagConfig(object):
         self.IMPORTANTSERVICEGROUPS = {}
         self.DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
         self.REQUIRE_HARD_SERVICE_STATUS = False
+        self.LAZY_ATTRIBUTES = False
+        self.KEEP_ATTRIBUTES = {}
+        self.HOST_FILTER = None
+        self.SERVICEGROUP_FILTER = None
+        self.STATE_FILTER = None
+        self.MMAP_FILES = False
+        self.CACHE_OBJECTS = True
+        self.SNAPSHOT_CACHE = None
+        self.COMPACT_OBJECTS = False
+        self.POOL_VALUES = True
+        self.WEAK_REFERENCES = False
+        self.PAUSE_GC = None
+        self.PARALLEL_WORKERS = 1
+        self.PARALLEL_THRESHOLD = 64 * 1024 * 1024
 
         allfilesexist = True
         for temp in files:
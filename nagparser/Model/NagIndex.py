@@ -0,0 +1,135 @@
+from .NagList import NagList
+
+
+class NagIndex(object):
+    """Relationship indexes over the hosts and services of a Nag snapshot.
+
+    Built once per snapshot so that looking up a host by name, a service by
+    host and description, or all services of a host are dictionary lookups
+    instead of scans over every host or service.
+
+    The members of all service groups are resolved together, the first time
+    any group membership is needed.
+
+    Attributes:
+        hosts (list): The host list the index was built from
+        services (list): The service list the index was built from
+        servicegroups (list): The service group list the index was built from
+        hostsbyname (dict): host_name -> Host
+        servicesbykey (dict): (host_name, service_description) -> Service
+        servicesbyhost (dict): host_name -> list of Service objects
+
+    Note:
+        When several objects share a name the first one wins, matching the
+        order of the parsed data files.
+    """
+
+    def __init__(self, hosts, services, servicegroups=None):
+        self.hosts = hosts
+        self.services = services
+        self.servicegroups = servicegroups
+        self.hostsbyname = {}
+        self.servicesbykey = {}
+        self.servicesbyhost = {}
+        self._servicegroupmembers = None
+        self._servicegroupsbyservice = None
+
+        for host in hosts or []:
+            self.hostsbyname.setdefault(host.host_name, host)
+
+        for service in services or []:
+            key = (service.host_name, service.service_description)
+            self.servicesbykey.setdefault(key, service)
+            if service.host_name in self.servicesbyhost:
+                self.servicesbyhost[service.host_name].append(service)
+            else:
+                self.servicesbyhost[service.host_name] = [service]
+
+    def isbuiltfrom(self, hosts, services, servicegroups=None):
+        """Check whether the index still matches the given lists.
+
+        Args:
+            hosts (list): Current host list of the Nag
+            services (list): Current service list of the Nag
+            servicegroups (list, optional): Current service group list of the Nag
+
+        Returns:
+            bool: True if the index was built from these very lists
+        """
+        return (
+            self.hosts is hosts
+            and self.services is services
+            and self.servicegroups is servicegroups
+        )
+
+    def getservicesforhost(self, host_name):
+        """Get the services of a host.
+
+        Args:
+            host_name (str): Name of the host
+
+        Returns:
+            NagList: New list with the host's Service objects
+        """
+        return NagList(self.servicesbyhost.get(host_name, []))
+
+    def resolvemembers(self, members):
+        """Resolve a service group members string to Service and Host objects.
+
+        Args:
+            members (str): Comma-separated list of alternating host names and
+                           service descriptions
+
+        Returns:
+            tuple: (services_list, hosts_list) without duplicates, in the
+                   order they appear in members
+        """
+        services = []
+        hosts = []
+        if members is None or members == "":
+            return services, hosts
+
+        seen = set()
+        members = members.split(",")
+        for i in range(0, len(members) - 1, 2):
+            host = self.hostsbyname.get(members[i])
+            if host is None:
+                continue
+            if host not in seen:
+                seen.add(host)
+                hosts.append(host)
+            service = self.servicesbykey.get((members[i], members[i + 1]))
+            if service is not None and service not in seen:
+                seen.add(service)
+                services.append(service)
+
+        return services, hosts
+
+    def _resolveservicegroups(self):
+        members = {}
+        byservice = {}
+        for servicegroup in self.servicegroups or []:
+            resolved = self.resolvemembers(servicegroup.members)
+            members[servicegroup] = resolved
+            for service in resolved[0]:
+                if service in byservice:
+                    byservice[service].append(servicegroup)
+                else:
+                    byservice[service] = [servicegroup]
+
+        self._servicegroupmembers = members
+        self._servicegroupsbyservice = byservice
+
+    @property
+    def servicegroupmembers(self):
+        """ServiceGroup -> (services_list, hosts_list) for the indexed groups."""
+        if self._servicegroupmembers is None:
+            self._resolveservicegroups()
+        return self._servicegroupmembers
+
+    @property
+    def servicegroupsbyservice(self):
+        """Service -> list of the indexed ServiceGroups containing it."""
+        if self._servicegroupsbyservice is None:
+            self._resolveservicegroups()
+        return self._servicegroupsbyservice
@@ -1,3 +1,7 @@
+# Marks a name shared by more than one item in the name index
+_DUPLICATE = object()
+
+
 class NagList(list):
     """Enhanced list class with convenience methods for Nagios objects.
 
@@ -5,6 +9,10 @@ class NagList(list):
     access to Nagios objects. It allows accessing items by name and provides
     special properties for common operations.
 
+    Name lookups go through an index that is built on first use and dropped
+    whenever the list is changed through one of its mutating methods. Renaming
+    an item in place is not noticed; call reindex() afterwards.
+
     Properties:
         first: Returns the first item in the list, or None if empty
         names: Returns a list of names of all items in the list
@@ -18,8 +26,12 @@ class NagList(list):
         >>> first_host = hosts.first
         >>> host_names = hosts.names
         >>> specific_host = hosts.webserver  # Access by name
+        >>> specific_host = hosts.get('webserver')
     """
 
+    _nameindex = None
+    _names = None
+
     def __getattr__(self, name):
         """Get item by name attribute or access special properties.
 
@@ -43,13 +55,124 @@ class NagList(list):
                 return None
 
         if name == "names":
-            return [x.name for x in self]
+            self._getnameindex()
+            return list(self._names)
 
-        obj = [x for x in self if x.name == name]
-        if obj:
-            if len(obj) == 1:
-                return obj[0]
-            else:
-                raise AttributeError("Multiple instances found")
+        obj = self._getnameindex().get(name)
+        if obj is _DUPLICATE:
+            raise AttributeError("Multiple instances found")
+        if obj is not None:
+            return obj
 
         raise AttributeError
+
+    def _getnameindex(self):
+        """Get the name -> item index, building it if needed.
+
+        Returns:
+            dict: Item names mapped to their item, or to _DUPLICATE for names
+                  used by more than one item
+        """
+        if self._nameindex is None:
+            nameindex = {}
+            names = [x.name for x in self]
+            for name, item in zip(names, self):
+                if name in nameindex:
+                    nameindex[name] = _DUPLICATE
+                else:
+                    nameindex[name] = item
+            self._nameindex = nameindex
+            self._names = names
+        return self._nameindex
+
+    def reindex(self):
+        """Drop the name index so it is rebuilt on the next lookup."""
+        if self._nameindex is not None:
+            self._nameindex = None
+            self._names = None
+
+    def get(self, name, default=None):
+        """Get an item by name.
+
+        Args:
+            name (str): Name of the item to look for
+            default: Value returned if no single item has that name
+
+        Returns:
+            The matching item, or default if the name is missing or not unique
+        """
+        obj = self._getnameindex().get(name, default)
+        if obj is _DUPLICATE:
+            return default
+        return obj
+
+    def getmany(self, names, default=None):
+        """Get several items by name in one call.
+
+        Args:
+            names (iterable): Names of the items to look for
+            default: Value used for names that no single item has
+
+        Returns:
+            list: The matching items, in the order of names
+        """
+        nameindex = self._getnameindex()
+        result = []
+        for name in names:
+            obj = nameindex.get(name, default)
+            if obj is _DUPLICATE:
+                obj = default
+            result.append(obj)
+        return result
+
+    def __getstate__(self):
+        # The name index is rebuilt on demand, leave it out of pickles/copies
+        return None
+
+    def append(self, item):
+        self.reindex()
+        super(NagList, self).append(item)
+
+    def extend(self, items):
+        self.reindex()
+        super(NagList, self).extend(items)
+
+    def insert(self, index, item):
+        self.reindex()
+        super(NagList, self).insert(index, item)
+
+    def remove(self, item):
+        self.reindex()
+        super(NagList, self).remove(item)
+
+    def pop(self, *args):
+        self.reindex()
+        return super(NagList, self).pop(*args)
+
+    def clear(self):
+        self.reindex()
+        super(NagList, self).clear()
+
+    def sort(self, *args, **kwargs):
+        self.reindex()
+        super(NagList, self).sort(*args, **kwargs)
+
+    def reverse(self):
+        self.reindex()
+        super(NagList, self).reverse()
+
+    def __setitem__(self, index, value):
+        self.reindex()
+        super(NagList, self).__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self.reindex()
+        super(NagList, self).__delitem__(index)
+
+    def __iadd__(self, items):
+        self.reindex()
+        return super(NagList, self).__iadd__(items)
+
+    def __imul__(self, count):
+        self.reindex()
+        return super(NagList, self).__imul__(count)
@@ -58,9 +58,7 @@ class Service(Base):
             Host: The Host object with matching host_name, or None if not found
         """
         # pylint: disable=E1103
-        return NagList(
-            [x for x in self.nag.hosts if x.host_name == self.host_name]
-        ).first
+        return self.nag.getindex().hostsbyname.get(self.host_name)
 
     @property
     def name(self):
@@ -71,6 +69,9 @@ class Service(Base):
         """
         return self.service_description
 
+    # (clock, status) of the last evaluation under a pinned evaluation clock
+    _statuscache = None
+
     def getstatus(self, *arg):
         """Calculate the current status of this service.
 
@@ -78,6 +79,10 @@ class Service(Base):
         configuration options like STALE_THRESHOLD, REQUIRE_HARD_SERVICE_STATUS,
         and scheduled downtime.
 
+        While the evaluation clock of the Nag is pinned (see Nag.evaluateat())
+        staleness is judged against the pinned time and the result is cached
+        until the clock changes.
+
         Returns:
             tuple: (status_str, in_downtime_bool) where:
                    - status_str is one of: 'ok', 'warning', 'critical', 'unknown', 'stale'
@@ -88,24 +93,35 @@ class Service(Base):
             - Soft states are treated as 'ok' if REQUIRE_HARD_SERVICE_STATUS is True
             - State codes: 0=OK, 1=WARNING, 2=CRITICAL, >2=UNKNOWN
         """
-        isdowntime = False
-        if int(self.scheduled_downtime_depth) > 0:
-            isdowntime = True
+        clock = self.nag._clock
+        if clock is None:
+            return self._evaluatestatus(time.time())
+
+        cache = self._statuscache
+        if cache is None or cache[0] is not clock:
+            cache = self._statuscache = (clock, self._evaluatestatus(clock[0]))
+        return cache[1]
+
+    def _evaluatestatus(self, now):
+        config = self.nag.config
+        isdowntime = int(self.scheduled_downtime_depth) > 0
         # pylint: disable=E1103
         if (
-            (time.time() - self.nag.config.STALE_THRESHOLD) > int(self.next_check)
+            config.IGNORE_STALE_DATA == False
             and self.active_checks_enabled == 1
-            and self.nag.config.IGNORE_STALE_DATA == False
+            and (now - config.STALE_THRESHOLD) > int(self.next_check)
         ):
             return "stale", isdowntime
 
-        if self.nag.config.REQUIRE_HARD_SERVICE_STATUS and int(self.state_type) != 1:
+        if config.REQUIRE_HARD_SERVICE_STATUS and int(self.state_type) != 1:
             return "ok", isdowntime
-        if int(self.current_state) == 2:
+
+        current_state = int(self.current_state)
+        if current_state == 2:
             return "critical", isdowntime
-        elif int(self.current_state) == 1:
+        elif current_state == 1:
             return "warning", isdowntime
-        elif int(self.current_state) > 2 or int(self.current_state) < 0:
+        elif current_state > 2 or current_state < 0:
             return "unknown", isdowntime
         else:
             return "ok", isdowntime
@@ -131,7 +147,7 @@ class Service(Base):
             lastchange = datetime.fromtimestamp(float(self.last_state_change))
 
         if returntimesincenow:
-            return getnicetimefromdatetime(lastchange)
+            return getnicetimefromdatetime(lastchange, self.getnowdatetime())
         else:
             return lastchange
 
@@ -142,9 +158,5 @@ class Service(Base):
         Returns:
             NagList: List of ServiceGroup objects that contain this service
         """
-        servicegroups = []
         # pylint: disable=E1103
-        for servicegroup in self.nag.getservicegroups():
-            if self in servicegroup.services:
-                servicegroups.append(servicegroup)
-        return NagList(servicegroups)
+        return NagList(self.nag.servicegroupsbyservice().get(self, []))
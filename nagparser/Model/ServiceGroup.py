@@ -36,35 +36,77 @@ class ServiceGroup(Base):
         self.members = None
         self.alias = None
 
+    @classmethod
+    def fromservices(cls, nag, servicegroup_name, alias, services):
+        """Build a service group directly from a list of services.
+
+        Used for synthetic groups that do not come from objects.cache. The
+        group holds references to the given services and their hosts; its
+        members string is only put together when it is read.
+
+        Args:
+            nag (Nag): The Nag object the services belong to
+            servicegroup_name (str): Name of the new group
+            alias (str): Human-readable name of the new group
+            services (list): Service objects making up the group
+
+        Returns:
+            ServiceGroup: The new service group
+        """
+        servicegroup = cls(nag)
+        del servicegroup.members
+        servicegroup.alias = alias
+        servicegroup.servicegroup_name = servicegroup_name
+
+        hostsbyname = nag.getindex().hostsbyname
+        hosts = []
+        seen = set()
+        for service in services:
+            host = hostsbyname.get(service.host_name)
+            if host is not None and host not in seen:
+                seen.add(host)
+                hosts.append(host)
+
+        servicegroup._hostsandservices = (list(services), hosts)
+        return servicegroup
+
+    def __getattr__(self, name):
+        # The members string of groups built by fromservices() is put together
+        # on first access
+        if name == "members":
+            hostsandservices = self.__dict__.get("_hostsandservices")
+            if hostsandservices is not None:
+                self.members = ",".join(
+                    "%s,%s" % (x.host_name, x.service_description)
+                    for x in hostsandservices[0]
+                )
+                return self.members
+        return super(ServiceGroup, self).__getattr__(name)
+
+    @property
+    def attributes(self):
+        """Get all simple attributes of this service group, see Base.attributes."""
+        self.members  # put together a pending members string
+        return super(ServiceGroup, self).attributes
+
     def gethostsandservices(self):
         """Parse the members string to extract hosts and services.
 
         The members attribute is a comma-separated string of alternating host names
-        and service descriptions. This method parses that string and returns the
-        corresponding Host and Service objects. Results are cached for performance.
+        and service descriptions. This method returns the corresponding Host and
+        Service objects. The members of all parsed groups are resolved together
+        through the relationship index of the Nag, and results are cached.
 
         Returns:
             tuple: (services_list, hosts_list) where both are lists of unique objects
         """
 
-        def _gethostsandservices():
-            tempservices = []
-            temphosts = []
-            if self.members is not None and self.members != "":
-                members = self.members.split(",")
-                for i in range(len(members)):
-                    if i % 2 == 0:
-                        host = self.nag.gethost(members[i])
-                        if host is not None:
-                            temphosts.append(host)
-                            service = host.getservice(members[i + 1])
-                            if service is not None:
-                                tempservices.append(service)
-
-            return (list(set(tempservices)), list(set(temphosts)))
-
         if self._hostsandservices == None:
-            self._hostsandservices = _gethostsandservices()
+            index = self.nag.getindex()
+            hostsandservices = index.servicegroupmembers.get(self)
+            if hostsandservices is None:
+                hostsandservices = index.resolvemembers(self.members)
+            self._hostsandservices = hostsandservices
 
         return self._hostsandservices
 
@@ -116,6 +158,6 @@ class ServiceGroup(Base):
         ).laststatuschange(returntimesincenow=False)
 
         if returntimesincenow:
-            return getnicetimefromdatetime(lastchange)
+            return getnicetimefromdatetime(lastchange, self.getnowdatetime())
         else:
             return lastchange
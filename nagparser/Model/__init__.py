@@ -1,4 +1,5 @@
 from .Host import Host
 from .Service import Service
+from .CompactRecord import CompactHost, CompactService
 from .ServiceGroup import ServiceGroup
 from .Nag import Nag
@@ -0,0 +1,79 @@
+import asyncio
+
+from nagparser.Services.nagfactory import parse, getsignatures
+
+
+# (event loop, NagConfig, file signatures) -> future of the parse in flight
+_INFLIGHT = {}
+
+
+async def aparse(config, executor=None):
+    """Parse the configured files without blocking the event loop.
+
+    The parse runs in an executor, by default the loop's thread pool.
+    Callers awaiting aparse() for the same NagConfig object while a parse
+    of it is running share that parse and all get the same Nag, as long as
+    none of the files changed since that parse started. A caller that is
+    cancelled does not cancel the parse for the others.
+
+    The parse still holds the GIL while it decodes, so other threads and
+    the event loop run slower during it, but they keep running.
+
+    Args:
+        config (NagConfig): Configuration object with the files to parse
+        executor (Executor, optional): Executor to parse in, defaults to the
+            default executor of the running loop
+
+    Returns:
+        Nag: The new snapshot, see parse()
+
+    Example:
+        >>> nag = await aparse(config)
+    """
+    loop = asyncio.get_running_loop()
+    key = (loop, config, getsignatures(config))
+    future = _INFLIGHT.get(key)
+    if future is None:
+        future = loop.run_in_executor(executor, parse, config)
+        _INFLIGHT[key] = future
+        future.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    return await asyncio.shield(future)
+
+
+async def awatch(config, interval=10, executor=None):
+    """Yield a new snapshot every time the configured files change.
+
+    Every interval seconds the (inode, mtime, size) of the files in
+    NagConfig.files is compared with the one of the last snapshot, and the
+    files are parsed with aparse() when any of them changed. The first
+    snapshot is yielded right away. Watchers of the same NagConfig object
+    share their parses.
+
+    A file that can not be read, e.g. while Nagios rotates status.dat, is
+    tried again on the next check.
+
+    Args:
+        config (NagConfig): Configuration with the files to watch
+        interval (float): Seconds between two checks of the files
+        executor (Executor, optional): Executor to parse in, see aparse()
+
+    Yields:
+        Nag: Snapshot of the files, each time they changed
+
+    Example:
+        >>> async for nag in awatch(config, interval=5):
+        ...     await publish(nag.status)
+    """
+    signatures = None
+    while True:
+        nag = None
+        try:
+            current = getsignatures(config)
+            if current != signatures:
+                nag = await aparse(config, executor)
+                signatures = current
+        except (IOError, OSError):
+            pass
+        if nag is not None:
+            yield nag
+        await asyncio.sleep(interval)
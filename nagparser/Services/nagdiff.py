@@ -0,0 +1,196 @@
+class Transition(object):
+    """A service whose status or state type differs between two snapshots.
+
+    Attributes:
+        previous (Service): The service in the old snapshot
+        service (Service): The service in the new snapshot
+        oldstatus (str): Status of the old service, see Service.status
+        newstatus (str): Status of the new service
+        oldstatetype (int): state_type of the old service (0=SOFT, 1=HARD)
+        newstatetype (int): state_type of the new service
+    """
+
+    __slots__ = (
+        "previous",
+        "service",
+        "oldstatus",
+        "newstatus",
+        "oldstatetype",
+        "newstatetype",
+    )
+
+    def __init__(self, previous, service, oldstatus, newstatus):
+        self.previous = previous
+        self.service = service
+        self.oldstatus = oldstatus
+        self.newstatus = newstatus
+        self.oldstatetype = previous.state_type
+        self.newstatetype = service.state_type
+
+    def __repr__(self):
+        return "<Transition %s/%s %s -> %s>" % (
+            self.service.host_name,
+            self.service.service_description,
+            self.oldstatus,
+            self.newstatus,
+        )
+
+
+class NagDiff(object):
+    """Changes between two Nag snapshots, see diff().
+
+    Lists are in the order of the snapshot the objects are taken from: the
+    new one, except for removed hosts and services.
+
+    Attributes:
+        old (Nag): The old snapshot
+        new (Nag): The new snapshot
+        addedhosts (list): Hosts only in the new snapshot
+        removedhosts (list): Hosts only in the old snapshot
+        addedservices (list): Services only in the new snapshot
+        removedservices (list): Services only in the old snapshot
+        transitions (list): Transition for every service in both snapshots
+            whose status or state_type changed
+        downtimestarted (list): Services of the new snapshot that went into
+            scheduled downtime
+        downtimeended (list): Services of the new snapshot that came out of
+            scheduled downtime
+        acknowledged (list): Services of the new snapshot whose problem got
+            acknowledged
+        unacknowledged (list): Services of the new snapshot whose
+            acknowledgement was removed
+
+    Properties:
+        changed (bool): True if any of the lists is not empty
+    """
+
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+        self.addedhosts = []
+        self.removedhosts = []
+        self.addedservices = []
+        self.removedservices = []
+        self.transitions = []
+        self.downtimestarted = []
+        self.downtimeended = []
+        self.acknowledged = []
+        self.unacknowledged = []
+
+    @property
+    def changed(self):
+        return bool(
+            self.addedhosts
+            or self.removedhosts
+            or self.addedservices
+            or self.removedservices
+            or self.transitions
+            or self.downtimestarted
+            or self.downtimeended
+            or self.acknowledged
+            or self.unacknowledged
+        )
+
+
+def isacknowledged(service):
+    """Check whether the problem of a service has been acknowledged.
+
+    Services parsed without the problem_has_been_acknowledged attribute (see
+    NagConfig.KEEP_ATTRIBUTES) count as not acknowledged.
+    """
+    return bool(getattr(service, "problem_has_been_acknowledged", 0))
+
+
+def getparsetime(nag):
+    """Get the Unix timestamp at which a snapshot was parsed."""
+    return nag._nagcreated.timestamp()
+
+
+def diff(old, new, oldtime=None, newtime=None):
+    """Compare two Nag snapshots of the same Nagios instance.
+
+    Hosts are matched by host_name and services by (host_name,
+    service_description), with the dictionaries of Nag.getindex(), so the
+    comparison takes time linear in the number of objects. Every matched
+    service has its status evaluated once per snapshot: the old one as of
+    oldtime and the new one as of newtime, so that services going stale in
+    between are reported as transitions too.
+
+    Services NagParser carried over from the old snapshot to the new one
+    are the same object in both. Their attributes are the same, so only
+    their staleness can differ and they are skipped when it can not, e.g.
+    with NagConfig.IGNORE_STALE_DATA set.
+
+    Args:
+        old (Nag): The previous snapshot
+        new (Nag): The current snapshot
+        oldtime (float, optional): Unix timestamp to evaluate the old
+            snapshot at. Defaults to its pinned clock (see Nag.evaluateat())
+            or else the time it was parsed.
+        newtime (float, optional): Unix timestamp to evaluate the new
+            snapshot at. Defaults to its pinned clock or else the current
+            time.
+
+    Returns:
+        NagDiff: The changes from old to new
+
+    Example:
+        >>> from nagparser import diff
+        >>> changes = diff(previous, nag)
+        >>> for transition in changes.transitions:
+        ...     print(transition.service.name, transition.newstatus)
+    """
+    if oldtime is None:
+        oldtime = old.getnowtimestamp() if old._clock else getparsetime(old)
+    if newtime is None:
+        newtime = new.getnowtimestamp()
+
+    result = NagDiff(old, new)
+    oldindex = old.getindex()
+    newindex = new.getindex()
+
+    oldhosts = oldindex.hostsbyname
+    newhosts = newindex.hostsbyname
+    result.addedhosts = [x for name, x in newhosts.items() if name not in oldhosts]
+    result.removedhosts = [x for name, x in oldhosts.items() if name not in newhosts]
+
+    oldservices = oldindex.servicesbykey
+    newservices = newindex.servicesbykey
+    result.removedservices = [
+        x for key, x in oldservices.items() if key not in newservices
+    ]
+
+    staleness = not new.config.IGNORE_STALE_DATA
+    addedservices = result.addedservices
+    transitions = result.transitions
+    for key, service in newservices.items():
+        previous = oldservices.get(key)
+        if previous is None:
+            addedservices.append(service)
+            continue
+        if previous is service and not (
+            staleness and service.active_checks_enabled == 1
+        ):
+            continue
+
+        oldstatus, olddowntime = previous._evaluatestatus(oldtime)
+        newstatus, newdowntime = service._evaluatestatus(newtime)
+        if oldstatus != newstatus or previous.state_type != service.state_type:
+            transitions.append(Transition(previous, service, oldstatus, newstatus))
+        if previous is service:
+            continue
+
+        if olddowntime != newdowntime:
+            if newdowntime:
+                result.downtimestarted.append(service)
+            else:
+                result.downtimeended.append(service)
+
+        oldacknowledged = isacknowledged(previous)
+        if oldacknowledged != isacknowledged(service):
+            if oldacknowledged:
+                result.unacknowledged.append(service)
+            else:
+                result.acknowledged.append(service)
+
+    return result
@@ -1,9 +1,855 @@
 #!/usr/bin/env python
 
+import gc
+import hashlib
+import mmap
+import os
 import re
+import sys
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from fnmatch import translate
 
 from nagparser.Model.NagList import NagList
 from nagparser.Model import Nag, Host, Service, ServiceGroup
+from nagparser.Model import CompactHost, CompactService
+from nagparser.Services import snapshot
+
+
+# Block types that are turned into objects for each kind of input file, in
+# the order their objects are built. Blocks of any other type are skipped by
+# the tokenizer without being decoded.
+SECTIONS = {
+    ".cache": ("define servicegroup",),
+    ".dat": ("hoststatus", "servicestatus", "programstatus", "info"),
+}
+
+# Attribute/value delimiter used inside the blocks of each kind of file.
+DELIMITERS = {".cache": "\t", ".dat": "="}
+
+# Encoding of memory-mapped files, see NagConfig.MMAP_FILES
+ENCODING = "utf-8"
+
+# Model class built for each block type. None means the attributes of the
+# block are stored on the Nag object itself.
+FACTORIES = {
+    "hoststatus": Host,
+    "servicestatus": Service,
+    "programstatus": None,
+    "info": None,
+    "define servicegroup": ServiceGroup,
+}
+
+# Compact version of the model classes, built with NagConfig.COMPACT_OBJECTS
+COMPACTFACTORIES = {Host: CompactHost, Service: CompactService}
+
+# Attributes shared by the hoststatus and servicestatus blocks
+_STATUSINTS = (
+    "modified_attributes",
+    "has_been_checked",
+    "should_be_scheduled",
+    "check_type",
+    "current_state",
+    "last_hard_state",
+    "last_event_id",
+    "current_event_id",
+    "current_problem_id",
+    "last_problem_id",
+    "current_attempt",
+    "max_attempts",
+    "state_type",
+    "last_state_change",
+    "last_hard_state_change",
+    "last_check",
+    "next_check",
+    "check_options",
+    "current_notification_number",
+    "current_notification_id",
+    "last_notification",
+    "next_notification",
+    "no_more_notifications",
+    "notifications_enabled",
+    "active_checks_enabled",
+    "passive_checks_enabled",
+    "event_handler_enabled",
+    "problem_has_been_acknowledged",
+    "acknowledgement_type",
+    "flap_detection_enabled",
+    "failure_prediction_enabled",
+    "process_performance_data",
+    "last_update",
+    "is_flapping",
+    "scheduled_downtime_depth",
+)
+_STATUSFLOATS = (
+    "check_interval",
+    "retry_interval",
+    "check_execution_time",
+    "check_latency",
+    "percent_state_change",
+)
+_STATUSSTRS = (
+    "host_name",
+    "check_command",
+    "check_period",
+    "notification_period",
+    "event_handler",
+    "plugin_output",
+    "long_plugin_output",
+    "performance_data",
+)
+
+
+def _fieldtypes(ints=(), floats=(), strs=()):
+    fieldtypes = dict((name, int) for name in ints)
+    fieldtypes.update((name, float) for name in floats)
+    fieldtypes.update((name, str) for name in strs)
+    return fieldtypes
+
+
+# Type of the well-known attributes of each block type. Values of these are
+# converted directly; attributes missing here go through convertvalue().
+FIELDTYPES = {
+    "hoststatus": _fieldtypes(
+        ints=_STATUSINTS
+        + ("last_time_up", "last_time_down", "last_time_unreachable", "obsess_over_host"),
+        floats=_STATUSFLOATS,
+        strs=_STATUSSTRS,
+    ),
+    "servicestatus": _fieldtypes(
+        ints=_STATUSINTS
+        + (
+            "last_time_ok",
+            "last_time_warning",
+            "last_time_unknown",
+            "last_time_critical",
+            "obsess_over_service",
+        ),
+        floats=_STATUSFLOATS,
+        strs=_STATUSSTRS + ("service_description",),
+    ),
+    "programstatus": _fieldtypes(
+        ints=(
+            "modified_host_attributes",
+            "modified_service_attributes",
+            "nagios_pid",
+            "daemon_mode",
+            "program_start",
+            "last_command_check",
+            "last_log_rotation",
+            "enable_notifications",
+            "active_service_checks_enabled",
+            "passive_service_checks_enabled",
+            "active_host_checks_enabled",
+            "passive_host_checks_enabled",
+            "enable_event_handlers",
+            "obsess_over_services",
+            "obsess_over_hosts",
+            "check_service_freshness",
+            "check_host_freshness",
+            "enable_flap_detection",
+            "enable_failure_prediction",
+            "process_performance_data",
+            "next_comment_id",
+            "next_downtime_id",
+            "next_event_id",
+            "next_problem_id",
+            "next_notification_id",
+            "total_external_command_buffer_slots",
+            "used_external_command_buffer_slots",
+            "high_external_command_buffer_slots",
+        ),
+        strs=(
+            "global_host_event_handler",
+            "global_service_event_handler",
+            "active_scheduled_host_check_stats",
+            "active_ondemand_host_check_stats",
+            "passive_host_check_stats",
+            "active_scheduled_service_check_stats",
+            "active_ondemand_service_check_stats",
+            "passive_service_check_stats",
+            "cached_host_check_stats",
+            "cached_service_check_stats",
+            "external_command_stats",
+            "parallel_host_check_stats",
+            "serial_host_check_stats",
+        ),
+    ),
+    "info": _fieldtypes(
+        ints=("created", "last_update_check", "update_available"),
+        strs=("version", "last_version", "new_version"),
+    ),
+    "define servicegroup": _fieldtypes(
+        strs=("servicegroup_name", "alias", "members", "notes", "notes_url", "action_url")
+    ),
+}
+
+# Attributes always decoded for each block type: the ones the model classes
+# need for names, relationships and status calculations.
+REQUIREDATTRIBUTES = {
+    "hoststatus": ("host_name",),
+    "servicestatus": (
+        "host_name",
+        "service_description",
+        "last_state_change",
+        "active_checks_enabled",
+        "current_state",
+        "next_check",
+        "scheduled_downtime_depth",
+        "state_type",
+    ),
+    "programstatus": ("last_command_check",),
+    "info": ("created",),
+    "define servicegroup": ("servicegroup_name", "alias", "members"),
+}
+
+
+def getkeptattributes(config, section):
+    """Get the attributes to decode for a block type, see KEEP_ATTRIBUTES.
+
+    Args:
+        config (NagConfig): Configuration of the parse
+        section (str): Block type, e.g. 'servicestatus'
+
+    Returns:
+        tuple or None: Names of the attributes to decode, or None to decode
+                       all of them
+    """
+    keep = config.KEEP_ATTRIBUTES.get(section)
+    if keep is None:
+        return None
+    names = list(REQUIREDATTRIBUTES.get(section, ()))
+    names.extend(x for x in keep if x not in names)
+    return tuple(names)
+
+
+def getschemadigest():
+    """Get a digest of the tables that decide what a parse stores.
+
+    Part of the key of on-disk snapshots, so that a snapshot written by a
+    version of the parser with other value types, required attributes or
+    model defaults is parsed again rather than loaded.
+
+    Returns:
+        str: Hex digest of SECTIONS, FACTORIES, FIELDTYPES, REQUIREDATTRIBUTES
+             and the defaults of the compact model classes
+    """
+    tables = (
+        sorted(SECTIONS.items()),
+        sorted((x, getattr(y, "__name__", None)) for x, y in FACTORIES.items()),
+        sorted(
+            (section, sorted((x, y.__name__) for x, y in fieldtypes.items()))
+            for section, fieldtypes in FIELDTYPES.items()
+        ),
+        sorted(REQUIREDATTRIBUTES.items()),
+        [(x.__name__, x.defaults) for x in (CompactHost, CompactService)],
+    )
+    return hashlib.blake2b(repr(tables).encode(ENCODING), digest_size=16).hexdigest()
+
+
+class BlockFilter(object):
+    """Decides which blocks of a parse are turned into objects.
+
+    Built from the HOST_FILTER, SERVICEGROUP_FILTER and STATE_FILTER options
+    of a NagConfig, see getblockfilter(). Only the attributes a filter looks
+    at are read from a block before it is accepted or dropped.
+
+    Service group membership is collected from the accepted service groups
+    through addservicegroup(), so objects.cache files have to be parsed
+    before status.dat files.
+
+    Args:
+        config (NagConfig): Configuration of the parse
+    """
+
+    def __init__(self, config):
+        hostfilter = config.HOST_FILTER
+        if isinstance(hostfilter, str):
+            hostfilter = re.compile(translate(hostfilter)).match
+        elif hostfilter is not None:
+            hostfilter = hostfilter.search
+        self.hostfilter = hostfilter
+
+        self.servicegroups = None
+        if config.SERVICEGROUP_FILTER is not None:
+            self.servicegroups = set(config.SERVICEGROUP_FILTER)
+        self.states = None
+        if config.STATE_FILTER is not None:
+            self.states = set(config.STATE_FILTER)
+
+        self.memberhosts = set()
+        self.memberservices = set()
+
+    def addservicegroup(self, members):
+        """Record the members of an accepted service group.
+
+        Args:
+            members (str): Comma-separated list of alternating host names and
+                           service descriptions
+        """
+        if not members:
+            return
+        members = members.split(",")
+        for i in range(0, len(members) - 1, 2):
+            self.memberhosts.add(members[i])
+            self.memberservices.add((members[i], members[i + 1]))
+
+    def acceptsservicegroup(self, servicegroup_name):
+        """Check whether a service group passes SERVICEGROUP_FILTER."""
+        return self.servicegroups is None or servicegroup_name in self.servicegroups
+
+    def accepts(self, section, body, delim):
+        """Check whether a block passes the filters.
+
+        Args:
+            section (str): Block type, e.g. 'servicestatus'
+            body (str): Raw block body as returned by tokenize()
+            delim (str): Delimiter between attribute name and value
+
+        Returns:
+            bool: False if the block should be dropped
+        """
+        if section == "define servicegroup":
+            return self.acceptsservicegroup(
+                findattribute(body, "servicegroup_name", delim, str)[1]
+            )
+        elif section not in ("hoststatus", "servicestatus"):
+            return True
+
+        host_name = findattribute(body, "host_name", delim, str)[1]
+        if host_name is None:
+            host_name = ""
+        if self.hostfilter is not None and not self.hostfilter(host_name):
+            return False
+        if section == "hoststatus":
+            return self.servicegroups is None or host_name in self.memberhosts
+
+        if self.servicegroups is not None:
+            key = (host_name, findattribute(body, "service_description", delim, str)[1])
+            if key not in self.memberservices:
+                return False
+        if self.states is not None:
+            if findattribute(body, "current_state", delim, int)[1] not in self.states:
+                return False
+        return True
+
+
+def getcompactfactory(config, factory):
+    """Get the compact class to build instead of a model class, if any.
+
+    Args:
+        config (NagConfig): Configuration of the parse
+        factory (type or None): Model class of a block type, see FACTORIES
+
+    Returns:
+        type or None: The CompactRecord class to build, or None to build the
+                      model class itself
+    """
+    if not config.COMPACT_OBJECTS:
+        return None
+    return COMPACTFACTORIES.get(factory)
+
+
+def getblockfilter(config):
+    """Get the block filter of a parse, see BlockFilter.
+
+    Args:
+        config (NagConfig): Configuration of the parse
+
+    Returns:
+        BlockFilter or None: None when no filter option is set
+    """
+    if (
+        config.HOST_FILTER is None
+        and config.SERVICEGROUP_FILTER is None
+        and config.STATE_FILTER is None
+    ):
+        return None
+    return BlockFilter(config)
+
+
+def getfilekind(filename):
+    """Work out which kind of Nagios file a filename refers to.
+
+    Args:
+        filename (str): Path to a status.dat or objects.cache file
+
+    Returns:
+        str: '.cache' for object cache files, '.dat' for status files
+
+    Raises:
+        Exception: If the filename is neither a '.cache' nor a '.dat' file
+    """
+    if ".cache" in filename:
+        return ".cache"
+    elif ".dat" in filename:
+        return ".dat"
+    else:
+        raise Exception("Invalid filename detected")
+
+
+def getfilesignature(filename):
+    """Get a signature identifying the current version of a file.
+
+    Args:
+        filename (str): Path to the file
+
+    Returns:
+        tuple: (inode, mtime, size) of the file
+    """
+    return statsignature(os.stat(filename))
+
+
+def statsignature(stat):
+    """Get the signature of a file from its os.stat() or os.fstat() result."""
+    return (stat.st_ino, stat.st_mtime, stat.st_size)
+
+
+def getsignatures(config):
+    """Get the signature of every file of a config, see getfilesignature().
+
+    Args:
+        config (NagConfig): Configuration with the files
+
+    Returns:
+        tuple: Signature of every file in NagConfig.files, in that order
+    """
+    return tuple(getfilesignature(x) for x in config.files)
+
+
+def tokenizeoffsets(content):
+    """Find the blocks in the content of a Nagios data file.
+
+    Walks the content once, finding each ``name {`` header and the ``\\t}``
+    line closing it. Text between blocks (comments, blank lines) is skipped.
+    Works on str as well as on bytes-like content such as an mmap, without
+    copying the block bodies.
+
+    Args:
+        content (str, bytes or mmap): Full content of a status.dat or
+            objects.cache file
+
+    Yields:
+        tuple: (section, start, end) where section is the block header
+               without the brace as a str, and content[start:end] is the raw
+               body of the block
+    """
+    text = isinstance(content, str)
+    if text:
+        header, closer, newline, comment = " {\n", "\n\t}", "\n", "#"
+    else:
+        header, closer, newline, comment = b" {\n", b"\n\t}", b"\n", b"#"
+
+    find = content.find
+    rfind = content.rfind
+    start = 0
+    while True:
+        brace = find(header, start)
+        if brace < 0:
+            return
+        linestart = rfind(newline, start, brace) + 1 or start
+        if content[linestart : linestart + 1] == comment:
+            start = brace + 3
+            continue
+        end = find(closer, brace)
+        if end < 0:
+            return
+        section = content[linestart:brace]
+        if not text:
+            section = section.decode(ENCODING, "replace")
+        yield section, brace + 3, end
+        start = end + 3
+
+
+def tokenize(content):
+    """Split the content of a Nagios data file into its blocks.
+
+    Args:
+        content (str, bytes or mmap): Full content of a status.dat or
+            objects.cache file
+
+    Yields:
+        tuple: (section, body) where section is the block header without the
+               brace (e.g. 'servicestatus' or 'define servicegroup') and body
+               is the raw text between the header and the closing brace, of
+               the same type as content
+    """
+    for section, start, end in tokenizeoffsets(content):
+        yield section, content[start:end]
+
+
+@contextmanager
+def openfile(filename, mapped=False):
+    """Open a Nagios data file for tokenizing.
+
+    Args:
+        filename (str): Path to the file
+        mapped (bool): If True, map the file into memory read-only instead of
+            reading it into a str, see NagConfig.MMAP_FILES
+
+    Yields:
+        str or mmap: The content of the file. An empty file yields b''.
+    """
+    if not mapped:
+        with open(filename) as tempfile:
+            yield tempfile.read()
+        return
+
+    with open(filename, "rb") as tempfile:
+        try:
+            content = mmap.mmap(tempfile.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped
+            yield b""
+            return
+        try:
+            yield content
+        finally:
+            content.close()
+
+
+def totext(body):
+    """Decode the raw bytes of a block or value, leaving str as is."""
+    if isinstance(body, str):
+        return body
+    return body.decode(ENCODING, "replace")
+
+
+class BlockCache(object):
+    """Size-bounded LRU cache of the blocks decoded from a data file.
+
+    Holds, per file version, the decoded blocks of the types listed in
+    SECTIONS (see decodecached()), so that an unchanged file is neither read,
+    tokenized nor decoded again. Safe to share between threads.
+
+    Attributes:
+        maxsize (int): Number of file versions kept; 0 disables the cache
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get the cached blocks for a key, or None, marking it recently used."""
+        with self._lock:
+            blocks = self._entries.get(key)
+            if blocks is not None:
+                self._entries.move_to_end(key)
+            return blocks
+
+    def put(self, key, blocks):
+        """Store the blocks for a key, evicting the least recently used ones."""
+        with self._lock:
+            self._entries[key] = blocks
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(self.maxsize, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached file."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide cache of objects.cache files, keyed by path, inode, mtime and
+# size. objects.cache only changes when Nagios reloads.
+OBJECTCACHE = BlockCache()
+
+
+def decodecached(filename, kind, signature, config):
+    """Get the decoded blocks of an objects.cache file from OBJECTCACHE.
+
+    The file is read, tokenized and decoded on the first call for a version
+    of it (and for the KEEP_ATTRIBUTES of its block types), and served from
+    OBJECTCACHE by later calls. The decoded attributes refer to no Nag, so
+    they are shared by every snapshot; objects built from them have to copy
+    them rather than use the dictionaries themselves.
+
+    Args:
+        filename (str): Path to the file
+        kind (str): '.cache' or '.dat', see getfilekind()
+        signature (tuple): Current signature of the file, see getfilesignature()
+        config (NagConfig): Configuration of the parse
+
+    Returns:
+        tuple or None: (section, digest, attributes) of every block of the
+                       types in SECTIONS, in the order the parser builds
+                       them; None if the file does not go through the cache
+    """
+    if kind != ".cache" or not config.CACHE_OBJECTS or OBJECTCACHE.maxsize <= 0:
+        return None
+
+    sectionnames = SECTIONS[kind]
+    keeps = tuple(getkeptattributes(config, x) for x in sectionnames)
+    key = (os.path.abspath(filename),) + signature + keeps
+    blocks = OBJECTCACHE.get(key)
+    if blocks is not None:
+        return blocks
+
+    delim = DELIMITERS[kind]
+    pool = {} if config.POOL_VALUES else None
+    sectionblocks = dict((section, []) for section in sectionnames)
+    with openfile(filename, config.MMAP_FILES) as content:
+        for section, start, end in tokenizeoffsets(content):
+            if section in sectionblocks:
+                sectionblocks[section].append(totext(content[start:end]))
+    decoded = []
+    for section, keep in zip(sectionnames, keeps):
+        fieldtypes = FIELDTYPES.get(section)
+        for body in sectionblocks[section]:
+            attrs = _decode(body, delim, keep, fieldtypes, pool)
+            decoded.append((section, hash(body), attrs))
+    blocks = tuple(decoded)
+    OBJECTCACHE.put(key, blocks)
+    return blocks
+
+
+def convertvalue(value):
+    """Convert a raw attribute value to int or float where possible.
+
+    Args:
+        value (str): Raw value as found in the data file
+
+    Returns:
+        int, float or str: The converted value, or the original string
+    """
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def convertfield(value, fieldtype=None):
+    """Convert a raw attribute value according to its schema type.
+
+    Args:
+        value (str): Raw value as found in the data file
+        fieldtype (type, optional): int, float or str from FIELDTYPES. Values
+            without a type, or that do not fit it, go through convertvalue().
+
+    Returns:
+        int, float or str: The converted value
+    """
+    if fieldtype is str:
+        return value
+    elif fieldtype is None:
+        return convertvalue(value)
+    try:
+        return fieldtype(value)
+    except ValueError:
+        return convertvalue(value)
+
+
+def findattribute(body, name, delim, fieldtype=None):
+    """Find and convert a single attribute in the body of a block.
+
+    Only the line of the requested attribute is looked at; the rest of the
+    block is neither split nor converted.
+
+    Args:
+        body (str or bytes): Raw block body as returned by tokenize(). Only
+            the value of a bytes body is decoded.
+        name (str): Lowercase attribute name
+        delim (str): Delimiter between attribute name and value
+        fieldtype (type, optional): Schema type of the attribute
+
+    Returns:
+        tuple: (found, value) where found is False if the block has no such
+               attribute line
+    """
+    marker = "\t" + name + delim
+    newline = "\n"
+    if not isinstance(body, str):
+        marker = marker.encode(ENCODING)
+        newline = b"\n"
+
+    if body.startswith(marker):
+        start = len(marker)
+    else:
+        start = body.find(newline + marker)
+        if start < 0:
+            return False, None
+        start += len(marker) + 1
+
+    end = body.find(newline, start)
+    if end < 0:
+        end = len(body)
+    return True, convertfield(totext(body[start:end].rstrip()), fieldtype)
+
+
+# Attribute Nagios sets to the time of the write in every status block, so
+# it changes on every write of status.dat even if nothing else did
+VOLATILEATTRIBUTE = "last_update"
+
+
+def splitvolatile(body, delim, fieldtypes=None):
+    """Split the VOLATILEATTRIBUTE line off the body of a block.
+
+    NagParser recognizes unchanged blocks by the rest of their body, and
+    sets the new value on the objects it carries over.
+
+    Args:
+        body (str or bytes): Raw block body as returned by tokenize()
+        delim (str): Delimiter between attribute name and value
+        fieldtypes (dict, optional): Schema of the block type, see FIELDTYPES
+
+    Returns:
+        tuple: (rest, value) where rest is the body without the line and
+               value its converted value, or None if the block has no such
+               line
+    """
+    marker = "\t" + VOLATILEATTRIBUTE + delim
+    newline = "\n"
+    if not isinstance(body, str):
+        marker = marker.encode(ENCODING)
+        newline = b"\n"
+
+    if body.startswith(marker):
+        start = 0
+    else:
+        start = body.find(newline + marker)
+        if start < 0:
+            return body, None
+        start += 1
+
+    end = body.find(newline, start)
+    if end < 0:
+        end = len(body)
+    value = totext(body[start + len(marker) : end].rstrip())
+    fieldtype = (fieldtypes or {}).get(VOLATILEATTRIBUTE)
+    return body[:start] + body[end:], convertfield(value, fieldtype)
+
+
+def decodeselected(body, delim, names, fieldtypes=None, pool=None):
+    """Decode only the named attributes of a block.
+
+    Args:
+        body (str or bytes): Raw block body as returned by tokenize()
+        delim (str): Delimiter between attribute name and value
+        names (iterable): Lowercase names of the attributes to decode
+        fieldtypes (dict, optional): Schema of the block type, see FIELDTYPES
+        pool (dict, optional): Value pool of the snapshot, see decodeblock()
+
+    Returns:
+        dict: The named attributes found in the block, with converted values
+    """
+    if fieldtypes is None:
+        fieldtypes = {}
+
+    attrs = {}
+    for name in names:
+        found, value = findattribute(body, name, delim, fieldtypes.get(name))
+        if found:
+            if pool is not None and type(value) is str:
+                value = pool.setdefault(value, value)
+            attrs[name] = value
+    return attrs
+
+
+class LazyBlock(object):
+    """Raw text of a block whose attributes are decoded when first read.
+
+    Kept by objects parsed with NagConfig.LAZY_ATTRIBUTES; see
+    Base.__getattr__.
+    """
+
+    __slots__ = ("body", "delim", "fieldtypes")
+
+    def __init__(self, body, delim, fieldtypes=None):
+        self.body = body
+        self.delim = delim
+        self.fieldtypes = fieldtypes or {}
+
+    def get(self, name):
+        """Decode a single attribute, see findattribute()."""
+        return findattribute(
+            self.body, name, self.delim, self.fieldtypes.get(name)
+        )
+
+    def decodeselected(self, names, pool=None):
+        """Decode only the named attributes, see decodeselected()."""
+        return decodeselected(self.body, self.delim, names, self.fieldtypes, pool)
+
+    def decode(self):
+        """Decode every attribute of the block, see decodeblock()."""
+        return decodeblock(self.body, self.delim, self.fieldtypes)
+
+
+# Attribute name as found in a block -> its lowercased, interned form
+ATTRIBUTENAMES = {}
+
+
+def internname(name):
+    """Get the shared, lowercased str object for an attribute name.
+
+    Every object then refers to one str per attribute name instead of a copy
+    of its own, and lowercasing is done once per distinct spelling.
+
+    Args:
+        name (str): Attribute name as found in a block
+
+    Returns:
+        str: The lowercased attribute name
+    """
+    interned = ATTRIBUTENAMES.get(name)
+    if interned is None:
+        interned = ATTRIBUTENAMES[name] = sys.intern(name.lower())
+    return interned
+
+
+def decodeblock(body, delim, fieldtypes=None, pool=None):
+    """Decode the body of a block into a dictionary of attributes.
+
+    Args:
+        body (str): Raw block body as returned by tokenize()
+        delim (str): Delimiter between attribute name and value
+        fieldtypes (dict, optional): Attribute name -> type (int, float or
+            str) for the block type, see FIELDTYPES. Values of other
+            attributes, or values that do not fit their type, are converted
+            by convertvalue().
+        pool (dict, optional): Value pool of the snapshot. str values equal
+            to one already in the pool are replaced by the pooled object.
+
+    Returns:
+        dict: Lowercased attribute names mapped to their converted values
+    """
+    if fieldtypes is None:
+        fieldtypes = {}
+    names = ATTRIBUTENAMES
+
+    attrs = {}
+    for attr in body.splitlines():
+        attr = attr.strip()
+        if len(attr) == 0 or attr.startswith("#"):
+            continue
+        shortattr, _, value = attr.partition(delim)
+        shortattr = names.get(shortattr) or internname(shortattr)
+        fieldtype = fieldtypes.get(shortattr)
+        if fieldtype is str:
+            pass
+        elif fieldtype is None:
+            value = convertvalue(value)
+        else:
+            try:
+                value = fieldtype(value)
+            except ValueError:
+                value = convertvalue(value)
+        if pool is not None and type(value) is str:
+            value = pool.setdefault(value, value)
+        attrs[shortattr] = value
+    return attrs
 
 
 def parse(config):
@@ -13,6 +859,10 @@ def parse(config):
     status.dat and objects.cache files and constructs a hierarchical object structure
     containing hosts, services, and service groups.
 
+    Each file is tokenized in a single pass; only the block types listed in
+    SECTIONS for that kind of file are decoded into objects. Use NagParser
+    instead when the same files are parsed over and over.
+
     Args:
         config (NagConfig): Configuration object containing file paths and options.
                            Must have a 'files' attribute with paths to status.dat
@@ -36,77 +886,741 @@ def parse(config):
         >>> nag = parse(config)
         >>> print(f"Found {len(nag.hosts)} hosts and {len(nag.services)} services")
     """
-    tempobjs = []
-    files = config.files
-    importantservicegroups = config.IMPORTANTSERVICEGROUPS
-
-    nag = None
-    for filename in files:
-        tempfile = open(filename)
-        content = tempfile.read()
-        tempfile.close()
-
-        if nag == None:
-            nag = Nag()
-        if ".cache" in filename:
-            sectionsnames = ["define servicegroup"]
-        elif ".dat" in filename:
-            sectionsnames = ["hoststatus", "servicestatus", "programstatus", "info"]
-        else:
-            raise Exception("Invalid filename detected")
-
-        for section in sectionsnames:
-            pat = re.compile(section + r" \{([\S\s]*?)\t}", re.DOTALL)
-
-            for sectioncontent in pat.findall(content):
-                if section == "hoststatus":
-                    temp = Host(nag)
-                elif section == "servicestatus":
-                    temp = Service(nag)
-                elif section in ["programstatus", "info"]:
-                    temp = nag
-                elif section == "define servicegroup":
-                    temp = ServiceGroup(nag)
-
-                for attr in sectioncontent.splitlines():
-                    attr = attr.strip()
-                    if len(attr) == 0 or attr.startswith("#"):
-                        pass
-                    else:
-                        if section == "define servicegroup":
-                            delim = "\t"
-                        else:
-                            delim = "="
-
-                        shortattr = attr.split(delim)[0].lower()
-                        value = attr.replace(shortattr + delim, "")
-                        try:
-                            value = int(str(value))
-                        except ValueError:
-                            try:
-                                value = float(str(value))
-                            except ValueError:
-                                pass
-
-                        temp.__dict__[shortattr] = value
-                tempobjs.append(temp)
-
-    hosts = [x for x in tempobjs if isinstance(x, Host)]
-    services = [x for x in tempobjs if isinstance(x, Service)]
-    servicegroups = [x for x in tempobjs if isinstance(x, ServiceGroup)]
-
-    nag.importantservicegroups = importantservicegroups
+    return NagParser(config).parse()
+
+
+def iterblocks(path, types=("servicestatus",), attributes=None, chunksize=1048576):
+    """Stream the decoded blocks of a data file without building a Nag.
+
+    The file is read in chunks of chunksize bytes and each block is decoded
+    and yielded as soon as it is complete, so memory use depends on the
+    chunk and block sizes only, not on the size of the file. Values are
+    decoded as UTF-8 and converted like parse() does.
+
+    Args:
+        path (str): Path to a status.dat or objects.cache file
+        types (iterable): Block types to yield, e.g. ('hoststatus',
+            'servicestatus') or ('define servicegroup',)
+        attributes (iterable, optional): Names of the attributes to decode;
+            the other lines of a block are skipped. Defaults to all of them.
+        chunksize (int): Number of bytes read at a time
+
+    Yields:
+        tuple: (section, record) where record is a new dict of the decoded
+               attributes of the block
+
+    Raises:
+        Exception: If an invalid filename is detected (must contain '.cache' or '.dat')
+
+    Example:
+        >>> for section, record in iterblocks('/var/lib/nagios3/status.dat'):
+        ...     writer.writerow(record)
+    """
+    delim = DELIMITERS[getfilekind(path)]
+    types = frozenset(types)
+    if attributes is not None:
+        attributes = tuple(attributes)
+
+    with open(path, "rb") as tempfile:
+        buffer = b""
+        while True:
+            chunk = tempfile.read(chunksize)
+            buffer = buffer + chunk
+            consumed = 0
+            for section, start, end in tokenizeoffsets(buffer):
+                consumed = end + 3
+                if section in types:
+                    yield section, _decode(
+                        buffer[start:end], delim, attributes, FIELDTYPES.get(section)
+                    )
+            if not chunk:
+                return
+            buffer = buffer[consumed:]
+
+
+# Nag attributes that are not parsed from the files, left out of snapshots
+_NAGRUNTIME = ("nag", "hosts", "services", "config", "importantservicegroups")
+
+
+def dumpsnapshot(nag):
+    """Turn a parsed Nag into plain data for an on-disk snapshot.
+
+    Objects are stored as rows of attribute values, grouped by the tuple of
+    their attribute names. Objects parsed with LAZY_ATTRIBUTES keep their
+    raw block instead of being decoded.
+
+    Args:
+        nag (Nag): Snapshot returned by NagParser.parse()
+
+    Returns:
+        dict: Payload for snapshot.writesnapshot(), see loadsnapshot()
+    """
+    groups = {}
+    objects = []
+    for section, targets in (
+        ("hoststatus", nag.hosts),
+        ("servicestatus", nag.services),
+        ("define servicegroup", nag._servicegroups),
+    ):
+        rows = []
+        for temp in targets or []:
+            names = []
+            values = []
+            for name, value in temp._attributeitems():
+                if name != "nag" and not name.startswith("_"):
+                    names.append(name)
+                    values.append(value)
+            names = tuple(names)
+            group = groups.setdefault(names, len(groups))
+            rawblock = getattr(temp, "_rawblock", None)
+            rows.append(
+                (group, tuple(values), None if rawblock is None else rawblock.body)
+            )
+        objects.append((section, rows))
+
+    return {
+        "nag": [
+            (name, value)
+            for name, value in nag.__dict__.items()
+            if name not in _NAGRUNTIME and not name.startswith("_")
+        ],
+        "groups": [names for names, _ in sorted(groups.items(), key=lambda x: x[1])],
+        "objects": objects,
+    }
+
+
+def loadsnapshot(payload, config):
+    """Build a Nag from the payload of an on-disk snapshot.
+
+    Args:
+        payload (dict): Data returned by dumpsnapshot()
+        config (NagConfig): Configuration of the parse
+
+    Returns:
+        Nag: New snapshot, as parse() would have returned it
+    """
+    nag = Nag()
     nag.config = config
+    nag.__dict__.update(payload["nag"])
+    groups = payload["groups"]
+    targets = {}
+    schemas = {}
 
-    if len(hosts):
-        nag.hosts = NagList(hosts)
-    if len(services):
-        nag.services = NagList(services)
-    if len(servicegroups):
-        nag._servicegroups = NagList(servicegroups)
+    for section, rows in payload["objects"]:
+        factory = FACTORIES[section]
+        compact = getcompactfactory(config, factory)
+        delim = DELIMITERS[".cache" if section in SECTIONS[".cache"] else ".dat"]
+        fieldtypes = FIELDTYPES.get(section)
+        targets[factory] = built = []
+        for group, values, rawbody in rows:
+            rawblock = None
+            if rawbody is not None:
+                rawblock = LazyBlock(rawbody, delim, fieldtypes)
+            attrs = zip(groups[group], values)
+            built.append(_newobject(factory, nag, attrs, compact, schemas, rawblock))
 
+    nag.importantservicegroups = config.IMPORTANTSERVICEGROUPS
+
+    if targets.get(Host):
+        nag.hosts = NagList(targets[Host])
+    if targets.get(Service):
+        nag.services = NagList(targets[Service])
+    if targets.get(ServiceGroup):
+        nag._servicegroups = NagList(targets[ServiceGroup])
+    nag.reindex()
     return nag
 
 
+def _adopt(temp, nag):
+    """Move an object from a previous snapshot over to a new Nag."""
+    temp.nag = nag
+    if isinstance(temp, ServiceGroup):
+        # Resolved members point at the objects of the previous snapshot
+        temp._hostsandservices = None
+
+
+def _newobject(factory, nag, attrs, compact=None, schemas=None, rawblock=None):
+    """Create the object of a block from its decoded attributes."""
+    if compact is not None:
+        return compact.fromattributes(nag, attrs, schemas)
+    temp = factory(nag)
+    temp.__dict__.update(attrs)
+    if rawblock is not None:
+        temp._rawblock = rawblock
+    return temp
+
+
+def _decode(body, delim, keep, fieldtypes, pool=None):
+    """Decode a block in full, or only the attributes in keep."""
+    if keep is None:
+        return decodeblock(totext(body), delim, fieldtypes, pool)
+    return decodeselected(body, delim, keep, fieldtypes, pool)
+
+
+def getchunkbounds(content, count):
+    """Split the content of a data file into chunks at block boundaries.
+
+    Args:
+        content (bytes or mmap): Full content of a data file
+        count (int): Number of chunks wanted
+
+    Returns:
+        list: (start, end) offsets of at most count chunks covering the
+              content, each ending right after the closing line of a block
+    """
+    size = len(content)
+    bounds = []
+    start = 0
+    for i in range(1, count):
+        end = content.find(b"\n\t}\n", max(size * i // count, start))
+        if end < 0:
+            break
+        end += 4
+        bounds.append((start, end))
+        start = end
+    if start < size:
+        bounds.append((start, size))
+    return bounds
+
+
+def decodechunk(
+    filename, start, end, kind, keeps, lazy, blockfilter, pool=False, signature=None
+):
+    """Decode the blocks in one chunk of a data file, in a worker process.
+
+    Args:
+        filename (str): Path to the file
+        start (int): Offset of the chunk, see getchunkbounds()
+        end (int): Offset right after the chunk
+        kind (str): '.cache' or '.dat', see getfilekind()
+        keeps (dict): Block type -> result of getkeptattributes()
+        lazy (tuple): Block types decoded lazily, see NagConfig.LAZY_ATTRIBUTES
+        blockfilter (BlockFilter or None): Filter of the parse
+        pool (bool): Share equal str values within the chunk, see
+            NagConfig.POOL_VALUES
+        signature (tuple, optional): Signature of the version of the file the
+            chunk offsets were taken from, see getfilesignature()
+
+    Returns:
+        tuple or None: (groups, sectionrows) where groups is a list of
+               attribute name tuples and sectionrows maps each block type of
+               SECTIONS[kind] to rows of (digest, volatile, group, values,
+               rawbody). digest identifies the block body apart from its
+               VOLATILEATTRIBUTE across processes, volatile is the value of
+               that attribute (see splitvolatile()), and rawbody is only set
+               for objects decoded lazily. None if the file at
+               filename is no longer the version given by signature.
+    """
+    with open(filename, "rb") as tempfile:
+        if signature is not None:
+            if statsignature(os.fstat(tempfile.fileno())) != signature:
+                return None
+        tempfile.seek(start)
+        content = tempfile.read(end - start)
+
+    delim = DELIMITERS[kind]
+    pool = {} if pool else None
+    groups = {}
+    sectionrows = dict((section, []) for section in SECTIONS[kind])
+    for section, blockstart, blockend in tokenizeoffsets(content):
+        if section not in sectionrows:
+            continue
+        body = content[blockstart:blockend]
+        if blockfilter is not None and not blockfilter.accepts(section, body, delim):
+            continue
+
+        factory = FACTORIES[section]
+        fieldtypes = FIELDTYPES.get(section)
+        keep = keeps[section]
+        digest = None
+        volatile = None
+        rawbody = None
+        if factory is not None:
+            rest, volatile = splitvolatile(body, delim, fieldtypes)
+            digest = hashlib.blake2b(rest, digest_size=16).digest()
+            if keep is not None and VOLATILEATTRIBUTE not in keep:
+                volatile = None
+        if section in lazy and keep is None:
+            rawbody = totext(body)
+            required = REQUIREDATTRIBUTES[section]
+            attrs = decodeselected(rawbody, delim, required, fieldtypes, pool)
+        else:
+            attrs = _decode(body, delim, keep, fieldtypes, pool)
+
+        names = tuple(attrs)
+        group = groups.setdefault(names, len(groups))
+        values = tuple(attrs.values())
+        sectionrows[section].append((digest, volatile, group, values, rawbody))
+
+    groups = [names for names, _ in sorted(groups.items(), key=lambda x: x[1])]
+    return groups, sectionrows
+
+
+def decodeparallel(filename, kind, config, blockfilter=None):
+    """Decode the blocks of a data file in worker processes.
+
+    The file is split into chunks at block boundaries, which are decoded by
+    NagConfig.PARALLEL_WORKERS processes, see decodechunk(). The workers open
+    the file by path again, so they check that it is still the version the
+    boundaries were taken from; if it was replaced in the meantime (Nagios
+    renames a new status.dat over the old one), nothing is decoded and the
+    caller has to parse the file serially.
+
+    Args:
+        filename (str): Path to the file
+        kind (str): '.cache' or '.dat', see getfilekind()
+        config (NagConfig): Configuration of the parse
+        blockfilter (BlockFilter, optional): Filter of the parse
+
+    Returns:
+        list or None: (section, rows) for each block type of SECTIONS[kind],
+                      in that order, where rows are (digest, volatile, names,
+                      values, rawbody) in file order; None if the file changed while
+                      it was being decoded
+    """
+    workers = config.PARALLEL_WORKERS
+    with open(filename, "rb") as tempfile:
+        signature = statsignature(os.fstat(tempfile.fileno()))
+        if signature[2] == 0:
+            return None
+        with mmap.mmap(tempfile.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            bounds = getchunkbounds(content, workers * 4)
+
+    keeps = dict((x, getkeptattributes(config, x)) for x in SECTIONS[kind])
+    lazy = ()
+    if config.LAZY_ATTRIBUTES:
+        lazy = tuple(
+            x
+            for x in SECTIONS[kind]
+            if FACTORIES[x] is not None
+            and getcompactfactory(config, FACTORIES[x]) is None
+        )
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                decodechunk,
+                filename,
+                start,
+                end,
+                kind,
+                keeps,
+                lazy,
+                blockfilter,
+                config.POOL_VALUES,
+                signature,
+            )
+            for start, end in bounds
+        ]
+        results = [x.result() for x in futures]
+    if any(x is None for x in results):
+        return None
+
+    decoded = []
+    for section in SECTIONS[kind]:
+        rows = []
+        for groups, sectionrows in results:
+            rows.extend(
+                (digest, volatile, groups[group], values, rawbody)
+                for digest, volatile, group, values, rawbody in sectionrows[section]
+            )
+        decoded.append((section, rows))
+    return decoded
+
+
+def isparallel(config, kind, size):
+    """Check whether a file is decoded by decodeparallel().
+
+    Args:
+        config (NagConfig): Configuration of the parse
+        kind (str): '.cache' or '.dat', see getfilekind()
+        size (int): Size of the file in bytes
+
+    Returns:
+        bool: True for status files of at least PARALLEL_THRESHOLD bytes when
+              PARALLEL_WORKERS is more than 1
+    """
+    return (
+        kind == ".dat"
+        and config.PARALLEL_WORKERS > 1
+        and size > 0
+        and size >= config.PARALLEL_THRESHOLD
+    )
+
+
+# Number of parses running with the garbage collector paused, and whether it
+# was enabled before the first of them, see pausedgc()
+_GCPAUSES = [0, False]
+_GCLOCK = threading.Lock()
+
+
+@contextmanager
+def pausedgc(pause=True):
+    """Disable the cyclic garbage collector for the duration of a parse.
+
+    A parse allocates a large number of objects that all stay alive, which
+    would otherwise trigger many collections scanning them to no avail. The
+    collector is enabled again when the last of the concurrent parses that
+    paused it is done, unless it was already disabled before.
+
+    Args:
+        pause (bool): False to leave the collector alone, see NagConfig.PAUSE_GC
+    """
+    if not pause:
+        yield
+        return
+
+    with _GCLOCK:
+        if _GCPAUSES[0] == 0:
+            _GCPAUSES[1] = gc.isenabled()
+            gc.disable()
+        _GCPAUSES[0] += 1
+    try:
+        yield
+    finally:
+        with _GCLOCK:
+            _GCPAUSES[0] -= 1
+            if _GCPAUSES[0] == 0 and _GCPAUSES[1]:
+                gc.enable()
+
+
+class _SnapshotBuilder(object):
+    """Objects of a NagParser.parse() in progress.
+
+    Collects the objects of the new snapshot by type and by file, taking
+    those of unchanged blocks from the previous parse, see NagParser.
+    Objects taken over are only moved to the new Nag by finish(), once every
+    file has been read, so a parse that fails leaves the previous snapshot
+    as it was.
+
+    Args:
+        nag (Nag): The new snapshot
+        previousblocks (dict): (section, digest) -> object of the previous
+            parse; not changed
+        blockfilter (BlockFilter or None): Filter of the parse
+    """
+
+    def __init__(self, nag, previousblocks, blockfilter):
+        self.nag = nag
+        self.previousblocks = dict(previousblocks)
+        self.blockfilter = blockfilter
+        self.blocks = {}
+        self.fileobjects = {}
+        self.targets = {Host: [], Service: [], ServiceGroup: []}
+        self._objects = None
+        self._reused = []
+
+    def startfile(self, filename):
+        """Collect the objects added from now on as those of a file."""
+        self._objects = self.fileobjects[filename] = []
+
+    def reuse(self, key, volatile=None):
+        """Take the object of an unchanged block from the previous parse.
+
+        Args:
+            key (tuple): (section, digest) of the block
+            volatile (optional): New value of the VOLATILEATTRIBUTE of the
+                block, set on the object by finish(); None leaves it alone
+
+        Returns:
+            object or None: The object, or None if the block is new
+        """
+        temp = self.previousblocks.pop(key, None)
+        if temp is not None:
+            self._reused.append((temp, volatile))
+        return temp
+
+    def add(self, factory, key, temp):
+        """Add the object of a block of the current file to the snapshot.
+
+        Args:
+            factory (type): Model class of the block type, see FACTORIES
+            key (tuple): (section, digest) of the block
+            temp (object): The new or reused object
+        """
+        if self.blockfilter is not None and factory is ServiceGroup:
+            self.blockfilter.addservicegroup(temp.members)
+        self.blocks[key] = temp
+        self._objects.append(temp)
+        self.targets[factory].append(temp)
+
+    def reusefile(self, filename, objects):
+        """Carry over the objects of an unchanged objects.cache file.
+
+        Args:
+            filename (str): Path to the file
+            objects (list): ServiceGroup objects of the file in the previous
+                parse
+        """
+        self.fileobjects[filename] = objects
+        blockfilter = self.blockfilter
+        for temp in objects:
+            if blockfilter is not None:
+                if not blockfilter.acceptsservicegroup(temp.servicegroup_name):
+                    continue
+                blockfilter.addservicegroup(temp.members)
+            self._reused.append((temp, None))
+            self.targets[type(temp)].append(temp)
+
+    def finish(self):
+        """Move the objects taken from the previous parse to the new Nag."""
+        nag = self.nag
+        for temp, volatile in self._reused:
+            _adopt(temp, nag)
+            if volatile is not None:
+                setattr(temp, VOLATILEATTRIBUTE, volatile)
+        self._reused = []
+
+
+class NagParser(object):
+    """Stateful parser that reuses objects from its previous snapshot.
+
+    Every call to parse() builds a new Nag, but Host and Service objects whose
+    status block did not change since the previous call are carried over
+    instead of being rebuilt, keeping their identity. The last_update line
+    Nagios rewrites in every block is left out of that comparison, and its
+    new value is set on the objects carried over. The ServiceGroups of an
+    objects.cache file are carried over as a whole while the file's inode,
+    mtime and size stay the same, and the file is not read at all.
+
+    Carried over objects are re-pointed at the new Nag, so the previous
+    snapshot should be considered superseded once parse() returns. That
+    only happens once every file has been read: a parse() that raises
+    leaves the previous snapshot, and the nag attribute, as they were.
+
+    With NagConfig.LAZY_ATTRIBUTES set, hosts, services and service groups
+    only decode their REQUIREDATTRIBUTES (those used for status and name
+    lookups) while parsing. They keep the raw text of their block and decode
+    any other attribute the first time it is read.
+
+    Block types listed in NagConfig.KEEP_ATTRIBUTES only get the listed
+    attributes plus their REQUIREDATTRIBUTES; the other lines of the block
+    are never split or converted, and are not available later either.
+
+    With NagConfig.CACHE_OBJECTS set, objects.cache files are decoded through
+    the process-wide OBJECTCACHE, so every parser and parse() call in the
+    process shares one read and decode of each version of the file. Only the
+    ServiceGroup objects are built for every snapshot, from a copy of the
+    cached attributes; LAZY_ATTRIBUTES does not apply to them.
+
+    With NagConfig.SNAPSHOT_CACHE set, every parse that reads the text files
+    writes the snapshot to that path, and a parse whose input files and
+    options match the stored snapshot loads it instead of reading the files,
+    see dumpsnapshot() and the snapshot module.
+
+    Status files of at least NagConfig.PARALLEL_THRESHOLD bytes are decoded
+    by NagConfig.PARALLEL_WORKERS processes when that is more than 1, see
+    decodeparallel(). Objects are carried over between parallel parses too,
+    but not between a parallel and a serial one.
+
+    With NagConfig.COMPACT_OBJECTS set, hosts and services are built as
+    CompactHost and CompactService objects, which keep their attributes in a
+    row with a shared schema rather than in an instance dictionary. They are
+    decoded in full, LAZY_ATTRIBUTES does not apply to them.
+
+    NagConfig.HOST_FILTER, SERVICEGROUP_FILTER and STATE_FILTER drop blocks
+    before any object is created for them, see BlockFilter. objects.cache
+    files are parsed first so that service group membership is known before
+    the status blocks are read.
+
+    With NagConfig.WEAK_REFERENCES set, objects refer to their Nag through a
+    weak reference. A snapshot then holds no reference cycles and is freed
+    by reference counting as soon as its Nag is dropped, rather than by a
+    later run of the cyclic garbage collector. The parser keeps its latest
+    Nag alive. NagConfig.PAUSE_GC disables that collector while parsing,
+    see pausedgc(); by default only along with WEAK_REFERENCES, since with
+    strong references the collector is what frees the dropped snapshots.
+
+    Args:
+        config (NagConfig): Configuration object with the files to parse
+
+    Example:
+        >>> parser = NagParser(config)
+        >>> nag = parser.parse()
+        >>> # ... some time later
+        >>> nag = parser.parse()  # only changed blocks are decoded again
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.nag = None
+        self._blocks = {}
+        self._filesignatures = {}
+        self._fileobjects = {}
+
+    def parse(self):
+        """Parse the configured files, reusing unchanged objects.
+
+        Returns:
+            Nag: The new snapshot, also available as the nag attribute
+        """
+        pause = self.config.PAUSE_GC
+        if pause is None:
+            pause = self.config.WEAK_REFERENCES
+        with pausedgc(pause):
+            return self._parse()
+
+    def _parse(self):
+        config = self.config
+        # Set first, the objects check NagConfig.WEAK_REFERENCES on it
+        nag = Nag()
+        nag.config = config
+        blockfilter = getblockfilter(config)
+        builder = _SnapshotBuilder(nag, self._blocks, blockfilter)
+        schemas = {}
+        pool = {} if config.POOL_VALUES else None
+
+        # Service groups first, their membership is needed by the filters
+        files = sorted(config.files, key=lambda x: getfilekind(x) != ".cache")
+        filesignatures = {}
+        for filename in files:
+            filesignatures[filename] = getfilesignature(filename)
+
+        snapshotkey = None
+        if config.SNAPSHOT_CACHE:
+            snapshotkey = snapshot.getsnapshotkey(
+                config, [(x, filesignatures[x]) for x in files], getschemadigest()
+            )
+            payload = snapshot.readsnapshot(config.SNAPSHOT_CACHE, snapshotkey)
+            loaded = None
+            if payload is not None:
+                try:
+                    loaded = loadsnapshot(payload, config)
+                except Exception:
+                    # A payload of an unexpected shape is as unusable as a
+                    # corrupt file, the text files are parsed instead
+                    loaded = None
+            if loaded is not None:
+                self.nag = loaded
+                self._blocks = {}
+                self._filesignatures = {}
+                self._fileobjects = {}
+                return loaded
+
+        for filename in files:
+            kind = getfilekind(filename)
+            signature = filesignatures[filename]
+
+            if (
+                kind == ".cache"
+                and self._filesignatures.get(filename) == signature
+                and filename in self._fileobjects
+            ):
+                builder.reusefile(filename, self._fileobjects[filename])
+                continue
+
+            decoded = None
+            if isparallel(config, kind, signature[2]):
+                decoded = decodeparallel(filename, kind, config, blockfilter)
+            if decoded is not None:
+                delim = DELIMITERS[kind]
+                builder.startfile(filename)
+                for section, rows in decoded:
+                    factory = FACTORIES[section]
+                    compact = getcompactfactory(config, factory)
+                    fieldtypes = FIELDTYPES.get(section)
+                    for digest, volatile, names, values, rawbody in rows:
+                        if factory is None:
+                            nag.__dict__.update(zip(names, values))
+                            continue
+
+                        key = (section, digest)
+                        temp = builder.reuse(key, volatile)
+                        if temp is None:
+                            rawblock = None
+                            if rawbody is not None:
+                                rawblock = LazyBlock(rawbody, delim, fieldtypes)
+                            attrs = zip(names, values)
+                            temp = _newobject(
+                                factory, nag, attrs, compact, schemas, rawblock
+                            )
+                        builder.add(factory, key, temp)
+                continue
+
+            cached = decodecached(filename, kind, signature, config)
+            if cached is not None:
+                builder.startfile(filename)
+                for section, digest, attrs in cached:
+                    factory = FACTORIES[section]
+                    if factory is ServiceGroup and blockfilter is not None:
+                        name = attrs.get("servicegroup_name")
+                        if not blockfilter.acceptsservicegroup(name):
+                            continue
+                    if factory is None:
+                        nag.__dict__.update(attrs)
+                        continue
+
+                    key = (section, digest)
+                    temp = builder.reuse(key)
+                    if temp is None:
+                        temp = _newobject(factory, nag, attrs)
+                    builder.add(factory, key, temp)
+                continue
+
+            with openfile(filename, config.MMAP_FILES) as content:
+                delim = DELIMITERS[kind]
+                sectionnames = SECTIONS[kind]
+
+                # Only the offsets are kept, bodies are sliced out one at a time
+                sectionblocks = dict((section, []) for section in sectionnames)
+                for section, start, end in tokenizeoffsets(content):
+                    if section in sectionblocks:
+                        sectionblocks[section].append((start, end))
+
+                builder.startfile(filename)
+                for section in sectionnames:
+                    factory = FACTORIES[section]
+                    compact = getcompactfactory(config, factory)
+                    fieldtypes = FIELDTYPES.get(section)
+                    keep = getkeptattributes(config, section)
+                    lazy = config.LAZY_ATTRIBUTES and keep is None and compact is None
+                    kept = keep is None or VOLATILEATTRIBUTE in keep
+                    for start, end in sectionblocks[section]:
+                        body = content[start:end]
+                        if blockfilter is not None and not blockfilter.accepts(
+                            section, body, delim
+                        ):
+                            continue
+                        if factory is None:
+                            nag.__dict__.update(_decode(body, delim, keep, fieldtypes))
+                            continue
+
+                        rest, volatile = splitvolatile(body, delim, fieldtypes)
+                        key = (section, hash(rest))
+                        temp = builder.reuse(key, volatile if kept else None)
+                        if temp is None and lazy:
+                            block = LazyBlock(totext(body), delim, fieldtypes)
+                            required = REQUIREDATTRIBUTES[section]
+                            attrs = block.decodeselected(required, pool)
+                            temp = _newobject(factory, nag, attrs, rawblock=block)
+                        elif temp is None:
+                            attrs = _decode(body, delim, keep, fieldtypes, pool)
+                            temp = _newobject(factory, nag, attrs, compact, schemas)
+                        builder.add(factory, key, temp)
+
+        builder.finish()
+        nag.importantservicegroups = config.IMPORTANTSERVICEGROUPS
+
+        targets = builder.targets
+        if len(targets[Host]):
+            nag.hosts = NagList(targets[Host])
+        if len(targets[Service]):
+            nag.services = NagList(targets[Service])
+        if len(targets[ServiceGroup]):
+            nag._servicegroups = NagList(targets[ServiceGroup])
+        nag.reindex()
+
+        if snapshotkey is not None:
+            snapshot.writesnapshot(
+                config.SNAPSHOT_CACHE, snapshotkey, dumpsnapshot(nag)
+            )
+
+        self.nag = nag
+        self._blocks = builder.blocks
+        self._filesignatures = filesignatures
+        self._fileobjects = builder.fileobjects
+
+        return nag
+
+
 if __name__ == "__main__":
     pass
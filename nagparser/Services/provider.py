@@ -0,0 +1,128 @@
+import threading
+import time
+
+from nagparser.Services import snapshot
+from nagparser.Services.nagfactory import parse, getsignatures
+
+
+class _Entry(object):
+    """Latest snapshot of one set of files, see SnapshotProvider."""
+
+    __slots__ = ("lock", "state")
+
+    def __init__(self):
+        # Held while checking the files and parsing them, so that only one
+        # caller parses while the others wait for its snapshot
+        self.lock = threading.Lock()
+        # (nag, signatures, time the signatures were checked), replaced as
+        # a whole so that it can be read without the lock
+        self.state = None
+
+
+# NagConfig options read through Nag.config after the parse, e.g. to evaluate
+# a status, which configs sharing a snapshot have to agree on
+STATUS_OPTIONS = (
+    "STALE_THRESHOLD",
+    "IGNORE_STALE_DATA",
+    "REQUIRE_HARD_SERVICE_STATUS",
+    "IMPORTANTSERVICEGROUPS",
+    "NAGIOS_CMD_FILE",
+    "WEAK_REFERENCES",
+)
+
+
+class SnapshotProvider(object):
+    """Share one snapshot of the same files between concurrent callers.
+
+    get() returns the latest snapshot of the files of a NagConfig. When the
+    files changed, the first caller parses them while the others wait for
+    that parse and get its snapshot, instead of each parsing the files on
+    its own. Snapshots are built with parse(), so a snapshot handed out is
+    never modified afterwards; callers must not modify it either, since
+    other threads use it at the same time. Nag.evaluateat() is safe, it
+    pins the clock for the calling thread only.
+
+    Snapshots are shared between configs with the same files (by absolute
+    path), the same parse options (the ones in the key of
+    NagConfig.SNAPSHOT_CACHE) and the same options the objects read from
+    their NagConfig later on (STATUS_OPTIONS), so the status of a shared
+    snapshot is the one the caller's own parse would give.
+
+    Args:
+        maxstaleness (float): Seconds a snapshot is handed out without
+            checking the (inode, mtime, size) of its files. 0 checks them on
+            every call.
+
+    Attributes:
+        maxstaleness (float): See Args
+
+    Example:
+        >>> provider = SnapshotProvider(maxstaleness=5)
+        >>> def view(request):
+        ...     nag = provider.get(config)
+        ...     return nag.genoutput()
+    """
+
+    def __init__(self, maxstaleness=0):
+        self.maxstaleness = maxstaleness
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def getkey(self, config):
+        """Get the key the snapshots of a config are shared under.
+
+        Args:
+            config (NagConfig): Configuration of the caller
+
+        Returns:
+            tuple: Absolute paths of the files, the parse options and the
+                   STATUS_OPTIONS
+        """
+        files = [(x, ()) for x in config.files]
+        options = tuple(repr(getattr(config, x)) for x in STATUS_OPTIONS)
+        return snapshot.getsnapshotkey(config, files) + (options,)
+
+    def get(self, config):
+        """Get the latest snapshot of the files of a config.
+
+        Args:
+            config (NagConfig): Configuration with the files to parse
+
+        Returns:
+            Nag: The snapshot, shared with the other callers
+
+        Raises:
+            IOError: If a file can not be read; the previous snapshot is
+                     kept for the next call
+        """
+        key = self.getkey(config)
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.setdefault(key, _Entry())
+
+        state = entry.state
+        if state is not None and time.time() - state[2] <= self.maxstaleness:
+            return state[0]
+
+        with entry.lock:
+            # Another caller may have checked or parsed while this one waited
+            state = entry.state
+            checked = time.time()
+            if state is not None and checked - state[2] <= self.maxstaleness:
+                return state[0]
+
+            signatures = getsignatures(config)
+            if state is not None and state[1] == signatures:
+                nag = state[0]
+            else:
+                nag = parse(config)
+                # Build the index before other threads use the snapshot
+                nag.getindex()
+            entry.state = (nag, signatures, checked)
+            return nag
+
+    def clear(self):
+        """Drop all snapshots; the next get() of every config parses again."""
+        with self._lock:
+            self._entries = {}
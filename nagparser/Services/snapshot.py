@@ -0,0 +1,117 @@
+import marshal
+import os
+import sys
+import tempfile
+
+
+# First line of every snapshot file. Bump FORMATVERSION whenever the layout
+# of the payload changes; files with another header are ignored.
+FORMATVERSION = 1
+HEADER = b"NAGPARSER SNAPSHOT %d\n" % FORMATVERSION
+
+# Payloads are written with marshal, whose format depends on the Python
+# version, so the version is part of every key.
+MARSHALVERSION = 4
+
+
+def _describefilter(value):
+    """Turn a filter option into something that can be compared and stored."""
+    if value is None or isinstance(value, str):
+        return value
+    if hasattr(value, "pattern"):
+        return (value.pattern, value.flags)
+    return tuple(sorted(value))
+
+
+def getsnapshotkey(config, signatures, schema=None):
+    """Build the key a snapshot of a parse is stored under.
+
+    The key covers the version of every input file, the options that
+    change what a parse produces and the schema of the parser, so a
+    snapshot is only used when parsing the files again would give the same
+    result.
+
+    Args:
+        config (NagConfig): Configuration of the parse
+        signatures (list): (filename, signature) for every input file, see
+            nagfactory.getfilesignature()
+        schema (str, optional): Digest of the tables of the parser, see
+            nagfactory.getschemadigest()
+
+    Returns:
+        tuple: The key, made of str, int, float and None values only
+    """
+    keep = config.KEEP_ATTRIBUTES
+    return (
+        tuple(sys.version_info[:2]),
+        schema,
+        tuple((os.path.abspath(x),) + tuple(signature) for x, signature in signatures),
+        tuple((section, tuple(keep[section])) for section in sorted(keep)),
+        bool(config.LAZY_ATTRIBUTES),
+        bool(config.COMPACT_OBJECTS),
+        _describefilter(config.HOST_FILTER),
+        _describefilter(config.SERVICEGROUP_FILTER),
+        _describefilter(config.STATE_FILTER),
+    )
+
+
+def readsnapshot(path, key):
+    """Read the payload of a snapshot file.
+
+    Any problem with the file (missing, unreadable, written by another
+    format version, corrupt, or stored under another key) is not an error;
+    the caller is expected to parse the text files instead.
+
+    Args:
+        path (str): Path to the snapshot file
+        key (tuple): Key the snapshot has to match, see getsnapshotkey()
+
+    Returns:
+        object or None: The stored payload, or None if it can not be used
+    """
+    try:
+        with open(path, "rb") as snapshotfile:
+            if snapshotfile.readline() != HEADER:
+                return None
+            storedkey, payload = marshal.loads(snapshotfile.read())
+    except Exception:
+        return None
+    if storedkey != key:
+        return None
+    return payload
+
+
+def writesnapshot(path, key, payload):
+    """Write a snapshot file, replacing the previous one atomically.
+
+    The file is written next to path under a temporary name and then moved
+    in place, so readers never see a partial file. Failing to write the
+    snapshot does not fail the parse it belongs to.
+
+    Args:
+        path (str): Path to the snapshot file
+        key (tuple): Key of the snapshot, see getsnapshotkey()
+        payload (object): Data to store; str, int, float, None, tuples,
+            lists and dicts of those only
+
+    Returns:
+        bool: True if the snapshot was written
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        handle, temppath = tempfile.mkstemp(dir=directory, prefix=".nagsnapshot")
+    except (IOError, OSError):
+        return False
+
+    try:
+        with os.fdopen(handle, "wb") as snapshotfile:
+            snapshotfile.write(HEADER)
+            snapshotfile.write(marshal.dumps((key, payload), MARSHALVERSION))
+        os.replace(temppath, path)
+    except (IOError, OSError, ValueError):
+        try:
+            os.remove(temppath)
+        except OSError:
+            pass
+        return False
+    return True
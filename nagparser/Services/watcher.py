@@ -0,0 +1,172 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from nagparser.Services.nagfactory import parse, getsignatures
+from nagparser.Services.nagdiff import diff
+
+
+class StatusWatcher(object):
+    """Keep the latest snapshot of the configured files in memory.
+
+    The watcher checks the (inode, mtime, size) of every file in
+    NagConfig.files every interval seconds. The files are parsed again only
+    when one of them changed. Each new snapshot is compared with the
+    previous one (see diff()), and the subscribers are called with the
+    resulting NagDiff on a thread pool, so a slow subscriber does not delay
+    the next poll.
+
+    Every snapshot is built by parse() rather than a NagParser, so a
+    snapshot handed out by the watcher is never changed by a later poll and
+    can be kept for as long as needed.
+
+    Services go stale without their files changing. Unless
+    NagConfig.IGNORE_STALE_DATA is set, a poll that finds the files
+    unchanged compares the latest snapshot with itself as of the previous
+    poll, so the subscribers hear about services that went stale in
+    between; changes.old and changes.new are then the same Nag.
+
+    A poll that fails, e.g. because Nagios is rotating status.dat, keeps
+    the previous snapshot; the exception is kept in the error attribute and
+    the files are tried again on the next poll.
+
+    Args:
+        config (NagConfig): Configuration with the files to watch
+        interval (float): Seconds between two checks of the files
+        workers (int): Number of threads running the subscribers
+
+    Attributes:
+        config (NagConfig): Configuration with the files to watch
+        interval (float): Seconds between two checks of the files
+        nag (Nag): The latest snapshot, None before the first parse
+        error (Exception): Exception of the last poll, None if it succeeded
+
+    Example:
+        >>> watcher = StatusWatcher(config, interval=5)
+        >>> @watcher.subscribe
+        ... def alert(changes):
+        ...     for transition in changes.transitions:
+        ...         print(transition.service.name, transition.newstatus)
+        >>> watcher.start()
+        >>> nag = watcher.nag  # always the latest snapshot
+    """
+
+    def __init__(self, config, interval=10, workers=4):
+        self.config = config
+        self.interval = interval
+        self.nag = None
+        self.error = None
+        self._signatures = None
+        self._evaluated = None
+        self._subscribers = []
+        self._polllock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """Call a function with the changes found by every poll.
+
+        Callbacks run on the thread pool of the watcher. Callbacks for two
+        consecutive snapshots may run at the same time when the first one is
+        slower than the poll interval. Exceptions raised by a callback are
+        ignored.
+
+        Args:
+            callback (callable): Called with a NagDiff from the previous to
+                the latest snapshot, see the class docstring
+
+        Returns:
+            callable: The callback, so that subscribe can be used as a decorator
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        """Stop calling a function subscribed with subscribe()."""
+        self._subscribers.remove(callback)
+
+    def poll(self):
+        """Parse the files if they changed since the last poll.
+
+        Called by the thread started with start(); can also be called
+        directly to drive the watcher from an existing loop.
+
+        Returns:
+            bool: True if a new snapshot was parsed
+        """
+        with self._polllock:
+            try:
+                signatures = getsignatures(self.config)
+                if signatures == self._signatures:
+                    self.error = None
+                    if not self.config.IGNORE_STALE_DATA:
+                        self._notify(self.nag, self.nag)
+                    return False
+                nag = parse(self.config)
+            except Exception as error:
+                self.error = error
+                return False
+
+            previous = self.nag
+            self.nag = nag
+            self._signatures = signatures
+            self.error = None
+            self._notify(previous, nag)
+            return True
+
+    def _notify(self, previous, nag):
+        # Statuses of the previous snapshot are taken as of the previous
+        # poll, which is when the subscribers last heard about them
+        now = time.time()
+        evaluated, self._evaluated = self._evaluated, now
+        if previous is None or not self._subscribers:
+            return
+        changes = diff(previous, nag, evaluated, now)
+        if changes.changed:
+            for callback in list(self._subscribers):
+                self._executor.submit(callback, changes)
+
+    def start(self):
+        """Parse the files and keep polling them in a background thread.
+
+        The first poll happens before start() returns, so nag is set unless
+        it failed.
+
+        Returns:
+            StatusWatcher: The watcher itself
+        """
+        if self._thread is None:
+            self._stopped.clear()
+            self.poll()
+            self._thread = threading.Thread(
+                target=self._run, name="StatusWatcher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        """Stop polling, and shut down the thread pool of the subscribers.
+
+        A stopped watcher can not be started again.
+
+        Args:
+            wait (bool): If True, wait for the polling thread and for the
+                subscribers still running
+        """
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and wait:
+            thread.join()
+        self._executor.shutdown(wait=wait)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.poll()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,4 +1,8 @@
-from .Services.nagfactory import parse
+from .Services.nagfactory import parse, NagParser, iterblocks
+from .Services.nagdiff import diff
+from .Services.watcher import StatusWatcher
+from .Services.nagasync import aparse, awatch
+from .Services.provider import SnapshotProvider
 from .Services.nicetime import getnicetimefromdatetime, getdatetimefromnicetime
 
 from .Model.NagConfig import NagConfig
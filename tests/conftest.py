@@ -1,5 +1,6 @@
 """Pytest configuration and shared fixtures for NagParser tests."""
 import os
+import shutil
 import pytest
 from nagparser import parse, NagConfig
 
@@ -11,16 +12,35 @@ def testdata_dir():
 
 
 @pytest.fixture
-def test_nagconfig(testdata_dir):
+def make_nagconfig(testdata_dir):
+    """Return a factory creating NagConfig instances with test data files.
+
+    The factory takes NagConfig options as keyword arguments, plus:
+        copyto: Directory to copy the files to first, so they can be changed
+        names: Names of the test data files, in the order they are listed
+    """
+
+    def factory(copyto=None, names=("test_objects.cache", "test_status.dat"), **options):
+        files = []
+        for name in names:
+            path = os.path.join(testdata_dir, name)
+            if copyto is not None:
+                path = shutil.copy(path, str(copyto))
+            files.append(path)
+        nagconfig = NagConfig(files)
+        # Ignore stale data since we're using old timestamps in test data
+        nagconfig.IGNORE_STALE_DATA = True
+        for name, value in options.items():
+            setattr(nagconfig, name, value)
+        return nagconfig
+
+    return factory
+
+
+@pytest.fixture
+def test_nagconfig(make_nagconfig):
     """Create a NagConfig instance with test data files."""
-    files = [
-        os.path.join(testdata_dir, "test_objects.cache"),
-        os.path.join(testdata_dir, "test_status.dat"),
-    ]
-    nagconfig = NagConfig(files)
-    # Ignore stale data since we're using old timestamps in test data
-    nagconfig.IGNORE_STALE_DATA = True
-    return nagconfig
+    return make_nagconfig()
 
 
 @pytest.fixture
@@ -0,0 +1,114 @@
+"""Tests for the asyncio API (aparse and awatch)."""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from nagparser import aparse, awatch
+from nagparser.Services import nagasync
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool counting the calls submitted to it."""
+
+    def __init__(self):
+        super(CountingExecutor, self).__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super(CountingExecutor, self).submit(*args, **kwargs)
+
+
+@pytest.fixture
+def executor():
+    executor = CountingExecutor()
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def watchedconfig(make_nagconfig, tmp_path):
+    """Create a NagConfig on copies of the test data."""
+    return make_nagconfig(copyto=tmp_path)
+
+
+def touch(path):
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+class TestAsync:
+    """Test cases for aparse() and awatch()."""
+
+    def test_aparse(self, test_nagconfig, test_nag):
+        """Test that aparse returns the same snapshot as parse."""
+        nag = asyncio.run(aparse(test_nagconfig))
+        assert nag.attributes == test_nag.attributes
+        assert [x.name for x in nag.services] == [x.name for x in test_nag.services]
+
+    def test_concurrent_callers_share_parse(self, test_nagconfig, executor):
+        """Test that concurrent awaiters get the same Nag from one parse."""
+
+        async def main():
+            return await asyncio.gather(
+                *[aparse(test_nagconfig, executor) for _ in range(5)]
+            )
+
+        results = asyncio.run(main())
+        assert executor.submitted == 1
+        assert all(x is results[0] for x in results)
+        assert nagasync._INFLIGHT == {}
+
+        # Once done, the next call parses again
+        assert asyncio.run(aparse(test_nagconfig, executor)) is not results[0]
+        assert executor.submitted == 2
+
+    def test_cancelled_caller(self, test_nagconfig, executor):
+        """Test that cancelling one awaiter leaves the shared parse running."""
+
+        async def main():
+            first = asyncio.ensure_future(aparse(test_nagconfig, executor))
+            second = asyncio.ensure_future(aparse(test_nagconfig, executor))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(main()).services
+        assert executor.submitted == 1
+
+    def test_awatch(self, watchedconfig, executor):
+        """Test that awatch yields a snapshot per change of the files."""
+
+        async def main():
+            snapshots = []
+            async for nag in awatch(watchedconfig, 0.01, executor):
+                snapshots.append(nag)
+                if len(snapshots) == 1:
+                    # Not changed, nothing new until touched
+                    await asyncio.sleep(0.05)
+                    touch(watchedconfig.files[1])
+                else:
+                    break
+            return snapshots
+
+        snapshots = asyncio.run(main())
+        assert len(snapshots) == 2
+        assert snapshots[0] is not snapshots[1]
+        assert executor.submitted == 2
+
+    def test_awatch_retries_missing_file(self, watchedconfig):
+        """Test that a file missing for a while is picked up again."""
+        path = watchedconfig.files[1]
+        os.rename(path, path + ".old")
+
+        async def main():
+            watch = awatch(watchedconfig, 0.01)
+            pending = asyncio.ensure_future(watch.__anext__())
+            await asyncio.sleep(0.05)
+            assert not pending.done()
+            os.rename(path + ".old", path)
+            nag = await pending
+            await watch.aclose()
+            return nag
+
+        assert asyncio.run(main()).services
@@ -0,0 +1,98 @@
+"""Tests for the evaluation clock of a Nag snapshot."""
+import threading
+import time
+from datetime import datetime, timezone
+import pytest
+
+
+class TestEvaluationClock:
+    """Test cases for Nag.evaluateat()."""
+
+    def test_pinned_clock_decides_staleness(self, test_nag):
+        """Test that staleness is judged against the pinned time."""
+        test_nag.config.IGNORE_STALE_DATA = False
+        service = [x for x in test_nag.services if x.active_checks_enabled == 1][0]
+        with test_nag.evaluateat(service.next_check - 60):
+            assert service.status[0] != "stale"
+        with test_nag.evaluateat(service.next_check + 3600):
+            assert service.status[0] == "stale"
+
+    def test_status_is_cached_while_pinned(self, test_nag):
+        """Test that a service status is evaluated once per pinned clock."""
+        service = test_nag.services.first
+        with test_nag.evaluateat():
+            status = service.status
+            assert service.status is status
+        with test_nag.evaluateat():
+            assert service.status is not status
+            assert service.status == status
+
+    def test_nicetime_uses_pinned_clock(self, test_nag):
+        """Test that laststatuschange is relative to the pinned time."""
+        service = test_nag.services.first
+        with test_nag.evaluateat(service.last_state_change + 2 * 3600 + 5 * 60):
+            assert service.laststatuschange() == "2h 5m"
+
+    def test_accepts_datetime(self, test_nag):
+        """Test that the clock can be pinned with a datetime."""
+        with test_nag.evaluateat(datetime(2011, 10, 31, 12, 0, 0)):
+            assert test_nag.getnowdatetime() == datetime(2011, 10, 31, 12, 0, 0)
+
+    def test_accepts_aware_datetime(self, test_nag, monkeypatch):
+        """Test that a datetime with a time zone is not read as local time."""
+        monkeypatch.setenv("TZ", "Europe/Berlin")
+        time.tzset()
+        try:
+            with test_nag.evaluateat(datetime(2021, 6, 1, 12, tzinfo=timezone.utc)):
+                assert test_nag.getnowtimestamp() == 1622548800.0
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+    def test_nested_clocks_are_restored(self, test_nag):
+        """Test that leaving a block restores the previous clock."""
+        attributes = test_nag.attributes
+        with test_nag.evaluateat(1000):
+            with test_nag.evaluateat(2000):
+                assert test_nag.services.first.getnowtimestamp() == 2000
+            assert test_nag.getnowtimestamp() == 1000
+        assert "_clock" not in test_nag.__dict__
+        assert test_nag.attributes == attributes
+
+    def test_clocks_left_out_of_order(self, test_nag):
+        """Test that overlapping blocks left out of order unpin the clock."""
+        first = test_nag.evaluateat(1000)
+        second = test_nag.evaluateat(2000)
+        first.__enter__()
+        second.__enter__()
+        first.__exit__(None, None, None)
+        assert test_nag.getnowtimestamp() == 2000
+        second.__exit__(None, None, None)
+        assert test_nag._clock is None
+
+    def test_clock_is_per_thread(self, test_nag):
+        """Test that a clock pinned in one thread does not leak into another."""
+        pinned = threading.Event()
+        release = threading.Event()
+        seen = []
+
+        def other():
+            with test_nag.evaluateat(1000):
+                pinned.set()
+                release.wait(5)
+                seen.append(test_nag.services.first.getnowtimestamp())
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        assert pinned.wait(5)
+        assert test_nag._clock is None
+        with test_nag.evaluateat(2000):
+            release.set()
+            thread.join()
+            assert test_nag.getnowtimestamp() == 2000
+        assert seen == [1000]
+        assert test_nag._clock is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+"""Tests for the compact host and service model (NagConfig.COMPACT_OBJECTS)."""
+import copy
+import json
+import pickle
+import pytest
+from nagparser import parse, NagParser
+from nagparser.Model import Host, Service, CompactHost, CompactService
+
+
+@pytest.fixture
+def compact_nagconfig(make_nagconfig):
+    """Create a NagConfig building compact hosts and services."""
+    return make_nagconfig(COMPACT_OBJECTS=True)
+
+
+@pytest.fixture
+def compact_nag(compact_nagconfig):
+    """Create a Nag object with compact hosts and services."""
+    return parse(compact_nagconfig)
+
+
+class TestCompactObjects:
+    """Test cases for COMPACT_OBJECTS."""
+
+    def test_builds_compact_objects(self, compact_nag):
+        """Test that hosts and services are compact and share schemas."""
+        assert all(type(x) is CompactHost for x in compact_nag.hosts)
+        assert all(type(x) is CompactService for x in compact_nag.services)
+        assert isinstance(compact_nag.services[0], Service)
+        assert isinstance(compact_nag.hosts[0], Host)
+        schemas = set(id(x._schema) for x in compact_nag.services)
+        assert len(schemas) < len(compact_nag.services)
+
+    def test_attributes_match_regular_objects(self, compact_nag, test_nag):
+        """Test that attributes lists the same values in the same order."""
+        for compact, regular in zip(compact_nag.hosts, test_nag.hosts):
+            assert compact.attributes == regular.attributes
+        for compact, regular in zip(compact_nag.services, test_nag.services):
+            assert compact.attributes == regular.attributes
+            assert compact.plugin_output == regular.plugin_output
+
+    def test_relationships_and_status(self, compact_nag, test_nag):
+        """Test status, host and service group lookups on compact objects."""
+        assert compact_nag.status == test_nag.status
+        for compact, regular in zip(compact_nag.services, test_nag.services):
+            assert compact.status == regular.status
+            assert compact.host.host_name == regular.host.host_name
+            assert compact.servicegroups.names == regular.servicegroups.names
+        for compact, regular in zip(compact_nag.hosts, test_nag.hosts):
+            assert compact.status == regular.status
+            assert compact.services.names == regular.services.names
+
+    def test_genoutput_matches(self, compact_nag, test_nag):
+        """Test that JSON output is the same as for regular objects."""
+        compact = compact_nag.hosts.first
+        regular = test_nag.hosts.first
+        assert json.loads(compact.genoutput()) == json.loads(regular.genoutput())
+        assert json.loads(compact.genoutput())["objtype"] == "host"
+
+    def test_assigned_attributes_take_precedence(self, compact_nag):
+        """Test that attributes set after parsing override the parsed row."""
+        service = compact_nag.services.first
+        service.current_state = 2
+        service.note = "checked"
+        assert service.current_state == 2
+        attributes = dict(service.attributes)
+        assert attributes["current_state"] == 2
+        assert attributes["note"] == "checked"
+        with pytest.raises(AttributeError):
+            service.missing
+
+    def test_copy_and_pickle(self, compact_nag):
+        """Test that compact objects can be copied and pickled."""
+        service = compact_nag.services.first
+        service.note = "checked"
+        duplicate = copy.copy(service)
+        assert duplicate is not service
+        assert duplicate.attributes == service.attributes
+        assert duplicate.nag is compact_nag
+
+        host = pickle.loads(pickle.dumps(compact_nag.hosts.first))
+        assert type(host) is CompactHost
+        assert host.attributes == compact_nag.hosts.first.attributes
+        assert host.status == compact_nag.hosts.first.status
+
+        duplicate = pickle.loads(pickle.dumps(service))
+        assert duplicate.attributes == service.attributes
+        assert duplicate.note == "checked"
+
+    def test_reuse_snapshot_and_parallel(self, compact_nagconfig, tmp_path, test_nag):
+        """Test compact objects through NagParser, snapshots and workers."""
+        parser = NagParser(compact_nagconfig)
+        first = parser.parse()
+        assert all(x is y for x, y in zip(first.services, parser.parse().services))
+
+        compact_nagconfig.SNAPSHOT_CACHE = str(tmp_path / "nag.snapshot")
+        parse(compact_nagconfig)
+        loaded = parse(compact_nagconfig)
+        compact_nagconfig.SNAPSHOT_CACHE = None
+        compact_nagconfig.PARALLEL_WORKERS = 2
+        compact_nagconfig.PARALLEL_THRESHOLD = 1
+        parallel = parse(compact_nagconfig)
+
+        for nag in (loaded, parallel):
+            assert all(type(x) is CompactService for x in nag.services)
+            for compact, regular in zip(nag.services, test_nag.services):
+                assert compact.attributes == regular.attributes
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
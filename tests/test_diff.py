@@ -0,0 +1,181 @@
+"""Tests for comparing two snapshots with diff()."""
+import os
+import re
+import time
+import pytest
+from nagparser import parse, diff, NagParser
+from nagparser.Services.nagdiff import getparsetime
+
+
+def findblock(text, section, host_name, service_description=None):
+    """Get the (start, end) of a block of status.dat text."""
+    pattern = r"%s \{\n\thost_name=%s\n" % (section, re.escape(host_name))
+    if service_description is not None:
+        pattern += r"\tservice_description=%s\n" % re.escape(service_description)
+    match = re.search(pattern + r".*?\n\t\}\n", text, re.DOTALL)
+    return match.start(), match.end()
+
+
+def editservice(text, service, **fields):
+    """Change attributes of the block of a service."""
+    start, end = findblock(
+        text, "servicestatus", service.host_name, service.service_description
+    )
+    block = text[start:end]
+    for name, value in fields.items():
+        block = re.sub(r"\t%s=[^\n]*\n" % name, "\t%s=%s\n" % (name, value), block)
+    return text[:start] + block + text[end:]
+
+
+def removeservice(text, service):
+    start, end = findblock(
+        text, "servicestatus", service.host_name, service.service_description
+    )
+    return text[:start] + text[end:]
+
+
+@pytest.fixture
+def diffconfig(make_nagconfig, tmp_path):
+    """Create a NagConfig on copies of the test data, to change status.dat."""
+    return make_nagconfig(copyto=tmp_path)
+
+
+def rewrite(statusfile, text):
+    with open(statusfile, "w") as tempfile:
+        tempfile.write(text)
+    # Make sure a NagParser sees a new signature even within the same second
+    stat = os.stat(statusfile)
+    os.utime(statusfile, (stat.st_atime, stat.st_mtime + 10))
+
+
+class TestDiff:
+    """Test cases for diff()."""
+
+    def test_same_snapshot_has_no_changes(self, test_nag):
+        """Test that a snapshot does not differ from itself or a reparse."""
+        assert not diff(test_nag, test_nag).changed
+        assert not diff(test_nag, parse(test_nag.config)).changed
+
+    def test_changes(self, diffconfig):
+        """Test every kind of change on an edited status file."""
+        nagconfig = diffconfig
+        statusfile = nagconfig.files[1]
+        old = parse(nagconfig)
+        services = [
+            x for x in old.services if x.current_state == 0 and x.state_type == 1
+        ]
+        critical, soft, downtime, acknowledged, removed = services[:5]
+        with open(statusfile) as tempfile:
+            text = tempfile.read()
+        text = editservice(text, critical, current_state=2)
+        text = editservice(text, soft, state_type=0)
+        text = editservice(text, downtime, scheduled_downtime_depth=1)
+        text = editservice(text, acknowledged, problem_has_been_acknowledged=1)
+        text = removeservice(text, removed)
+        rewrite(statusfile, text)
+
+        new = parse(nagconfig)
+        changes = diff(old, new)
+        assert changes.changed
+        assert changes.old is old and changes.new is new
+
+        transitions = dict(
+            ((x.service.host_name, x.service.service_description), x)
+            for x in changes.transitions
+        )
+        assert len(transitions) == 2
+        transition = transitions[(critical.host_name, critical.service_description)]
+        assert (transition.oldstatus, transition.newstatus) == ("ok", "critical")
+        assert (transition.oldstatetype, transition.newstatetype) == (1, 1)
+        assert transition.previous is critical
+        assert transition.service is new.getindex().servicesbykey[
+            (critical.host_name, critical.service_description)
+        ]
+        transition = transitions[(soft.host_name, soft.service_description)]
+        assert (transition.oldstatus, transition.newstatus) == ("ok", "ok")
+        assert (transition.oldstatetype, transition.newstatetype) == (1, 0)
+
+        assert [x.name for x in changes.downtimestarted] == [downtime.name]
+        assert [x.name for x in changes.acknowledged] == [acknowledged.name]
+        assert [x.name for x in changes.removedservices] == [removed.name]
+        assert changes.downtimeended == []
+        assert changes.unacknowledged == []
+        assert changes.addedservices == []
+        assert changes.addedhosts == changes.removedhosts == []
+
+        # And back again
+        changes = diff(new, old)
+        assert len(changes.transitions) == 2
+        assert [x.name for x in changes.downtimeended] == [downtime.name]
+        assert [x.name for x in changes.unacknowledged] == [acknowledged.name]
+        assert [x.name for x in changes.addedservices] == [removed.name]
+        assert changes.removedservices == []
+
+    def test_hosts(self, diffconfig):
+        """Test that hosts are matched by name."""
+        nagconfig = diffconfig
+        statusfile = nagconfig.files[1]
+        old = parse(nagconfig)
+        host = old.hosts.first
+        with open(statusfile) as tempfile:
+            text = tempfile.read()
+        start, end = findblock(text, "hoststatus", host.host_name)
+        rewrite(statusfile, text[:start] + text[end:])
+
+        new = parse(nagconfig)
+        changes = diff(old, new)
+        assert changes.removedhosts == [host]
+        assert changes.addedhosts == []
+        assert [x.name for x in diff(new, old).addedhosts] == [host.name]
+
+    def test_carried_over_objects(self, diffconfig):
+        """Test snapshots of a NagParser sharing unchanged objects."""
+        statusfile = diffconfig.files[1]
+        parser = NagParser(diffconfig)
+        old = parser.parse()
+        service = old.services.first
+        with open(statusfile) as tempfile:
+            text = tempfile.read()
+        rewrite(statusfile, editservice(text, service, current_state=1))
+
+        new = parser.parse()
+        assert new.services[1] is old.services[1]
+        changes = diff(old, new)
+        assert [(x.oldstatus, x.newstatus) for x in changes.transitions] == [
+            ("ok", "warning")
+        ]
+        assert changes.transitions[0].previous is service
+
+    def test_carried_over_services_going_stale(self, diffconfig):
+        """Test that an unchanged service going stale between parses is reported."""
+        diffconfig.IGNORE_STALE_DATA = False
+        statusfile = diffconfig.files[1]
+        parser = NagParser(diffconfig)
+        old = parser.parse()
+        stat = os.stat(statusfile)
+        os.utime(statusfile, (stat.st_atime, stat.st_mtime + 10))
+        new = parser.parse()
+        assert all(x is y for x, y in zip(old.services, new.services))
+
+        active = [x for x in new.services if x.active_checks_enabled == 1]
+        checked = max(int(x.next_check) for x in active)
+        later = checked + diffconfig.STALE_THRESHOLD + 60
+        fresh = [
+            x for x in active if checked - diffconfig.STALE_THRESHOLD <= x.next_check
+        ]
+        assert fresh
+        changes = diff(old, new, checked, later)
+        assert [x.service for x in changes.transitions] == fresh
+        assert all(x.newstatus == "stale" for x in changes.transitions)
+        assert all(x.oldstatus != "stale" for x in changes.transitions)
+        assert not diff(old, new, later, later).changed
+
+        # The pinned clocks of the snapshots are the default times
+        with old.evaluateat(checked):
+            assert len(diff(old, new).transitions) == len(fresh)
+
+    def test_parse_time(self, diffconfig):
+        """Test that the old side defaults to the time of its parse."""
+        before = time.time()
+        nag = parse(diffconfig)
+        assert before - 1 <= getparsetime(nag) <= time.time() + 1
@@ -0,0 +1,83 @@
+"""Tests for parse-time filters (HOST_FILTER, SERVICEGROUP_FILTER, STATE_FILTER)."""
+import re
+import pytest
+from nagparser import parse, NagParser
+
+
+@pytest.fixture
+def filtered_nagconfig(make_nagconfig):
+    """Create a NagConfig to set filters on, listing status.dat first."""
+    return make_nagconfig(names=("test_status.dat", "test_objects.cache"))
+
+
+class TestParseFilters:
+    """Test cases for the parse-time filters."""
+
+    def test_host_glob(self, filtered_nagconfig, test_nag):
+        """Test that a glob keeps only hosts and services of matching hosts."""
+        filtered_nagconfig.HOST_FILTER = "colo-linux*"
+        nag = parse(filtered_nagconfig)
+
+        expected = [x for x in test_nag.hosts if x.host_name.startswith("colo-linux")]
+        assert nag.hosts.names == [x.name for x in expected]
+        expected = [x for x in test_nag.services if x.host_name.startswith("colo-linux")]
+        assert [(x.host_name, x.name) for x in nag.services] == [
+            (x.host_name, x.name) for x in expected
+        ]
+        assert len(nag._servicegroups) == len(test_nag._servicegroups)
+
+    def test_host_regex(self, filtered_nagconfig, test_nag):
+        """Test that a compiled regular expression is searched in host names."""
+        filtered_nagconfig.HOST_FILTER = re.compile("rssdb$")
+        nag = parse(filtered_nagconfig)
+
+        assert nag.hosts.names == ["colo-rssdb"]
+        assert len(nag.services) == len(test_nag.gethost("colo-rssdb").services)
+
+    def test_servicegroup_filter(self, filtered_nagconfig, test_nag):
+        """Test that only members of the requested service groups are parsed."""
+        filtered_nagconfig.SERVICEGROUP_FILTER = ["data_intake", "tocdata"]
+        nag = parse(filtered_nagconfig)
+
+        assert [x.servicegroup_name for x in nag._servicegroups] == [
+            "data_intake",
+            "tocdata",
+        ]
+        expected = set()
+        for servicegroup in test_nag._servicegroups:
+            if servicegroup.servicegroup_name in ("data_intake", "tocdata"):
+                expected.update(servicegroup.services)
+        assert set((x.host_name, x.name) for x in nag.services) == set(
+            (x.host_name, x.name) for x in expected
+        )
+        assert set(nag.hosts.names) == set(x.host_name for x in expected)
+        assert nag.servicegroups.get("Data Intake").status == test_nag.servicegroups.get(
+            "Data Intake"
+        ).status
+
+    def test_state_filter(self, filtered_nagconfig, test_nag):
+        """Test that only services in the requested states are parsed."""
+        filtered_nagconfig.STATE_FILTER = [1, 2, 3]
+        nag = parse(filtered_nagconfig)
+
+        expected = [x for x in test_nag.services if x.current_state != 0]
+        assert len(expected)
+        assert [(x.host_name, x.name) for x in nag.services] == [
+            (x.host_name, x.name) for x in expected
+        ]
+        assert len(nag.hosts) == len(test_nag.hosts)
+
+    def test_filters_with_reused_objects_cache(self, filtered_nagconfig):
+        """Test that membership is known when objects.cache is carried over."""
+        filtered_nagconfig.SERVICEGROUP_FILTER = ["tocdata"]
+        parser = NagParser(filtered_nagconfig)
+        first = parser.parse()
+        second = parser.parse()
+
+        assert [x.servicegroup_name for x in second._servicegroups] == ["tocdata"]
+        assert [x.name for x in second.services] == [x.name for x in first.services]
+        assert len(second.services) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,147 @@
+"""Tests for incremental re-parsing with NagParser."""
+import os
+import re
+import shutil
+import pytest
+from nagparser import NagParser, NagConfig
+from nagparser.Services import nagfactory
+
+
+@pytest.fixture
+def copied_nagconfig(testdata_dir, tmp_path):
+    """Create a NagConfig over a writable copy of the test data."""
+    files = []
+    for name in ["test_objects.cache", "test_status.dat"]:
+        shutil.copy(os.path.join(testdata_dir, name), str(tmp_path))
+        files.append(str(tmp_path / name))
+    nagconfig = NagConfig(files)
+    nagconfig.IGNORE_STALE_DATA = True
+    return nagconfig
+
+
+def rewrite(filename, old, new):
+    """Replace the first occurrence of old with new in a file."""
+    with open(filename) as f:
+        content = f.read()
+    assert old in content
+    with open(filename, "w") as f:
+        f.write(content.replace(old, new, 1))
+
+
+def rewritetimes(filename, timestamp):
+    """Set created and every last_update to a new time, as Nagios does."""
+    with open(filename) as f:
+        content = f.read()
+    content = re.sub(r"\tlast_update=\d+", "\tlast_update=%d" % timestamp, content)
+    content = re.sub(r"\tcreated=\d+", "\tcreated=%d" % timestamp, content)
+    with open(filename, "w") as f:
+        f.write(content)
+
+
+class TestNagParser:
+    """Test cases for the stateful NagParser."""
+
+    def test_reparse_builds_new_nag(self, copied_nagconfig):
+        """Test that each parse returns a new, complete snapshot."""
+        parser = NagParser(copied_nagconfig)
+        first = parser.parse()
+        second = parser.parse()
+        assert first is not second
+        assert parser.nag is second
+        assert len(second.hosts) == 26
+        assert len(second.services) == 124
+        assert len(second._servicegroups) == 12
+
+    def test_unchanged_objects_are_reused(self, copied_nagconfig):
+        """Test that unchanged hosts and services keep their identity."""
+        parser = NagParser(copied_nagconfig)
+        first = parser.parse()
+        second = parser.parse()
+        assert all(x is y for x, y in zip(first.hosts, second.hosts))
+        assert all(x is y for x, y in zip(first.services, second.services))
+        assert all(x.nag is second for x in second.services)
+
+    def test_changed_service_is_rebuilt(self, copied_nagconfig):
+        """Test that only the changed service block is decoded again."""
+        parser = NagParser(copied_nagconfig)
+        first = parser.parse()
+        rewrite(
+            copied_nagconfig.files[1],
+            "plugin_output=OK - load average: 2.31, 1.74, 1.44",
+            "plugin_output=WARNING - load average: 24.31, 1.74, 1.44",
+        )
+        second = parser.parse()
+        changed = [y for x, y in zip(first.services, second.services) if x is not y]
+        assert len(changed) == 1
+        assert changed[0].plugin_output.startswith("WARNING")
+        assert changed[0].nag is second
+
+    def test_unchanged_objects_cache_is_reused(self, copied_nagconfig):
+        """Test that servicegroups are carried over while objects.cache is unchanged."""
+        parser = NagParser(copied_nagconfig)
+        first = parser.parse()
+        first_members = first._servicegroups.first.services
+        second = parser.parse()
+        assert all(x is y for x, y in zip(first._servicegroups, second._servicegroups))
+        # Resolved members must point at the objects of the new snapshot
+        assert len(second._servicegroups.first.services) == len(first_members)
+        assert all(x.nag is second for x in second._servicegroups.first.services)
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_new_write_times_are_reused(self, copied_nagconfig, workers):
+        """Test that a rewrite changing only last_update keeps every service."""
+        copied_nagconfig.PARALLEL_WORKERS = workers
+        copied_nagconfig.PARALLEL_THRESHOLD = 1
+        parser = NagParser(copied_nagconfig)
+        first = parser.parse()
+        rewritetimes(copied_nagconfig.files[1], 1320090000)
+        rewrite(
+            copied_nagconfig.files[1],
+            "plugin_output=OK - load average: 2.31, 1.74, 1.44",
+            "plugin_output=WARNING - load average: 24.31, 1.74, 1.44",
+        )
+
+        second = parser.parse()
+        changed = [y for x, y in zip(first.services, second.services) if x is not y]
+        assert [x.plugin_output[:7] for x in changed] == ["WARNING"]
+        assert all(x is y for x, y in zip(first.hosts, second.hosts))
+        assert second.created == 1320090000
+        assert all(x.last_update == 1320090000 for x in second.services)
+        assert all(x.last_update == 1320090000 for x in second.hosts)
+
+    def test_new_write_times_with_lazy_attributes(self, copied_nagconfig):
+        """Test that a lazily decoded last_update is the one of the new write."""
+        copied_nagconfig.LAZY_ATTRIBUTES = True
+        parser = NagParser(copied_nagconfig)
+        first = parser.parse()
+        rewritetimes(copied_nagconfig.files[1], 1320090000)
+        second = parser.parse()
+        assert all(x is y for x, y in zip(first.services, second.services))
+        assert all(x.last_update == 1320090000 for x in second.services)
+
+    def test_failed_parse_keeps_previous_snapshot(self, copied_nagconfig, monkeypatch):
+        """Test that a parse failing halfway leaves the previous snapshot intact."""
+        parser = NagParser(copied_nagconfig)
+        first = parser.parse()
+        members = len(first._servicegroups.first.services)
+
+        def fail(filename, mapped=False):
+            raise OSError("status.dat was renamed")
+
+        monkeypatch.setattr(nagfactory, "openfile", fail)
+        with pytest.raises(OSError):
+            parser.parse()
+        monkeypatch.undo()
+
+        assert parser.nag is first
+        assert all(x.nag is first for x in first.services)
+        assert all(x.nag is first for x in first._servicegroups)
+        assert len(first._servicegroups.first.services) == members
+
+        second = parser.parse()
+        assert all(x is y for x, y in zip(first.services, second.services))
+        assert all(x.nag is second for x in second.services)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,55 @@
+"""Tests for lazily decoded attributes (NagConfig.LAZY_ATTRIBUTES)."""
+import json
+import pytest
+from nagparser import parse
+
+
+@pytest.fixture
+def lazy_nag(make_nagconfig):
+    """Create a Nag object whose objects decode attributes on demand."""
+    return parse(make_nagconfig(LAZY_ATTRIBUTES=True))
+
+
+class TestLazyAttributes:
+    """Test cases for lazy attribute decoding."""
+
+    def test_only_declared_attributes_are_decoded(self, lazy_nag):
+        """Test that parsing only decodes the attributes a class declares."""
+        service = lazy_nag.services.first
+        assert "current_state" in service.__dict__
+        assert "plugin_output" not in service.__dict__
+        assert "check_command" not in lazy_nag.hosts.first.__dict__
+
+    def test_attribute_decoded_on_first_read(self, lazy_nag, test_nag):
+        """Test that reading an attribute decodes and caches it."""
+        for lazy, eager in zip(lazy_nag.services, test_nag.services):
+            assert lazy.plugin_output == eager.plugin_output
+            assert lazy.percent_state_change == eager.percent_state_change
+            assert "plugin_output" in lazy.__dict__
+
+    def test_status_matches_eager_parse(self, lazy_nag, test_nag):
+        """Test that status calculations give the same results."""
+        assert [x.status for x in lazy_nag.services] == [
+            x.status for x in test_nag.services
+        ]
+        assert [x.status for x in lazy_nag.servicegroups] == [
+            x.status for x in test_nag.servicegroups
+        ]
+
+    def test_attributes_decode_everything(self, lazy_nag, test_nag):
+        """Test that attributes and genoutput still cover every attribute."""
+        for lazy, eager in zip(lazy_nag.hosts, test_nag.hosts):
+            assert dict(lazy.attributes) == dict(eager.attributes)
+            assert "_rawblock" not in lazy.__dict__
+        assert json.loads(lazy_nag.genoutput()) == json.loads(test_nag.genoutput())
+
+    def test_missing_attribute_raises(self, lazy_nag):
+        """Test that unknown attributes still raise AttributeError."""
+        service = lazy_nag.services.first
+        with pytest.raises(AttributeError):
+            _ = service.no_such_attribute
+        assert not hasattr(service, "no_such_attribute")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
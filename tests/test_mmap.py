@@ -0,0 +1,79 @@
+"""Tests for memory-mapped, bytes-level parsing (NagConfig.MMAP_FILES)."""
+import pytest
+from nagparser import parse, NagConfig, NagParser
+from nagparser.Services.nagfactory import tokenize, findattribute
+
+
+@pytest.fixture
+def mapped_nagconfig(make_nagconfig):
+    """Create a NagConfig that memory-maps its files."""
+    return make_nagconfig(MMAP_FILES=True)
+
+
+class TestMappedParsing:
+    """Test cases for MMAP_FILES."""
+
+    def test_same_snapshot_as_text_parse(self, mapped_nagconfig, test_nag):
+        """Test that mapped parsing builds the same objects as reading text."""
+        nag = parse(mapped_nagconfig)
+
+        assert nag.attributes == test_nag.attributes
+        for mapped, full in zip(nag.hosts, test_nag.hosts):
+            assert mapped.attributes == full.attributes
+        for mapped, full in zip(nag.services, test_nag.services):
+            assert mapped.attributes == full.attributes
+        for mapped, full in zip(nag.servicegroups, test_nag.servicegroups):
+            assert mapped.attributes == full.attributes
+        assert nag.status == test_nag.status
+
+    def test_with_kept_attributes_and_lazy(self, mapped_nagconfig, test_nag):
+        """Test that projection and lazy decoding work on mapped files."""
+        mapped_nagconfig.KEEP_ATTRIBUTES = {"servicestatus": ["plugin_output"]}
+        mapped_nagconfig.LAZY_ATTRIBUTES = True
+        nag = parse(mapped_nagconfig)
+
+        for mapped, full in zip(nag.services, test_nag.services):
+            assert mapped.plugin_output == full.plugin_output
+            assert isinstance(mapped.plugin_output, str)
+        for mapped, full in zip(nag.hosts, test_nag.hosts):
+            assert mapped.plugin_output == full.plugin_output
+
+    def test_reuses_unchanged_objects(self, mapped_nagconfig):
+        """Test that NagParser carries objects over between mapped parses."""
+        parser = NagParser(mapped_nagconfig)
+        first = parser.parse()
+        second = parser.parse()
+        assert all(x is y for x, y in zip(first.services, second.services))
+
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file can be mapped and yields no objects."""
+        statusfile = tmp_path / "status.dat"
+        statusfile.write_text("")
+        nagconfig = NagConfig([str(statusfile)])
+        nagconfig.MMAP_FILES = True
+
+        nag = parse(nagconfig)
+        assert nag.hosts is None and nag.services is None
+
+    def test_tokenize_bytes(self):
+        """Test tokenizing bytes and decoding single values from them."""
+        content = (
+            "# comment\n"
+            "servicestatus {\n"
+            "\thost_name=hé\n"
+            "\tcurrent_state=2\n"
+            "\t}\n"
+        ).encode("utf-8")
+        blocks = list(tokenize(content))
+
+        assert blocks == [
+            ("servicestatus", "\thost_name=hé\n\tcurrent_state=2".encode("utf-8"))
+        ]
+        body = blocks[0][1]
+        assert findattribute(body, "host_name", "=", str) == (True, "hé")
+        assert findattribute(body, "current_state", "=", int) == (True, 2)
+        assert findattribute(body, "missing", "=") == (False, None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,6 +1,7 @@
 """Unit tests for Host, Service, and ServiceGroup classes."""
 import pytest
 from nagparser.Model import Host, Service, ServiceGroup
+from nagparser.Model.NagList import NagList
 
 
 class TestHost:
@@ -67,6 +68,20 @@ class TestService:
             service = test_nag.services.first
             assert hasattr(service, "servicegroups")
 
+    def test_service_servicegroups_match_membership(self, test_nag):
+        """Test that service.servicegroups lists every group containing it."""
+        servicegroups = test_nag.getservicegroups()
+        for service in test_nag.services:
+            expected = [x for x in servicegroups if service in x.services]
+            assert service.servicegroups == expected
+            assert service.servicegroups.names[-1] == "All Services"
+
+    def test_servicegroups_by_service_is_cached(self, test_nag):
+        """Test that the bulk service -> servicegroups map covers all services."""
+        byservice = test_nag.servicegroupsbyservice()
+        assert test_nag.servicegroupsbyservice() is byservice
+        assert set(byservice) == set(test_nag.services)
+
     def test_can_create_service_object(self, test_nag):
         """Test that we can create a Service object."""
         service = Service(test_nag)
@@ -75,6 +90,38 @@ class TestService:
         assert service.service_description is None
 
 
+class TestRelationshipIndex:
+    """Test cases for the host and service lookup indexes of a Nag."""
+
+    def test_service_host_matches_host_name(self, test_nag):
+        """Test that every service resolves the host with its host_name."""
+        for service in test_nag.services:
+            expected = [x for x in test_nag.hosts if x.host_name == service.host_name]
+            assert service.host is expected[0]
+
+    def test_host_services_match_scan(self, test_nag):
+        """Test that host.services holds the same services as a full scan."""
+        for host in test_nag.hosts:
+            expected = [x for x in test_nag.services if x.host_name == host.host_name]
+            assert isinstance(host.services, NagList)
+            assert host.services == expected
+
+    def test_gethost_and_getservice(self, test_nag):
+        """Test dictionary lookups of hosts and services by name."""
+        service = test_nag.services.first
+        host = test_nag.gethost(service.host_name)
+        assert host is service.host
+        assert host.getservice(service.service_description) is service
+        assert host.getservice("no such service") is None
+        assert test_nag.gethost("no such host") is None
+
+    def test_index_follows_replaced_lists(self, test_nag):
+        """Test that the index is rebuilt when the host list is replaced."""
+        host = test_nag.hosts.first
+        test_nag.hosts = NagList([x for x in test_nag.hosts if x is not host])
+        assert test_nag.gethost(host.host_name) is None
+
+
 class TestServiceGroup:
     """Test cases for ServiceGroup class."""
 
@@ -98,6 +145,65 @@ class TestServiceGroup:
         servicegroups = test_nag.servicegroups
         assert servicegroups is not None
 
+    def test_servicegroup_members_match_members_string(self, test_nag):
+        """Test that resolved members match a lookup of each members pair."""
+        for sg in test_nag._servicegroups:
+            members = sg.members.split(",")
+            expected = set()
+            for host_name, description in zip(members[::2], members[1::2]):
+                expected.update(
+                    x
+                    for x in test_nag.services
+                    if x.host_name == host_name and x.service_description == description
+                )
+            assert set(sg.services) == expected
+            assert len(sg.services) == len(expected)
+            assert set(sg.hosts) == set(x.host for x in expected)
+
+    def test_servicegroup_membership_index(self, test_nag):
+        """Test the servicegroup -> services and service -> servicegroups maps."""
+        index = test_nag.getindex()
+        members = index.servicegroupmembers
+        assert set(members) == set(test_nag._servicegroups)
+        for sg, (services, _) in members.items():
+            for service in services:
+                assert sg in index.servicegroupsbyservice[service]
+        for service, servicegroups in index.servicegroupsbyservice.items():
+            assert all(service in members[x][0] for x in servicegroups)
+
+    def test_synthetic_groups_do_not_change_parsed_groups(self, test_nag):
+        """Test that getservicegroups leaves the parsed group list alone."""
+        parsed = list(test_nag._servicegroups)
+        servicegroups = test_nag.getservicegroups()
+        assert test_nag._servicegroups == parsed
+        assert servicegroups[: len(parsed)] == parsed
+        assert servicegroups.names[len(parsed) :] == ["No Service Group", "All Services"]
+
+    def test_synthetic_groups_hold_services(self, test_nag):
+        """Test the services of the noservicegroup and allservices groups."""
+        servicegroups = test_nag.getservicegroups()
+        grouped = set()
+        for sg in test_nag._servicegroups:
+            grouped.update(sg.services)
+        noservicegroup = servicegroups.get("No Service Group")
+        allservices = servicegroups.get("All Services")
+        assert set(noservicegroup.services) == set(test_nag.services) - grouped
+        assert allservices.services == test_nag.services
+        assert set(allservices.hosts) == set(test_nag.hosts)
+
+    def test_synthetic_group_members_built_on_read(self, test_nag):
+        """Test that the members string of a synthetic group is built lazily."""
+        allservices = test_nag.getservicegroups().get("All Services")
+        assert "members" not in allservices.__dict__
+        members = allservices.members.split(",")
+        assert len(members) == 2 * len(test_nag.services)
+        assert members[:2] == [
+            test_nag.services.first.host_name,
+            test_nag.services.first.service_description,
+        ]
+        output = allservices.genoutput(finaloutput=False)
+        assert output["attributes"]["members"] == allservices.members
+
     def test_can_create_servicegroup_object(self, test_nag):
         """Test that we can create a ServiceGroup object."""
         sg = ServiceGroup(test_nag)
@@ -1,4 +1,5 @@
 """Unit tests for NagList class."""
+import pickle
 import pytest
 from nagparser.Model.NagList import NagList
 
@@ -79,5 +80,77 @@ class TestNagList:
         assert naglist[1] == obj2
 
 
+class TestNagListIndex:
+    """Test cases for the name index of NagList."""
+
+    def test_get_returns_item_or_default(self):
+        """Test that get() looks up items by name."""
+        obj1 = MockNagObject("obj1")
+        naglist = NagList([obj1, MockNagObject("same"), MockNagObject("same")])
+        assert naglist.get("obj1") is obj1
+        assert naglist.get("unknown") is None
+        assert naglist.get("unknown", "default") == "default"
+        assert naglist.get("same", "default") == "default"
+
+    def test_getmany_returns_items_in_order(self):
+        """Test bulk lookup of several names."""
+        obj1 = MockNagObject("obj1")
+        obj2 = MockNagObject("obj2")
+        naglist = NagList([obj1, obj2])
+        assert naglist.getmany(["obj2", "unknown", "obj1"]) == [obj2, None, obj1]
+
+    def test_index_is_reused_between_lookups(self):
+        """Test that the index is built once and not on every lookup."""
+        naglist = NagList([MockNagObject("obj1")])
+        assert naglist.obj1 is naglist.get("obj1")
+        index = naglist._nameindex
+        _ = naglist.names
+        assert naglist._nameindex is index
+
+    def test_names_returns_a_copy(self):
+        """Test that changing the returned names does not affect the list."""
+        naglist = NagList([MockNagObject("obj1")])
+        naglist.names.append("obj2")
+        assert naglist.names == ["obj1"]
+
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda x, obj: x.append(obj),
+            lambda x, obj: x.extend([obj]),
+            lambda x, obj: x.insert(0, obj),
+            lambda x, obj: x.__setitem__(0, obj),
+            lambda x, obj: x.__setitem__(slice(0, 1), [obj]),
+            lambda x, obj: x.__iadd__([obj]),
+        ],
+    )
+    def test_mutation_invalidates_index(self, mutate):
+        """Test that lookups see items added through list mutations."""
+        naglist = NagList([MockNagObject("obj1")])
+        assert naglist.get("new") is None
+        new = MockNagObject("new")
+        mutate(naglist, new)
+        assert naglist.new is new
+        assert "new" in naglist.names
+
+    def test_removal_invalidates_index(self):
+        """Test that lookups no longer find removed items."""
+        obj1 = MockNagObject("obj1")
+        naglist = NagList([obj1, MockNagObject("obj2")])
+        assert naglist.obj1 is obj1
+        del naglist[0:1]
+        assert naglist.get("obj1") is None
+        naglist.pop()
+        assert naglist.names == []
+
+    def test_pickle_drops_index(self):
+        """Test that a pickled NagList rebuilds its index after loading."""
+        naglist = NagList(["a", "b"])
+        naglist._nameindex = {"stale": "a"}
+        loaded = pickle.loads(pickle.dumps(naglist))
+        assert loaded == ["a", "b"]
+        assert loaded._nameindex is None
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+"""Tests for the process-wide objects.cache cache (NagConfig.CACHE_OBJECTS)."""
+import os
+import pytest
+from nagparser import parse
+from nagparser.Services import nagfactory
+from nagparser.Services.nagfactory import BlockCache, OBJECTCACHE
+
+
+@pytest.fixture
+def cached_nagconfig(make_nagconfig, tmp_path):
+    """Create a NagConfig over a copy of the test data, with an empty cache."""
+    nagconfig = make_nagconfig(copyto=tmp_path)
+    OBJECTCACHE.clear()
+    yield nagconfig
+    OBJECTCACHE.clear()
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Record the files opened by the parser."""
+    opened = []
+    openfile = nagfactory.openfile
+
+    def recordingopenfile(filename, mapped=False):
+        opened.append(os.path.basename(filename))
+        return openfile(filename, mapped)
+
+    monkeypatch.setattr(nagfactory, "openfile", recordingopenfile)
+    return opened
+
+
+class TestObjectCache:
+    """Test cases for OBJECTCACHE."""
+
+    def test_objects_cache_is_read_once(self, cached_nagconfig, opened):
+        """Test that an unchanged objects.cache is only read by the first parse."""
+        first = parse(cached_nagconfig)
+        second = parse(cached_nagconfig)
+
+        assert opened == ["test_objects.cache", "test_status.dat", "test_status.dat"]
+        assert len(OBJECTCACHE) == 1
+        for old, new in zip(first._servicegroups, second._servicegroups):
+            assert old is not new
+            assert new.nag is second
+            assert old.attributes == new.attributes
+        assert second.status == first.status
+
+    def test_cached_blocks_are_not_decoded_again(self, cached_nagconfig, monkeypatch):
+        """Test that a cached objects.cache is not decoded again by later parses."""
+        parse(cached_nagconfig)
+        decoded = []
+        decode = nagfactory._decode
+
+        def recordingdecode(body, *args, **kwargs):
+            decoded.append(body)
+            return decode(body, *args, **kwargs)
+
+        monkeypatch.setattr(nagfactory, "_decode", recordingdecode)
+        nag = parse(cached_nagconfig)
+        assert nag.servicegroups
+        assert not any("servicegroup_name" in nagfactory.totext(x) for x in decoded)
+
+    def test_snapshots_do_not_share_attributes(self, cached_nagconfig):
+        """Test that changing a service group leaves the cache and other snapshots."""
+        first = parse(cached_nagconfig)
+        first._servicegroups.first.alias = "changed"
+        second = parse(cached_nagconfig)
+        assert second._servicegroups.first.alias != "changed"
+
+    def test_changed_objects_cache_is_read_again(self, cached_nagconfig, opened):
+        """Test that a new version of objects.cache is parsed again."""
+        parse(cached_nagconfig)
+        with open(cached_nagconfig.files[0], "a") as f:
+            f.write("\n")
+        parse(cached_nagconfig)
+
+        assert opened.count("test_objects.cache") == 2
+        assert len(OBJECTCACHE) == 2
+
+    def test_cache_can_be_disabled(self, cached_nagconfig, opened):
+        """Test that CACHE_OBJECTS = False reads objects.cache every time."""
+        cached_nagconfig.CACHE_OBJECTS = False
+        parse(cached_nagconfig)
+        parse(cached_nagconfig)
+
+        assert opened.count("test_objects.cache") == 2
+        assert len(OBJECTCACHE) == 0
+
+    def test_matches_uncached_parse(self, cached_nagconfig, test_nag):
+        """Test that cached service groups match a parse of the file."""
+        parse(cached_nagconfig)
+        nag = parse(cached_nagconfig)
+        for cached, full in zip(nag.servicegroups, test_nag.servicegroups):
+            assert cached.attributes == full.attributes
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the cache keeps at most maxsize entries."""
+        cache = BlockCache(maxsize=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        assert cache.get("a") == "1"
+        cache.put("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert len(cache) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
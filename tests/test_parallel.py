@@ -0,0 +1,123 @@
+"""Tests for parallel decoding of status.dat (NagConfig.PARALLEL_WORKERS)."""
+import os
+import pytest
+from nagparser import parse, NagParser
+from nagparser.Services import nagfactory
+from nagparser.Services.nagfactory import (
+    decodechunk,
+    getchunkbounds,
+    getfilesignature,
+    tokenize,
+)
+
+
+@pytest.fixture
+def parallel_nagconfig(make_nagconfig):
+    """Create a NagConfig that decodes status.dat in two worker processes."""
+    return make_nagconfig(PARALLEL_WORKERS=2, PARALLEL_THRESHOLD=1)
+
+
+class TestParallelParsing:
+    """Test cases for PARALLEL_WORKERS."""
+
+    def test_same_snapshot_as_serial_parse(self, parallel_nagconfig, test_nag):
+        """Test that parallel decoding builds the same objects in the same order."""
+        nag = parse(parallel_nagconfig)
+
+        assert nag.status == test_nag.status
+        assert nag.attributes == test_nag.attributes
+        for name in ("hosts", "services", "servicegroups"):
+            assert len(getattr(nag, name)) == len(getattr(test_nag, name))
+            for x, y in zip(getattr(nag, name), getattr(test_nag, name)):
+                assert x.attributes == y.attributes
+                assert x.nag is nag
+
+    def test_lazy_and_filtered(self, parallel_nagconfig, test_nag):
+        """Test that lazy decoding and filters work in the worker processes."""
+        parallel_nagconfig.LAZY_ATTRIBUTES = True
+        parallel_nagconfig.SERVICEGROUP_FILTER = ["tocdata"]
+        nag = parse(parallel_nagconfig)
+
+        assert sorted(x.name for x in nag.services) == [
+            "Company4 Index Data",
+            "IndexBuilder",
+        ]
+        for service in nag.services:
+            full = test_nag.gethost(service.host_name).getservice(service.name)
+            assert "plugin_output" not in service.__dict__
+            assert service.plugin_output == full.plugin_output
+
+    def test_reuses_unchanged_objects(self, parallel_nagconfig):
+        """Test that NagParser carries objects over between parallel parses."""
+        parser = NagParser(parallel_nagconfig)
+        first = parser.parse()
+        second = parser.parse()
+        assert all(x is y for x, y in zip(first.services, second.services))
+
+    def test_below_threshold_is_serial(self, parallel_nagconfig, monkeypatch):
+        """Test that files smaller than the threshold are parsed serially."""
+
+        def fail(*args, **kwargs):
+            raise AssertionError("decoded in parallel")
+
+        monkeypatch.setattr(nagfactory, "decodeparallel", fail)
+        parallel_nagconfig.PARALLEL_THRESHOLD = 1024 * 1024 * 1024
+        assert len(parse(parallel_nagconfig).services) == 124
+
+    def test_replaced_file_is_parsed_serially(
+        self, make_nagconfig, tmp_path, monkeypatch
+    ):
+        """Test that a status.dat replaced after the chunks were split is not mixed."""
+        nagconfig = make_nagconfig(
+            copyto=tmp_path, PARALLEL_WORKERS=2, PARALLEL_THRESHOLD=1
+        )
+        statusfile = nagconfig.files[1]
+        with open(statusfile) as f:
+            text = f.read()
+        start = text.index("\tcurrent_state=", text.index("servicestatus {"))
+        end = text.index("\n", start)
+        # Longer than the original, so old chunk offsets would cut blocks apart
+        text = text[:start] + "\tcurrent_state=2\n\tadded=" + "x" * 100 + text[end:]
+        replacement = str(tmp_path / "new_status.dat")
+        with open(replacement, "w") as f:
+            f.write(text)
+
+        chunkbounds = nagfactory.getchunkbounds
+
+        def replacingchunkbounds(content, count):
+            bounds = chunkbounds(content, count)
+            os.replace(replacement, statusfile)
+            return bounds
+
+        monkeypatch.setattr(nagfactory, "getchunkbounds", replacingchunkbounds)
+        nag = parse(nagconfig)
+        assert len(nag.services) == 124
+        assert nag.services.first.current_state == 2
+        assert nag.services.first.added == "x" * 100
+
+    def test_chunk_of_other_version_is_not_decoded(self, testdata_dir):
+        """Test that a worker checks the version of the file it opens."""
+        path = os.path.join(testdata_dir, "test_status.dat")
+        keeps = dict((x, None) for x in nagfactory.SECTIONS[".dat"])
+        args = (path, 0, os.path.getsize(path), ".dat", keeps, (), None)
+        signature = getfilesignature(path)
+        assert decodechunk(*args, signature=signature) is not None
+        other = (signature[0] + 1,) + signature[1:]
+        assert decodechunk(*args, signature=other) is None
+
+    def test_chunk_bounds_follow_blocks(self, testdata_dir):
+        """Test that chunks split the file between blocks only."""
+        with open(os.path.join(testdata_dir, "test_status.dat"), "rb") as f:
+            content = f.read()
+
+        bounds = getchunkbounds(content, 7)
+        assert len(bounds) == 7
+        assert bounds[0][0] == 0 and bounds[-1][1] == len(content)
+        assert all(x[1] == y[0] for x, y in zip(bounds, bounds[1:]))
+
+        blocks = [x for start, end in bounds for x in tokenize(content[start:end])]
+        assert blocks == list(tokenize(content))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
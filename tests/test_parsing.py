@@ -3,6 +3,7 @@ import os
 import pytest
 from nagparser import parse, NagConfig
 from nagparser.Model import Nag
+from nagparser.Services.nagfactory import tokenize, decodeblock, FIELDTYPES
 
 
 class TestParsing:
@@ -68,5 +69,71 @@ class TestParsing:
         assert os.path.exists(status_file)
 
 
+class TestTokenizer:
+    """Test cases for the single-pass block tokenizer."""
+
+    def test_tokenize_yields_sections_and_bodies(self):
+        """Test that each block is returned with its header name."""
+        content = (
+            "# comment {\n"
+            "info {\n\tcreated=1\n\t}\n\n"
+            "define servicegroup {\n\tservicegroup_name\tweb\n\t}\n"
+        )
+        blocks = list(tokenize(content))
+        assert [section for section, _ in blocks] == ["info", "define servicegroup"]
+        assert blocks[0][1] == "\tcreated=1"
+
+    def test_tokenize_counts_blocks_in_test_data(self, testdata_dir):
+        """Test that every block of the test status.dat is found."""
+        with open(os.path.join(testdata_dir, "test_status.dat")) as f:
+            sections = [section for section, _ in tokenize(f.read())]
+        assert sections.count("servicestatus") == 124
+        assert sections.count("hoststatus") == 26
+        assert sections.count("contactstatus") == 18
+
+    def test_decodeblock_converts_values(self):
+        """Test that attribute values are converted like before."""
+        attrs = decodeblock(
+            "\tcurrent_state=2\n\tcheck_latency=0.146\n"
+            "\tperformance_data=load1=2.310;15.000\n\t# comment\n",
+            "=",
+        )
+        assert attrs == {
+            "current_state": 2,
+            "check_latency": 0.146,
+            "performance_data": "load1=2.310;15.000",
+        }
+
+    def test_decodeblock_uses_field_types(self):
+        """Test that schema fields are converted to their declared type."""
+        attrs = decodeblock(
+            "\tplugin_output=42\n\tcurrent_state=2\n\tcheck_interval=5\n"
+            "\tnext_check=soon\n\tcustom_field=7\n",
+            "=",
+            FIELDTYPES["servicestatus"],
+        )
+        assert attrs == {
+            "plugin_output": "42",
+            "current_state": 2,
+            "check_interval": 5.0,
+            "next_check": "soon",
+            "custom_field": 7,
+        }
+
+    def test_parsed_values_have_schema_types(self, test_nag):
+        """Test that parsed services carry the types from FIELDTYPES."""
+        for service in test_nag.services:
+            for name, fieldtype in FIELDTYPES["servicestatus"].items():
+                if name in service.__dict__:
+                    assert type(getattr(service, name)) is fieldtype
+
+    def test_parse_skips_unregistered_blocks(self, test_nag):
+        """Test that only registered block types become objects."""
+        assert len(test_nag.hosts) == 26
+        assert len(test_nag.services) == 124
+        assert len(test_nag._servicegroups) == 12
+        assert not hasattr(test_nag, "contact_name")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
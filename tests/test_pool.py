@@ -0,0 +1,76 @@
+"""Tests for shared attribute names and pooled values (NagConfig.POOL_VALUES)."""
+import pytest
+from nagparser import parse
+from nagparser.Services import nagfactory
+from nagparser.Services.nagfactory import decodeblock, internname
+
+
+@pytest.fixture
+def unpooled_nag(make_nagconfig):
+    """Create a Nag object parsed without the value pool."""
+    return parse(make_nagconfig(POOL_VALUES=False))
+
+
+class TestValuePool:
+    """Test cases for attribute name interning and POOL_VALUES."""
+
+    def test_equal_values_share_one_object(self, test_nag):
+        """Test that equal str values of a snapshot are the same object."""
+        services = test_nag.gethost("colo-rssdb").services
+        assert len(services) > 1
+        first = services[0]
+        for service in services[1:]:
+            assert service.host_name is first.host_name
+
+        periods = {}
+        for service in test_nag.services:
+            period = periods.setdefault(service.check_period, service.check_period)
+            assert service.check_period is period
+
+    def test_attribute_names_are_shared(self, test_nag):
+        """Test that all objects use the same str objects as attribute names."""
+        first = list(test_nag.services[0].__dict__)
+        for service in test_nag.services[1:]:
+            for name in service.__dict__:
+                if name in first:
+                    assert name is first[first.index(name)]
+
+    def test_same_values_as_unpooled(self, test_nag, unpooled_nag):
+        """Test that pooling does not change any value."""
+        assert test_nag.attributes == unpooled_nag.attributes
+        for pooled, unpooled in zip(test_nag.services, unpooled_nag.services):
+            assert pooled.attributes == unpooled.attributes
+
+    @pytest.mark.parametrize("pooled", [True, False])
+    def test_cached_objects_follow_option(self, make_nagconfig, monkeypatch, pooled):
+        """Test that objects.cache blocks are only pooled with POOL_VALUES."""
+        pools = []
+        decode = nagfactory._decode
+
+        def recordingdecode(body, delim, keep, fieldtypes, pool=None):
+            if delim == nagfactory.DELIMITERS[".cache"]:
+                pools.append(pool)
+            return decode(body, delim, keep, fieldtypes, pool)
+
+        monkeypatch.setattr(nagfactory, "_decode", recordingdecode)
+        nagfactory.OBJECTCACHE.clear()
+        try:
+            parse(make_nagconfig(POOL_VALUES=pooled))
+        finally:
+            nagfactory.OBJECTCACHE.clear()
+        assert pools
+        assert all((x is not None) == pooled for x in pools)
+
+    def test_pool_keeps_types(self):
+        """Test that only str values are pooled, so 1 and '1' stay apart."""
+        pool = {}
+        fieldtypes = {"plugin_output": str}
+        first = decodeblock("\tcurrent_state=1\n\tplugin_output=1", "=", fieldtypes, pool)
+        second = decodeblock("\tCURRENT_STATE=1\n\tplugin_output=1", "=", fieldtypes, pool)
+        assert first == second == {"current_state": 1, "plugin_output": "1"}
+        assert first["plugin_output"] is second["plugin_output"]
+        assert list(first)[0] is list(second)[0] is internname("Current_State")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
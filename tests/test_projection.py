@@ -0,0 +1,48 @@
+"""Tests for attribute projection (NagConfig.KEEP_ATTRIBUTES)."""
+import pytest
+from nagparser import parse
+from nagparser.Services.nagfactory import REQUIREDATTRIBUTES, decodeselected
+
+
+@pytest.fixture
+def projected_nag(make_nagconfig):
+    """Create a Nag object keeping only a few servicestatus attributes."""
+    return parse(
+        make_nagconfig(
+            KEEP_ATTRIBUTES={"servicestatus": ["plugin_output", "last_check"]}
+        )
+    )
+
+
+class TestKeepAttributes:
+    """Test cases for KEEP_ATTRIBUTES."""
+
+    def test_only_kept_attributes_are_parsed(self, projected_nag):
+        """Test that services only carry the kept and required attributes."""
+        expected = set(REQUIREDATTRIBUTES["servicestatus"])
+        expected.update(["plugin_output", "last_check"])
+        for service in projected_nag.services:
+            assert set(dict(service.attributes)) == expected
+
+    def test_kept_values_match_full_parse(self, projected_nag, test_nag):
+        """Test that kept attributes have the same values as a full parse."""
+        for projected, full in zip(projected_nag.services, test_nag.services):
+            assert projected.plugin_output == full.plugin_output
+            assert projected.last_check == full.last_check
+            assert projected.status == full.status
+
+    def test_unlisted_block_types_are_parsed_in_full(self, projected_nag, test_nag):
+        """Test that block types missing from KEEP_ATTRIBUTES are not projected."""
+        assert projected_nag.attributes == test_nag.attributes
+        for projected, full in zip(projected_nag.hosts, test_nag.hosts):
+            assert projected.attributes == full.attributes
+
+    def test_decodeselected_skips_missing_attributes(self):
+        """Test decoding a selection of attributes from a block body."""
+        body = "\tcurrent_state=2\n\tplugin_output=CRITICAL - down \n\tstate_type=1"
+        attrs = decodeselected(body, "=", ["state_type", "plugin_output", "missing"])
+        assert attrs == {"state_type": 1, "plugin_output": "CRITICAL - down"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,130 @@
+"""Tests for SnapshotProvider."""
+import os
+import threading
+import pytest
+from nagparser import NagConfig, SnapshotProvider
+from nagparser.Services import provider as providermodule
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count the parses of the provider module."""
+    calls = []
+    parse = providermodule.parse
+
+    def countingparse(config):
+        calls.append(config)
+        return parse(config)
+
+    monkeypatch.setattr(providermodule, "parse", countingparse)
+    return calls
+
+
+@pytest.fixture
+def watchedconfig(make_nagconfig, tmp_path):
+    """Create a NagConfig on copies of the test data."""
+    return make_nagconfig(copyto=tmp_path)
+
+
+def touch(path):
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+class TestSnapshotProvider:
+    """Test cases for SnapshotProvider."""
+
+    def test_concurrent_callers_share_parse(self, watchedconfig, parses):
+        """Test that concurrent callers wait for one parse and share its Nag."""
+        provider = SnapshotProvider()
+        barrier = threading.Barrier(8)
+        results = []
+
+        def caller():
+            barrier.wait()
+            results.append(provider.get(watchedconfig))
+
+        threads = [threading.Thread(target=caller) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(parses) == 1
+        assert len(results) == 8
+        assert all(x is results[0] for x in results)
+
+    def test_parses_again_when_files_change(self, watchedconfig, parses):
+        """Test that a changed file gives a new snapshot."""
+        provider = SnapshotProvider()
+        first = provider.get(watchedconfig)
+        assert provider.get(watchedconfig) is first
+
+        touch(watchedconfig.files[1])
+        second = provider.get(watchedconfig)
+        assert second is not first
+        assert len(parses) == 2
+
+    def test_maxstaleness(self, watchedconfig, parses):
+        """Test that files are not checked within maxstaleness."""
+        provider = SnapshotProvider(maxstaleness=3600)
+        first = provider.get(watchedconfig)
+        touch(watchedconfig.files[1])
+        assert provider.get(watchedconfig) is first
+
+        provider.maxstaleness = 0
+        assert provider.get(watchedconfig) is not first
+        assert len(parses) == 2
+
+    def test_shared_by_file_identity(self, watchedconfig, parses):
+        """Test that configs with the same files and options share snapshots."""
+        provider = SnapshotProvider()
+        other = NagConfig(list(watchedconfig.files))
+        other.IGNORE_STALE_DATA = True
+        assert provider.get(watchedconfig) is provider.get(other)
+
+        other.HOST_FILTER = "colo-*"
+        filtered = provider.get(other)
+        assert filtered is not provider.get(watchedconfig)
+        assert len(parses) == 2
+
+    @pytest.mark.parametrize(
+        "name, value",
+        [
+            ("STALE_THRESHOLD", 60),
+            ("IGNORE_STALE_DATA", False),
+            ("REQUIRE_HARD_SERVICE_STATUS", True),
+            ("IMPORTANTSERVICEGROUPS", {"tocdata": "TOC"}),
+            ("WEAK_REFERENCES", True),
+        ],
+    )
+    def test_status_options_are_not_shared(self, watchedconfig, parses, name, value):
+        """Test that configs evaluating statuses differently get their own Nag."""
+        provider = SnapshotProvider()
+        other = NagConfig(list(watchedconfig.files))
+        other.IGNORE_STALE_DATA = True
+        setattr(other, name, value)
+        nag = provider.get(other)
+        assert nag is not provider.get(watchedconfig)
+        assert nag.config is other
+        assert len(parses) == 2
+
+    def test_failed_parse_keeps_snapshot(self, watchedconfig):
+        """Test that a missing file raises and a later call recovers."""
+        provider = SnapshotProvider()
+        first = provider.get(watchedconfig)
+        path = watchedconfig.files[1]
+        os.rename(path, path + ".old")
+        with pytest.raises(OSError):
+            provider.get(watchedconfig)
+
+        os.rename(path + ".old", path)
+        assert provider.get(watchedconfig) is first
+
+    def test_clear(self, watchedconfig, parses):
+        """Test that clear() drops the snapshots."""
+        provider = SnapshotProvider()
+        first = provider.get(watchedconfig)
+        provider.clear()
+        assert provider.get(watchedconfig) is not first
+        assert len(parses) == 2
@@ -0,0 +1,138 @@
+"""Tests for the on-disk snapshot cache (NagConfig.SNAPSHOT_CACHE)."""
+import marshal
+import os
+import pytest
+from nagparser import parse
+from nagparser.Services import nagfactory, snapshot
+
+
+@pytest.fixture
+def snapshot_nagconfig(make_nagconfig, tmp_path):
+    """Create a NagConfig over a copy of the test data with a snapshot path."""
+    return make_nagconfig(
+        copyto=tmp_path, SNAPSHOT_CACHE=str(tmp_path / "nag.snapshot")
+    )
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Record the files opened by the parser."""
+    opened = []
+    openfile = nagfactory.openfile
+
+    def recordingopenfile(filename, mapped=False):
+        opened.append(os.path.basename(filename))
+        return openfile(filename, mapped)
+
+    monkeypatch.setattr(nagfactory, "openfile", recordingopenfile)
+    nagfactory.OBJECTCACHE.clear()
+    return opened
+
+
+def assertsamesnapshot(loaded, parsed):
+    # Resolves the service group members of both, which shows in attributes
+    assert loaded.status == parsed.status
+    assert loaded.attributes == parsed.attributes
+    for name in ("hosts", "services", "servicegroups"):
+        for x, y in zip(getattr(loaded, name), getattr(parsed, name)):
+            assert x.attributes == y.attributes
+            assert x.nag is loaded
+
+
+class TestSnapshotCache:
+    """Test cases for SNAPSHOT_CACHE."""
+
+    def test_second_parse_loads_snapshot(self, snapshot_nagconfig, opened):
+        """Test that a matching snapshot is loaded instead of the files."""
+        parsed = parse(snapshot_nagconfig)
+        assert os.path.exists(snapshot_nagconfig.SNAPSHOT_CACHE)
+        del opened[:]
+
+        loaded = parse(snapshot_nagconfig)
+        assert opened == []
+        assertsamesnapshot(loaded, parsed)
+        assert loaded.gethost("colo-rssdb").services.names == (
+            parsed.gethost("colo-rssdb").services.names
+        )
+
+    def test_lazy_objects_are_stored_raw(self, snapshot_nagconfig, test_nag, opened):
+        """Test that lazily decoded objects stay lazy in the snapshot."""
+        snapshot_nagconfig.LAZY_ATTRIBUTES = True
+        parse(snapshot_nagconfig)
+        loaded = parse(snapshot_nagconfig)
+
+        assert "plugin_output" not in loaded.services[0].__dict__
+        assert opened.count("test_status.dat") == 1
+        assertsamesnapshot(loaded, test_nag)
+
+    def test_changed_file_is_parsed(self, snapshot_nagconfig, opened):
+        """Test that the text files are parsed again once one of them changes."""
+        parse(snapshot_nagconfig)
+        with open(snapshot_nagconfig.files[1], "a") as f:
+            f.write("\n")
+        parse(snapshot_nagconfig)
+        parse(snapshot_nagconfig)
+
+        assert opened.count("test_status.dat") == 2
+
+    def test_changed_options_are_parsed(self, snapshot_nagconfig, opened):
+        """Test that a snapshot is not used with other parse options."""
+        parse(snapshot_nagconfig)
+        snapshot_nagconfig.STATE_FILTER = [2]
+        nag = parse(snapshot_nagconfig)
+
+        assert opened.count("test_status.dat") == 2
+        assert set(x.current_state for x in nag.services) == {2}
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            b"",
+            b"NAGPARSER SNAPSHOT 0\n",
+            snapshot.HEADER,
+            snapshot.HEADER + b"\x00junk",
+        ],
+    )
+    def test_unusable_snapshot_falls_back(self, snapshot_nagconfig, test_nag, content):
+        """Test that an old, empty or corrupt snapshot is ignored and replaced."""
+        with open(snapshot_nagconfig.SNAPSHOT_CACHE, "wb") as f:
+            f.write(content)
+
+        nag = parse(snapshot_nagconfig)
+        assertsamesnapshot(nag, test_nag)
+        with open(snapshot_nagconfig.SNAPSHOT_CACHE, "rb") as f:
+            assert f.readline() == snapshot.HEADER
+        assertsamesnapshot(parse(snapshot_nagconfig), test_nag)
+
+    def test_changed_schema_is_parsed(self, snapshot_nagconfig, opened, monkeypatch):
+        """Test that a snapshot written with other parser tables is not used."""
+        parse(snapshot_nagconfig)
+        fieldtypes = dict(nagfactory.FIELDTYPES["servicestatus"])
+        fieldtypes["plugin_output"] = int
+        monkeypatch.setitem(nagfactory.FIELDTYPES, "servicestatus", fieldtypes)
+        parse(snapshot_nagconfig)
+
+        assert opened.count("test_status.dat") == 2
+
+    @pytest.mark.parametrize(
+        "payload", [{}, {"nag": [], "groups": [], "objects": [("missing", [])]}, [1]]
+    )
+    def test_unexpected_payload_falls_back(self, snapshot_nagconfig, test_nag, payload):
+        """Test that a payload of another shape under a matching key is ignored."""
+        parse(snapshot_nagconfig)
+        path = snapshot_nagconfig.SNAPSHOT_CACHE
+        with open(path, "rb") as f:
+            f.readline()
+            key, _ = marshal.loads(f.read())
+        assert snapshot.writesnapshot(path, key, payload)
+
+        assertsamesnapshot(parse(snapshot_nagconfig), test_nag)
+
+    def test_unwritable_snapshot_is_skipped(self, snapshot_nagconfig, tmp_path):
+        """Test that failing to write the snapshot does not fail the parse."""
+        snapshot_nagconfig.SNAPSHOT_CACHE = str(tmp_path / "missing" / "nag.snapshot")
+        assert len(parse(snapshot_nagconfig).services) == 124
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,92 @@
+"""Tests for status aggregation over services."""
+import itertools
+import pytest
+from nagparser.Model.Base import servicesstatus, servicesstatussummary
+
+
+class FakeService:
+    """Object exposing a fixed status tuple, counting evaluations."""
+
+    def __init__(self, status, isdowntime):
+        self._status = (status, isdowntime)
+        self.evaluations = 0
+
+    @property
+    def status(self):
+        self.evaluations += 1
+        return self._status
+
+
+def multipassstatus(services):
+    """The multi-pass aggregation servicesstatus() used to perform."""
+    if services:
+        hasdowntime = max([x.status[1] for x in services])
+    else:
+        hasdowntime = 0
+    if len([x for x in services if x.status[0] == "stale"]):
+        return "unknown", hasdowntime
+    if len([x for x in services if x.status[0] == "critical" and x.status[1] is False]):
+        return "critical", hasdowntime
+    elif len([x for x in services if x.status[0] == "warning" and x.status[1] is False]):
+        return "warning", hasdowntime
+    elif len(
+        [x for x in services if x.status[0] in ["ok", "unknown"] and x.status[1] is True]
+    ):
+        return "downtime", hasdowntime
+    elif len([x for x in services if x.status[0] == "unknown"]):
+        return "unknown", hasdowntime
+    else:
+        return "ok", hasdowntime
+
+
+STATES = [
+    (status, isdowntime)
+    for status in ["ok", "warning", "critical", "unknown", "stale"]
+    for isdowntime in [False, True]
+]
+
+
+class TestServicesStatus:
+    """Test cases for servicesstatus and servicesstatussummary."""
+
+    @pytest.mark.parametrize("size", [0, 1, 2])
+    def test_matches_multipass_aggregation(self, size):
+        """Test that every combination of states aggregates like before."""
+        for combination in itertools.product(STATES, repeat=size):
+            services = [FakeService(*state) for state in combination]
+            assert servicesstatus(services) == multipassstatus(services)
+
+    def test_empty_list_has_no_downtime(self):
+        """Test the result for an empty list of services."""
+        assert servicesstatus([]) == ("ok", 0)
+
+    def test_status_evaluated_once_per_service(self):
+        """Test that each service status is only evaluated once."""
+        services = [FakeService(*state) for state in STATES]
+        servicesstatussummary(services)
+        assert all(x.evaluations == 1 for x in services)
+
+    def test_summary_counts_states(self):
+        """Test the per-state counts returned by servicesstatussummary."""
+        services = [FakeService(*state) for state in STATES]
+        services.append(FakeService("downtime", True))
+        status, hasdowntime, counts = servicesstatussummary(services)
+        assert (status, hasdowntime) == ("unknown", True)
+        assert counts == {
+            "ok": 2,
+            "warning": 2,
+            "critical": 2,
+            "unknown": 2,
+            "stale": 2,
+            "downtime": 1,
+        }
+
+    def test_summary_on_parsed_data(self, test_nag):
+        """Test that the counts add up to the number of services."""
+        status, hasdowntime, counts = servicesstatussummary(test_nag.services)
+        assert (status, hasdowntime) == servicesstatus(test_nag.services)
+        assert sum(counts.values()) == len(test_nag.services)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
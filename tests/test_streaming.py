@@ -0,0 +1,66 @@
+"""Tests for the streaming record iterator (iterblocks)."""
+import os
+import pytest
+from nagparser import iterblocks
+from nagparser.Services.nagfactory import tokenize, decodeblock, FIELDTYPES
+
+
+@pytest.fixture
+def status_dat(testdata_dir):
+    """Return the path to the test status.dat file."""
+    return os.path.join(testdata_dir, "test_status.dat")
+
+
+def expectedrecords(path, types, delim="="):
+    with open(path) as f:
+        return [
+            (section, decodeblock(body, delim, FIELDTYPES.get(section)))
+            for section, body in tokenize(f.read())
+            if section in types
+        ]
+
+
+class TestIterBlocks:
+    """Test cases for iterblocks()."""
+
+    def test_yields_servicestatus_records(self, status_dat, test_nag):
+        """Test that every servicestatus block is yielded as a dict."""
+        records = list(iterblocks(status_dat))
+
+        assert len(records) == len(test_nag.services)
+        for (section, record), service in zip(records, test_nag.services):
+            assert section == "servicestatus"
+            assert record == dict(service.attributes)
+
+    @pytest.mark.parametrize("chunksize", [1, 7, 64, 4096])
+    def test_chunk_boundaries(self, status_dat, chunksize):
+        """Test that blocks split across chunks are put back together."""
+        types = ("info", "hoststatus", "servicestatus")
+        records = list(iterblocks(status_dat, types, chunksize=chunksize))
+        assert records == expectedrecords(status_dat, types)
+
+    def test_selected_attributes(self, status_dat):
+        """Test that only the requested attributes are decoded."""
+        names = ["host_name", "service_description", "current_state", "missing"]
+        for _, record in iterblocks(status_dat, attributes=names):
+            assert sorted(record) == sorted(names[:3])
+            assert isinstance(record["current_state"], int)
+
+    def test_objects_cache(self, testdata_dir):
+        """Test streaming the service groups of objects.cache."""
+        path = os.path.join(testdata_dir, "test_objects.cache")
+        records = list(iterblocks(path, types=("define servicegroup",), chunksize=100))
+        assert records == expectedrecords(path, ("define servicegroup",), "\t")
+        assert records[0][1]["servicegroup_name"] == "IT"
+
+    def test_is_lazy(self, status_dat):
+        """Test that records are produced while the file is being read."""
+        records = iterblocks(status_dat, chunksize=4096)
+        section, record = next(records)
+        assert section == "servicestatus"
+        assert "host_name" in record
+        records.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,169 @@
+"""Tests for StatusWatcher."""
+import os
+import threading
+from types import SimpleNamespace
+import pytest
+from nagparser import StatusWatcher
+from nagparser.Services import watcher as watchermodule
+
+
+@pytest.fixture
+def watchedconfig(make_nagconfig, tmp_path):
+    """Create a NagConfig on copies of the test data."""
+    return make_nagconfig(copyto=tmp_path)
+
+
+def setfirststate(nagconfig, state, name="current_state"):
+    """Rewrite an attribute of the first service in status.dat."""
+    path = nagconfig.files[1]
+    with open(path) as tempfile:
+        text = tempfile.read()
+    start = text.index("servicestatus {")
+    start = text.index("\t%s=" % name, start)
+    end = text.index("\n", start)
+    text = text[:start] + "\t%s=%d" % (name, state) + text[end:]
+    with open(path, "w") as tempfile:
+        tempfile.write(text)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+class TestStatusWatcher:
+    """Test cases for StatusWatcher."""
+
+    def test_parses_only_on_change(self, watchedconfig):
+        """Test that a poll parses only when a file changed."""
+        watcher = StatusWatcher(watchedconfig)
+        try:
+            assert watcher.nag is None
+            assert watcher.poll() is True
+            first = watcher.nag
+            assert first.services.first.status[0] == "ok"
+            assert watcher.poll() is False
+            assert watcher.nag is first
+
+            setfirststate(watchedconfig, 2)
+            assert watcher.poll() is True
+            assert watcher.nag is not first
+            assert watcher.nag.services.first.status[0] == "critical"
+        finally:
+            watcher.stop()
+
+    def test_subscribers_get_changes(self, watchedconfig):
+        """Test that subscribers are called with the diff of a new snapshot."""
+        received = []
+        done = threading.Event()
+        watcher = StatusWatcher(watchedconfig)
+
+        @watcher.subscribe
+        def callback(changes):
+            received.append(changes)
+            done.set()
+
+        try:
+            watcher.poll()
+            setfirststate(watchedconfig, 1)
+            watcher.poll()
+            assert done.wait(5)
+        finally:
+            watcher.stop()
+
+        assert len(received) == 1
+        changes = received[0]
+        assert changes.new is watcher.nag
+        assert [(x.oldstatus, x.newstatus) for x in changes.transitions] == [
+            ("ok", "warning")
+        ]
+
+    def test_snapshots_are_not_changed_by_later_polls(self, watchedconfig):
+        """Test that a snapshot handed out keeps its own objects."""
+        received = []
+        done = threading.Event()
+        watcher = StatusWatcher(watchedconfig)
+
+        @watcher.subscribe
+        def callback(changes):
+            received.append(changes)
+            done.set()
+
+        try:
+            watcher.poll()
+            first = watcher.nag
+            setfirststate(watchedconfig, 2)
+            watcher.poll()
+            assert done.wait(5)
+        finally:
+            watcher.stop()
+
+        changes = received[0]
+        assert changes.old is first
+        assert all(x.nag is first for x in first.services)
+        assert all(x.nag is first for x in first.getservicegroups())
+        assert first.services.first.status[0] == "ok"
+        assert watcher.nag.services.first.status[0] == "critical"
+
+    def test_unchanged_poll_reports_stale_services(self, watchedconfig, monkeypatch):
+        """Test that services going stale without a file change are reported."""
+        now = [2000000000.0]
+        monkeypatch.setattr(watchermodule, "time", SimpleNamespace(time=lambda: now[0]))
+        watchedconfig.IGNORE_STALE_DATA = False
+        setfirststate(watchedconfig, 1, "active_checks_enabled")
+        setfirststate(watchedconfig, int(now[0]) + 10, "next_check")
+
+        received = []
+        watcher = StatusWatcher(watchedconfig)
+        watcher.subscribe(received.append)
+        try:
+            assert watcher.poll() is True
+            assert watcher.poll() is False
+            now[0] += watchedconfig.STALE_THRESHOLD + 60
+            assert watcher.poll() is False
+            assert watcher.poll() is False
+        finally:
+            watcher.stop()
+
+        assert len(received) == 1
+        changes = received[0]
+        assert changes.old is changes.new is watcher.nag
+        assert [(x.service, x.oldstatus, x.newstatus) for x in changes.transitions] == [
+            (watcher.nag.services.first, "ok", "stale")
+        ]
+
+    def test_unsubscribe(self, watchedconfig):
+        """Test that an unsubscribed callback is not called anymore."""
+        received = []
+        watcher = StatusWatcher(watchedconfig)
+        watcher.subscribe(received.append)
+        watcher.unsubscribe(received.append)
+        watcher.poll()
+        setfirststate(watchedconfig, 2)
+        watcher.poll()
+        watcher.stop()
+        assert received == []
+
+    def test_failed_poll_keeps_snapshot(self, watchedconfig):
+        """Test that a missing file keeps the previous snapshot."""
+        watcher = StatusWatcher(watchedconfig)
+        try:
+            watcher.poll()
+            first = watcher.nag
+            os.rename(watchedconfig.files[1], watchedconfig.files[1] + ".old")
+            assert watcher.poll() is False
+            assert isinstance(watcher.error, OSError)
+            assert watcher.nag is first
+
+            os.rename(watchedconfig.files[1] + ".old", watchedconfig.files[1])
+            watcher.poll()
+            assert watcher.error is None
+        finally:
+            watcher.stop()
+
+    def test_background_thread(self, watchedconfig):
+        """Test that a started watcher picks up changes on its own."""
+        done = threading.Event()
+        with StatusWatcher(watchedconfig, interval=0.01) as watcher:
+            watcher.subscribe(lambda changes: done.set())
+            assert watcher.nag is not None
+            setfirststate(watchedconfig, 2)
+            assert done.wait(5)
+            assert watcher.nag.services.first.status[0] == "critical"
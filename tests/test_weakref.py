@@ -0,0 +1,121 @@
+"""Tests for weak back-references (NagConfig.WEAK_REFERENCES) and PAUSE_GC."""
+import gc
+import weakref
+import pytest
+from nagparser import parse, NagParser
+from nagparser.Services import nagfactory
+from nagparser.Services.nagfactory import pausedgc
+
+
+@pytest.fixture
+def nocollect():
+    """Keep the cyclic garbage collector off, so only refcounting frees."""
+    enabled = gc.isenabled()
+    gc.disable()
+    yield
+    if enabled:
+        gc.enable()
+
+
+class TestWeakReferences:
+    """Test cases for NagConfig.WEAK_REFERENCES."""
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_snapshot_freed_without_collector(self, make_nagconfig, nocollect, compact):
+        """Test that a dropped snapshot is freed by reference counting alone."""
+        nagconfig = make_nagconfig(WEAK_REFERENCES=True, COMPACT_OBJECTS=compact)
+        nag = parse(nagconfig)
+        [x.status for x in nag.getservicegroups()]
+        [x.status for x in nag.gethost("colo-rssdb").services]
+        nagref = weakref.ref(nag)
+        serviceref = weakref.ref(nag.services.first)
+
+        del nag
+        assert nagref() is None
+        assert serviceref() is None
+
+    def test_strong_references_by_default(self, test_nag):
+        """Test that objects keep their Nag alive unless configured otherwise."""
+        service = test_nag.services.first
+        assert service.nag is test_nag
+        assert service._nag is test_nag
+        assert test_nag.nag is test_nag
+
+    def test_same_results(self, test_nag, make_nagconfig):
+        """Test that weak references do not change what a parse produces."""
+        nag = parse(make_nagconfig(WEAK_REFERENCES=True))
+        assert nag.attributes == test_nag.attributes
+        assert nag.status == test_nag.status
+        for weak, strong in zip(nag.services, test_nag.services):
+            assert weak.nag is nag
+            assert weak.attributes == strong.attributes
+            assert weak.status == strong.status
+
+    def test_freed_nag_raises(self, make_nagconfig):
+        """Test that using an object past its Nag raises ReferenceError."""
+        service = parse(make_nagconfig(WEAK_REFERENCES=True)).services.first
+        gc.collect()
+        with pytest.raises(ReferenceError):
+            service.nag
+
+    def test_reused_objects_follow_new_nag(self, make_nagconfig):
+        """Test that objects carried over by NagParser point at the new Nag."""
+        parser = NagParser(make_nagconfig(WEAK_REFERENCES=True))
+        first = parser.parse()
+        second = parser.parse()
+        assert second.services.first is first.services.first
+        assert second.services.first.nag is second
+
+
+class TestPausedGC:
+    """Test cases for pausedgc() and NagConfig.PAUSE_GC."""
+
+    def test_disabled_while_parsing(self):
+        """Test that the collector is off inside and restored after."""
+        assert gc.isenabled()
+        with pausedgc():
+            assert not gc.isenabled()
+            with pausedgc():
+                assert not gc.isenabled()
+            assert not gc.isenabled()
+        assert gc.isenabled()
+
+    def test_left_alone_when_off(self):
+        """Test that pause=False and a collector disabled by the caller are kept."""
+        with pausedgc(False):
+            assert gc.isenabled()
+
+        gc.disable()
+        try:
+            with pausedgc():
+                pass
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
+
+    @pytest.mark.parametrize(
+        "weak, pause, paused",
+        [(False, None, False), (True, None, True), (False, True, True)],
+    )
+    def test_default_follows_weak_references(
+        self, make_nagconfig, monkeypatch, weak, pause, paused
+    ):
+        """Test that PAUSE_GC = None pauses the collector only with weak references."""
+        calls = []
+        original = nagfactory.pausedgc
+
+        def recordingpausedgc(pause=True):
+            calls.append(pause)
+            return original(pause)
+
+        monkeypatch.setattr(nagfactory, "pausedgc", recordingpausedgc)
+        parse(make_nagconfig(WEAK_REFERENCES=weak, PAUSE_GC=pause))
+        assert calls == [paused]
+
+    def test_restored_on_error(self, make_nagconfig):
+        """Test that a failing parse enables the collector again."""
+        nagconfig = make_nagconfig()
+        nagconfig.files = ["missing.dat"]
+        with pytest.raises(Exception):
+            parse(nagconfig)
+        assert gc.isenabled()